@@ -2,8 +2,6 @@ import time
 import asyncio
 import serial
 import numpy as np
-from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font
 from pathlib import Path
 import qtm_rt
 from qtm_rt.packet import QRTComponentType
@@ -13,6 +11,7 @@ from threading import Thread
 from datetime import datetime
 
 from pythonosc.udp_client import SimpleUDPClient
+from qtm_framelog import TouchLogWriter, XlsxLogSink
 
 # SERIAL_PORT = 'COM3'
 SERIAL_PORT = 'COM4'
@@ -44,8 +43,12 @@ log_dir.mkdir(parents=True, exist_ok=True)
 
 # print(f"📡 Waiting for trial start signal...")
 
-log_rows = []
+touch_log = None  # TouchLogWriter streaming frames to CSV, set in main()
 clicked_frames = set()
+TOUCH_STATUSES = ('Not Touching', 'Touching (Green)', 'Outside Bounds (Red)')
+LOG_COLUMNS = [('Frame', 'int'), ('Pen X', 'float'), ('Pen Y', 'float'), ('Pen Z', 'float'),
+               ('Distance to Plane (mm)', 'float'), ('Local X', 'nan_float'), ('Local Y', 'nan_float'),
+               ('Touch Status', TOUCH_STATUSES)]
 latest_frame = None
 
 def rect_point_to_local_xy(corners, point):
@@ -105,10 +108,9 @@ def handle_qtm_data(packet):
                 else:
                     status = "Outside Bounds (Red)"
 
-            log_rows.append([
-                frame, pen_tip[0], pen_tip[1], pen_tip[2],
-                dist, x_local, y_local, status
-            ])
+            if touch_log is not None:
+                touch_log.append(frame, pen_tip[0], pen_tip[1], pen_tip[2],
+                                 dist, x_local, y_local, status)
     except Exception as e:
         print(f"❌ QTM error: {e}")
 
@@ -121,6 +123,8 @@ def listen_serial():
             line = ser.readline().decode().strip()
             if line == '1' and latest_frame is not None:
                 clicked_frames.add(latest_frame)
+                if touch_log is not None:
+                    touch_log.mark_clicked(latest_frame)
                 print(f"🔘 Button clicked at frame: {latest_frame}")
     except serial.SerialException as e:
         print(f"❌ Serial port error: {e}")
@@ -136,7 +140,7 @@ def listen_serial():
         print(f"⚠️ Unexpected serial error: {e}")
 
 async def main():
-    global log_rows, clicked_frames
+    global touch_log, clicked_frames
 
     # timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     # output_file = log_dir / f"touch_log_{timestamp}.xlsx"
@@ -174,9 +178,17 @@ async def main():
     # clicked_file = log_dir / f"clicked_log.xlsx"
 
 
-    log_rows.clear()
     clicked_frames.clear()
 
+    # Frames are streamed to CSV and to write-only XLSX workbooks in chunks during the session.
+    # The CSVs get a _tb_ suffix: the publisher writes <prefix>_touch_log.csv / _clicked_log.csv
+    # into the same session folder, and those are the ones qtm_analysis and qtm_catalog index
+    csv_file = output_file.with_name(output_file.stem.replace("_touch_log", "_tb_touch_log") + ".csv")
+    clicked_csv_file = clicked_file.with_name(clicked_file.stem.replace("_clicked_log", "_tb_clicked_log") + ".csv")
+    xlsx_sink = XlsxLogSink(output_file, clicked_file)
+    touch_log = TouchLogWriter(csv_file, clicked_csv_file, LOG_COLUMNS, sinks=[xlsx_sink])
+    touch_log.start()
+
     serial_thread = Thread(target=listen_serial, daemon=True)
     serial_thread.start()
 
@@ -191,53 +203,9 @@ async def main():
         streaming_enabled = False
 
     print("🛑 Logging complete. Saving data...")
+    touch_log.close()
+    print(f"✅ Streamed log saved to: {csv_file}")
 
-    # Save Excel
-    wb_all = Workbook()
-    ws_all = wb_all.active
-    ws_all.title = "Touch Log"
-
-    wb_clicked = Workbook()
-    ws_clicked = wb_clicked.active
-    ws_clicked.title = "Clicked Touches"
-
-    headers = ['Frame', 'Pen X', 'Pen Y', 'Pen Z', 'Distance to Plane (mm)', 'Local X', 'Local Y', 'Touch Status', 'Clicked']
-    ws_all.append(headers)
-    ws_clicked.append(headers)
-
-    green_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-    red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-    yellow_fill = PatternFill(start_color="FFF475", end_color="FFF475", fill_type="solid")
-    bold_font = Font(bold=True)
-
-    # log_rows = set(log_rows)
-
-    for row in log_rows:
-            frame = row[0]
-            clicked = 1 if frame in clicked_frames else 0
-            full_row = row + [clicked]
-
-            # check if full_row already exists in ws_all
-            # if any(existing_row[:7] == full_row[:7] for existing_row in ws_all.iter_rows(min_row=2, values_only=True)):
-            #     continue  # Skip duplicates
-            
-            ws_all.append(full_row)
-
-            last_row = ws_all.max_row
-            status_cell = ws_all.cell(row=last_row, column=8)
-            if "Green" in row[7]:
-                status_cell.fill = green_fill
-            elif "Red" in row[7]:
-                status_cell.fill = red_fill
-            if clicked:
-                for col in range(1, len(full_row) + 1):
-                    cell = ws_all.cell(row=last_row, column=col)
-                    cell.fill = yellow_fill
-                    cell.font = bold_font
-                ws_clicked.append(full_row)
-
-    wb_all.save(output_file)
-    wb_clicked.save(clicked_file)
     print(f"✅ Data saved to: {output_file}")
     print(f"✅ Clicked data saved to: {clicked_file}")
     time.sleep(2)
@@ -0,0 +1,172 @@
+import argparse
+import csv
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# {participant}_{condition}_ID{ID}_{attempts}_{delaytime}_touch_log.csv, as written by the publisher
+TOUCH_LOG_PATTERN = re.compile(r"^(?P<participant>.+)_(?P<condition>[^_]+)_ID(?P<ID>\d+)_(?P<attempts>\d+)_(?P<delaytime>\d+)_touch_log\.csv$")
+SKIP_TRIALS = 3  # First trials are positioning, not Fitts' movements (as in save_data_and_finish)
+WE_FACTOR = 4.133  # Effective width = 4.133 x SD of the endpoints (ISO 9241-9)
+
+TRIAL_FIELDS = ["participant", "condition", "ID", "attempts", "delaytime", "trial", "start_frame", "end_frame",
+                "MT_ms", "direction", "endpoint_mm", "deviation_mm"]
+BLOCK_FIELDS = ["participant", "condition", "ID", "attempts", "delaytime", "frame_rate_hz", "trials",
+                "MT_ms", "MT_sd_ms", "MT_tk_ms", "endpoint_sd_mm", "Ae_mm", "We_mm", "IDe_bits", "TPe_bits_s",
+                "touch_log", "block_csv"]
+
+
+def read_columns(path, names):
+    """Named numeric columns of a log CSV as float64 arrays ('NaN' strings become NaN)"""
+    with open(path, newline="") as f:
+        headers = next(csv.reader(f))
+    usecols = [headers.index(name) for name in names]
+    data = np.loadtxt(path, delimiter=",", skiprows=1, usecols=usecols, ndmin=2)
+    return [data[:, i] for i in range(len(names))]
+
+
+def read_block_mt(path):
+    """Per-trial MT (ms) of the subscriber's block CSV, measured from Tk wall-clock times"""
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))[1:]
+    # The last row only holds the averages
+    return np.array([float(row[0]) for row in rows if len(row) > 4 and row[0]], dtype=np.float64)
+
+
+def estimate_frame_rate(frame_deltas, mt_tk_ms):
+    """QTM frames per second from trigger frame spacing against the Tk MTs of the same trials"""
+    n = min(len(frame_deltas), len(mt_tk_ms) - 1)
+    if n < 1:
+        return np.nan
+    # Tk MT[k] runs from trigger k-1 to trigger k, like frame_deltas[k-1]
+    ratios = frame_deltas[:n] / (mt_tk_ms[1:n + 1] / 1000.0)
+    ratios = ratios[np.isfinite(ratios) & (ratios > 0)]
+    return float(np.median(ratios)) if len(ratios) else np.nan
+
+
+def analyse_block(touch_log, frame_rate=None, skip_trials=SKIP_TRIALS):
+    """Per-trial and per-block Fitts' measures of one block.
+
+    Trials run between consecutive clicked (trigger) frames. The endpoint of a trial
+    is the turnaround point: the furthest Local X reached in the movement direction
+    before the pen reverses for the next trial. Effective width and throughput
+    follow ISO 9241-9 with deviations taken per target side.
+    """
+    touch_log = Path(touch_log)
+    meta = TOUCH_LOG_PATTERN.match(touch_log.name).groupdict()
+    frames, local_x, clicked = read_columns(touch_log, ["Frame", "Local X", "Clicked"])
+    click_rows = np.flatnonzero(clicked == 1)
+
+    block_csv = touch_log.with_name(touch_log.name.replace("_touch_log.csv", ".csv"))
+    mt_tk = read_block_mt(block_csv) if block_csv.exists() else np.empty(0)
+
+    click_frames = frames[click_rows]
+    frame_deltas = np.diff(click_frames)
+    if not frame_rate:
+        frame_rate = estimate_frame_rate(frame_deltas, mt_tk)
+        if not np.isfinite(frame_rate):
+            # Every MT would be NaN; _analyse() reports the block and skips it
+            source = f"{block_csv.name} has too few trials" if block_csv.exists() else f"no {block_csv.name}"
+            raise ValueError(f"cannot estimate the frame rate ({source}); pass --frame-rate")
+
+    # Trials are numbered like the rows of the block CSV: trial 1 runs from the first
+    # target's appearance to click 1 and has no start frame, so trial k >= 2 spans
+    # clicks k-1..k. Its endpoint is the extremum between click k and click k+1.
+    if len(click_rows):
+        # fmax/fmin skip the NaN Local X of frames off the screen
+        seg_max = np.fmax.reduceat(local_x, click_rows)
+        seg_min = np.fmin.reduceat(local_x, click_rows)
+    else:
+        seg_max = seg_min = np.empty(0)
+    direction = np.sign(np.diff(local_x[click_rows]))
+    endpoints = np.where(direction > 0, seg_max[1:], seg_min[1:])
+    mt_ms = frame_deltas / frame_rate * 1000.0
+
+    trial_numbers = np.arange(2, len(click_rows) + 1)
+    keep = trial_numbers > skip_trials
+    trial_numbers = trial_numbers[keep]
+    mt_ms, direction, endpoints = mt_ms[keep], direction[keep], endpoints[keep]
+    starts, ends = click_frames[:-1][keep], click_frames[1:][keep]
+
+    # Deviations along the movement axis from the mean endpoint of each target side
+    deviations = np.full(len(endpoints), np.nan)
+    for side in (-1.0, 1.0):
+        on_side = direction == side
+        if on_side.any():
+            deviations[on_side] = (endpoints[on_side] - np.nanmean(endpoints[on_side])) * side
+
+    trials = [dict(meta, trial=int(k), start_frame=int(s), end_frame=int(e), MT_ms=float(mt),
+                   direction=int(d), endpoint_mm=float(x), deviation_mm=float(dev))
+              for k, s, e, mt, d, x, dev in zip(trial_numbers, starts, ends, mt_ms, direction, endpoints, deviations)]
+
+    n = len(trials)
+    endpoint_sd = float(np.nanstd(deviations, ddof=1)) if n > 1 else np.nan
+    amplitude = float(np.nanmean(np.abs(np.diff(endpoints)))) if n > 1 else np.nan
+    we = WE_FACTOR * endpoint_sd
+    ide = float(np.log2(amplitude / we + 1)) if we > 0 else np.nan
+    mean_mt = float(np.mean(mt_ms)) if n else np.nan
+    block = dict(meta, frame_rate_hz=frame_rate, trials=n, MT_ms=mean_mt,
+                 MT_sd_ms=float(np.std(mt_ms, ddof=1)) if n > 1 else np.nan,
+                 MT_tk_ms=float(np.mean(mt_tk[skip_trials:])) if len(mt_tk) > skip_trials else np.nan,
+                 endpoint_sd_mm=endpoint_sd, Ae_mm=amplitude, We_mm=we, IDe_bits=ide,
+                 TPe_bits_s=ide / (mean_mt / 1000.0) if mean_mt > 0 else np.nan,
+                 touch_log=str(touch_log), block_csv=str(block_csv) if block_csv.exists() else "")
+    return block, trials
+
+
+def _analyse(args):
+    path, frame_rate, skip_trials = args
+    try:
+        return analyse_block(path, frame_rate, skip_trials)
+    except Exception as e:
+        print(f"⚠️ {Path(path).name}: {e}")
+        return None
+
+
+def find_touch_logs(results_dir):
+    return sorted(p for p in Path(results_dir).rglob("*_touch_log.csv") if TOUCH_LOG_PATTERN.match(p.name))
+
+
+def analyse_results(results_dir, frame_rate=None, skip_trials=SKIP_TRIALS, workers=None):
+    """Analyse every block under results_dir on a process pool. Returns (blocks, trials)."""
+    paths = find_touch_logs(results_dir)
+    blocks, trials = [], []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(_analyse, [(p, frame_rate, skip_trials) for p in paths], chunksize=4):
+            if result is not None:
+                blocks.append(result[0])
+                trials.extend(result[1])
+    return blocks, trials
+
+
+def write_rows(path, fields, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fitts' analysis of all blocks under Results/")
+    parser.add_argument("--results", default=str(Path(__file__).parent / "Results"))
+    parser.add_argument("--frame-rate", type=float, default=0.0,
+                        help="QTM capture rate in Hz (0 = estimate per block from the subscriber's MTs)")
+    parser.add_argument("--skip-trials", type=int, default=SKIP_TRIALS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="Output folder (default: --results)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    blocks, trials = analyse_results(args.results, args.frame_rate or None, args.skip_trials, args.workers)
+    out = Path(args.out or args.results)
+    out.mkdir(parents=True, exist_ok=True)
+    write_rows(out / "fitts_blocks.csv", BLOCK_FIELDS, blocks)
+    write_rows(out / "fitts_trials.csv", TRIAL_FIELDS, trials)
+    print(f"✅ {len(blocks)} blocks, {len(trials)} trials analysed in {time.perf_counter() - t0:.1f}s -> {out}")
+
+
+if __name__ == "__main__":
+    main()
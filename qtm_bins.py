@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import numpy as np
+
+NO_EVENTS = ()
+
+
+class BinTracker:
+    """Tracks the pen across a table of bin edges and reports every boundary crossed.
+
+    `edges` are the sorted bin boundaries in mm, outer edges included, so there are
+    len(edges) - 1 bins; they may be non-uniform. Positions outside the table are
+    clamped to the first/last bin. A boundary only counts as crossed once the pen is
+    past it by the hysteresis margin (`hysteresis_fraction` of the narrower adjacent
+    bin), so jitter on a boundary does not retrigger. Bins are located by binary
+    search, so update() costs O(log bins) regardless of layout.
+
+    Each crossing is reported separately, with a timestamp interpolated linearly
+    between the previous and the current sample, so a fast stroke that skips
+    several bins between two frames still yields one event per boundary.
+    """
+
+    def __init__(self, edges, hysteresis_fraction=0.0):
+        edges = np.asarray(edges, dtype=np.float64)
+        if edges.ndim != 1 or len(edges) < 2 or np.any(np.diff(edges) <= 0):
+            raise ValueError("Bin edges must be a strictly increasing 1-D table with at least two entries")
+        # Margins stay below half a bin so the shifted edge tables remain sorted
+        fraction = min(max(hysteresis_fraction, 0.0), 0.49)
+        widths = np.diff(edges)
+        margins = np.zeros(len(edges))
+        margins[1:-1] = fraction * np.minimum(widths[:-1], widths[1:])
+        self.edges = edges
+        self._edge_list = edges.tolist()
+        self.num_bins = len(edges) - 1
+        self._rising = edges + margins   # Must reach these moving right...
+        self._falling = edges - margins  # ...or these moving left
+        self.reset()
+
+    @classmethod
+    def uniform(cls, low, high, num_bins, hysteresis_fraction=0.0):
+        return cls(np.linspace(low, high, num_bins + 1), hysteresis_fraction)
+
+    @classmethod
+    def from_file(cls, path, hysteresis_fraction=0.0):
+        """Load an edge table from .npy or from a text/CSV file with one edge per line"""
+        path = Path(path)
+        edges = np.load(path) if path.suffix == ".npy" else np.loadtxt(path, delimiter=",", ndmin=1)
+        return cls(np.ravel(edges), hysteresis_fraction)
+
+    def reset(self):
+        """Forget the pen position, e.g. when it leaves the surface"""
+        self.current_bin = -1
+        self._last_x = None
+        self._last_t = None
+
+    def locate(self, x):
+        """Bin index of position x (clamped)"""
+        index = int(np.searchsorted(self.edges, x, side="right")) - 1
+        return min(max(index, 0), self.num_bins - 1)
+
+    def update(self, x, t):
+        """Feed a pen position (mm) and its sample time.
+
+        Returns a sequence of (boundary_index, direction, crossing_time) tuples, one
+        per edge crossed since the previous sample (direction +1 = rightwards). The
+        first sample after reset() only arms the tracker.
+        """
+        last_x, last_t = self._last_x, self._last_t
+        self._last_x, self._last_t = x, t
+        if last_x is None:
+            self.current_bin = self.locate(x)
+            return NO_EVENTS
+
+        current = self.current_bin
+        # Furthest bin whose entry edge (plus margin) the pen has passed, either way
+        right = min(int(np.searchsorted(self._rising, x, side="right")) - 1, self.num_bins - 1)
+        left = max(int(np.searchsorted(self._falling, x, side="left")), 1) - 1
+        if right > current:
+            boundaries = range(current + 1, right + 1)
+            direction = 1
+            self.current_bin = right
+        elif left < current:
+            boundaries = range(current, left, -1)
+            direction = -1
+            self.current_bin = left
+        else:
+            return NO_EVENTS
+
+        dx = x - last_x
+        events = []
+        for boundary in boundaries:
+            if dx != 0:
+                fraction = min(max((self._edge_list[boundary] - last_x) / dx, 0.0), 1.0)
+            else:
+                fraction = 1.0
+            events.append((boundary, direction, last_t + fraction * (t - last_t)))
+        return events
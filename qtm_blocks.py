@@ -0,0 +1,62 @@
+import json
+import random
+from pathlib import Path
+
+# A block is one condition/ID/attempt run of TOTAL_TRIALS targets
+BLOCK_KEYS = ("condition", "ID", "attempts", "delaytime")
+BLOCK_ORDERS = ("as-listed", "latin", "shuffle")
+
+
+def make_block(condition, ID, attempts, delaytime):
+    return {"condition": condition, "ID": ID, "attempts": attempts, "delaytime": delaytime}
+
+
+def load_blocks(path):
+    """Read a block queue from a JSON file holding a list of block objects"""
+    with open(Path(path)) as f:
+        blocks = json.load(f)
+    for i, block in enumerate(blocks):
+        missing = [key for key in BLOCK_KEYS if key not in block]
+        if missing:
+            raise ValueError(f"Block {i} in {path} is missing {', '.join(missing)}")
+    return blocks
+
+
+def balanced_latin_square_row(n, index):
+    """Row `index` of a balanced Latin square (Williams design) over n items.
+
+    Across n consecutive rows every item appears once in each position and, for
+    even n, directly follows every other item exactly once. For odd n the rows
+    n..2n-1 are the mirrored rows 0..n-1, so balance needs 2n participants.
+    """
+    row = []
+    low, high = 0, 0
+    for i in range(n):
+        if i < 2 or i % 2:
+            value = low
+            low += 1
+        else:
+            value = n - high - 1
+            high += 1
+        row.append((value + index) % n)
+    if n % 2 and (index // n) % 2:
+        row.reverse()
+    return row
+
+
+def order_blocks(blocks, order="as-listed", participant_index=0, seed=None):
+    """Return the blocks in the order one participant runs them.
+
+    "as-listed" keeps the queue, "latin" takes row `participant_index` of a
+    balanced Latin square, "shuffle" permutes with a generator seeded by `seed`
+    (e.g. the participant name) so a rerun reproduces the same order.
+    """
+    blocks = list(blocks)
+    if order == "as-listed":
+        return blocks
+    if order == "latin":
+        return [blocks[i] for i in balanced_latin_square_row(len(blocks), participant_index)]
+    if order == "shuffle":
+        random.Random(seed).shuffle(blocks)
+        return blocks
+    raise ValueError(f"Unknown block order {order!r}. Supported: {', '.join(BLOCK_ORDERS)}")
@@ -0,0 +1,114 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+CALIBRATION_FILENAME = "screen_calibration.json"
+
+
+class ScreenCalibration:
+    """Physical size of the screen and the mm-per-pixel mapping of the experiment canvas.
+
+    Measured once per session from the four corner markers (see CornerSampler) and
+    shared by the publisher and the subscriber, so both compute identical target
+    bounds. Corners are ordered [top right, bottom right, bottom left, top left].
+    """
+
+    def __init__(self, width_mm, height_mm, width_px, height_px, corners=None, frames=0, jitter_mm=0.0,
+                 measured_at=None):
+        self.width_mm = float(width_mm)
+        self.height_mm = float(height_mm)
+        self.width_px = int(width_px)
+        self.height_px = int(height_px)
+        self.corners = None if corners is None else np.asarray(corners, dtype=np.float64)
+        self.frames = frames          # Corner frames averaged; 0 = default size, not measured
+        self.jitter_mm = jitter_mm    # Largest per-corner standard deviation over the window
+        self.measured_at = measured_at
+
+    @property
+    def mm_per_px(self):
+        return self.width_mm / self.width_px if self.width_px else 1.0
+
+    def span_mm(self, x_px, width_px):
+        """(left, right) in mm of a horizontal canvas span starting at x_px"""
+        mm_per_px = self.mm_per_px
+        return x_px * mm_per_px, (x_px + width_px) * mm_per_px
+
+    @classmethod
+    def from_corners(cls, corner_frames, width_px, height_px):
+        """Calibration from an (n, 4, 3) stack of corner positions"""
+        corner_frames = np.asarray(corner_frames, dtype=np.float64)
+        corners = np.median(corner_frames, axis=0)
+        top_right, bottom_right, bottom_left, top_left = corners
+        width_mm = (np.linalg.norm(bottom_right - bottom_left) + np.linalg.norm(top_right - top_left)) / 2
+        height_mm = (np.linalg.norm(top_left - bottom_left) + np.linalg.norm(top_right - bottom_right)) / 2
+        jitter_mm = float(np.linalg.norm(corner_frames.std(axis=0), axis=1).max())
+        return cls(width_mm, height_mm, width_px, height_px, corners, len(corner_frames), jitter_mm, time.time())
+
+    def to_dict(self):
+        return {
+            "width_mm": self.width_mm,
+            "height_mm": self.height_mm,
+            "width_px": self.width_px,
+            "height_px": self.height_px,
+            "corners": None if self.corners is None else self.corners.tolist(),
+            "frames": self.frames,
+            "jitter_mm": self.jitter_mm,
+            "measured_at": self.measured_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def save(self, path):
+        """Write as JSON; the file only appears once it is complete"""
+        path = Path(path)
+        part = path.with_name(path.name + ".part")
+        with open(part, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(part, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def __str__(self):
+        source = f"{self.frames} frames, jitter {self.jitter_mm:.2f} mm" if self.frames else "default size"
+        return (f"{self.width_mm:.1f} x {self.height_mm:.1f} mm on {self.width_px} x {self.height_px} px "
+                f"({self.mm_per_px:.4f} mm/px, {source})")
+
+
+class CornerSampler:
+    """Collects the four corner markers of consecutive frames for a calibration window.
+
+    add() copies into a preallocated stack and skips frames with a missing corner;
+    the window is complete once `window_s` has passed since the first valid frame
+    and at least `min_frames` were collected.
+    """
+
+    def __init__(self, window_s=1.0, min_frames=30, max_frames=4096):
+        self.window_s = window_s
+        self.min_frames = min_frames
+        self._frames = np.empty((max_frames, 4, 3))
+        self.count = 0
+        self._started = None
+
+    def add(self, corners, valid=True):
+        if not valid or self.count == len(self._frames):
+            return
+        if self._started is None:
+            self._started = time.monotonic()
+        self._frames[self.count] = corners
+        self.count += 1
+
+    @property
+    def done(self):
+        return (self.count >= self.min_frames and
+                (self.count == len(self._frames) or time.monotonic() - self._started >= self.window_s))
+
+    def result(self, width_px, height_px):
+        return ScreenCalibration.from_corners(self._frames[:self.count], width_px, height_px)
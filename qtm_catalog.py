@@ -0,0 +1,180 @@
+import argparse
+import csv
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+from qtm_analysis import TOUCH_LOG_PATTERN
+
+CATALOG_FILENAME = "catalog.sqlite"  # Kept in Results/, next to the participant folders
+KEY_COLUMNS = ("folder", "participant", "condition", "ID", "attempts", "delaytime")
+FIELD_COLUMNS = ("touch_log", "clicked_log", "block_csv", "rows", "triggers", "trigger_frames",
+                 "MT_ms", "speed", "throughput", "touch_log_mtime", "touch_log_size")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    folder TEXT NOT NULL,
+    participant TEXT NOT NULL,
+    condition TEXT NOT NULL,
+    ID INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    delaytime INTEGER NOT NULL,
+    touch_log TEXT,
+    clicked_log TEXT,
+    block_csv TEXT,
+    rows INTEGER,
+    triggers INTEGER,
+    trigger_frames TEXT,
+    MT_ms REAL,
+    speed REAL,
+    throughput REAL,
+    touch_log_mtime REAL,
+    touch_log_size INTEGER,
+    updated_at REAL,
+    PRIMARY KEY (folder, participant, condition, ID, attempts, delaytime)
+);
+CREATE INDEX IF NOT EXISTS blocks_condition_id ON blocks (condition, ID);
+CREATE INDEX IF NOT EXISTS blocks_participant ON blocks (participant, condition);
+CREATE INDEX IF NOT EXISTS blocks_delaytime ON blocks (delaytime);
+CREATE UNIQUE INDEX IF NOT EXISTS blocks_touch_log ON blocks (touch_log);
+"""
+
+
+def catalog_path(participant_folder):
+    return Path(participant_folder).parent / CATALOG_FILENAME
+
+
+def block_key(participant_folder, participant, condition, ID, attempts, delaytime):
+    return {"folder": str(Path(participant_folder).resolve()), "participant": participant, "condition": condition,
+            "ID": int(ID), "attempts": int(attempts), "delaytime": int(delaytime)}
+
+
+class SessionCatalog:
+    """SQLite index of all recorded blocks.
+
+    One row per block, keyed by participant folder, participant, condition, ID,
+    attempt and delay. The publisher and the subscriber each upsert the fields they
+    know when a block finishes (logs, row and trigger counts / block CSV and its
+    averages); reindex() fills the catalog from existing folders and only reparses
+    touch logs whose size or mtime changed. WAL mode lets both processes write.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.db = sqlite3.connect(str(self.path), timeout=10.0)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def record_block(self, key, **fields):
+        """Insert or update one block; only the given fields are overwritten"""
+        unknown = set(fields) - set(FIELD_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown catalog fields: {', '.join(sorted(unknown))}")
+        if "trigger_frames" in fields and not isinstance(fields["trigger_frames"], str):
+            fields["trigger_frames"] = json.dumps([int(f) for f in fields["trigger_frames"]])
+        columns = list(KEY_COLUMNS) + list(fields) + ["updated_at"]
+        values = [key[c] for c in KEY_COLUMNS] + list(fields.values()) + [time.time()]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in list(fields) + ["updated_at"])
+        with self.db:
+            self.db.execute(
+                f"INSERT INTO blocks ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET {updates}", values)
+
+    def query(self, **filters):
+        """Blocks matching all equality filters (e.g. condition="motion-coupled", ID=4), as dicts"""
+        unknown = set(filters) - set(KEY_COLUMNS)
+        if unknown:
+            raise ValueError(f"Can only filter on {', '.join(KEY_COLUMNS)}")
+        where = " AND ".join(f"{c} = ?" for c in filters) or "1"
+        rows = self.db.execute(f"SELECT * FROM blocks WHERE {where} "
+                               "ORDER BY participant, condition, ID, attempts, delaytime", list(filters.values()))
+        return [dict(row) for row in rows]
+
+    def reindex(self, results_dir):
+        """Catalog the blocks under results_dir. Returns (indexed, unchanged, removed) counts."""
+        known = {row["touch_log"]: (row["touch_log_mtime"], row["touch_log_size"])
+                 for row in self.db.execute("SELECT touch_log, touch_log_mtime, touch_log_size FROM blocks "
+                                            "WHERE touch_log IS NOT NULL")}
+        indexed = unchanged = 0
+        seen = set()
+        for touch_log in sorted(Path(results_dir).resolve().rglob("*_touch_log.csv")):
+            match = TOUCH_LOG_PATTERN.match(touch_log.name)
+            if match is None:
+                continue
+            seen.add(str(touch_log))
+            stat = touch_log.stat()
+            if known.get(str(touch_log)) == (stat.st_mtime, stat.st_size):
+                unchanged += 1
+                continue
+            m = match.groupdict()
+            key = block_key(touch_log.parent, m["participant"], m["condition"], m["ID"], m["attempts"], m["delaytime"])
+            self.record_block(key, **scan_block(touch_log))
+            indexed += 1
+
+        removed = [path for path in known if path not in seen and not Path(path).exists()]
+        with self.db:
+            self.db.executemany("DELETE FROM blocks WHERE touch_log = ?", [(path,) for path in removed])
+        return indexed, unchanged, len(removed)
+
+
+def scan_block(touch_log):
+    """Catalog fields of a finished block, read from its files"""
+    touch_log = Path(touch_log).resolve()
+    stat = touch_log.stat()
+    with open(touch_log, "rb") as f:
+        rows = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b"")) - 1
+    fields = {"touch_log": str(touch_log), "rows": rows, "touch_log_mtime": stat.st_mtime,
+              "touch_log_size": stat.st_size}
+
+    # The clicked log holds exactly the trigger rows, so the touch log is never parsed
+    clicked_log = touch_log.with_name(touch_log.name.replace("_touch_log.csv", "_clicked_log.csv"))
+    if clicked_log.exists():
+        with open(clicked_log, newline="") as f:
+            frames = [int(row[0]) for row in list(csv.reader(f))[1:] if row]
+        fields.update(clicked_log=str(clicked_log), triggers=len(frames), trigger_frames=frames)
+
+    # Subscriber block CSV: the last row holds the averages (MT, speed, throughput)
+    block_csv = touch_log.with_name(touch_log.name.replace("_touch_log.csv", ".csv"))
+    if block_csv.exists():
+        with open(block_csv, newline="") as f:
+            rows_csv = list(csv.reader(f))
+        fields["block_csv"] = str(block_csv)
+        if len(rows_csv) > 1 and len(rows_csv[-1]) >= 3:
+            fields.update(MT_ms=float(rows_csv[-1][0]), speed=float(rows_csv[-1][1]),
+                          throughput=float(rows_csv[-1][2]))
+    return fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and query the recorded blocks")
+    parser.add_argument("command", choices=["reindex", "query"])
+    parser.add_argument("--results", default=str(Path(__file__).parent / "Results"))
+    parser.add_argument("--participant")
+    parser.add_argument("--condition")
+    parser.add_argument("--ID", type=int)
+    parser.add_argument("--attempts", type=int)
+    parser.add_argument("--delaytime", type=int)
+    args = parser.parse_args()
+
+    catalog = SessionCatalog(Path(args.results) / CATALOG_FILENAME)
+    if args.command == "reindex":
+        t0 = time.perf_counter()
+        indexed, unchanged, removed = catalog.reindex(args.results)
+        print(f"✅ {indexed} indexed, {unchanged} unchanged, {removed} removed in {time.perf_counter() - t0:.2f}s")
+    else:
+        filters = {name: getattr(args, name) for name in ("participant", "condition", "ID", "attempts", "delaytime")
+                   if getattr(args, name) is not None}
+        for block in catalog.query(**filters):
+            print(f"{block['participant']}\t{block['condition']}\tID{block['ID']}\t{block['attempts']}\t"
+                  f"{block['delaytime']}\trows={block['rows']}\ttriggers={block['triggers']}\t"
+                  f"MT={block['MT_ms']}\t{block['touch_log']}")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
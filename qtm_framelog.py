@@ -0,0 +1,333 @@
+import os
+import time
+import threading
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.formatting.rule import FormulaRule
+    from openpyxl.styles import PatternFill, Font
+    from openpyxl.utils import get_column_letter
+except ImportError:  # Only the XLSX sink needs openpyxl
+    Workbook = None
+
+# Column kinds for FrameStore schemas: (CSV header, kind)
+#   "int"       int64
+#   "float"     float64
+#   "nan_float" float64, exported as 'NaN' when missing (the scripts log the string 'NaN')
+#   (labels...) category stored as a uint8 index into the label tuple
+COLUMN_DTYPES = {"int": np.int64, "float": np.float64, "nan_float": np.float64}
+CHUNK_ROWS = 4096
+
+
+class _Chunk:
+    """CHUNK_ROWS rows of typed columns plus arrival times and the clicked bitmask"""
+
+    def __init__(self, schema):
+        self.columns = [np.zeros(CHUNK_ROWS, COLUMN_DTYPES.get(kind, np.uint8)) for _, kind in schema]
+        self.arrival = np.zeros(CHUNK_ROWS)
+        self.clicked = np.zeros(CHUNK_ROWS, dtype=bool)
+        self.reset(0)
+
+    def reset(self, first_row):
+        self.first_row = first_row
+        self.n = 0          # Rows filled by the frame path
+        self.flushed = 0    # Rows already written by the writer thread
+        self.clicked[:] = False
+
+
+class FrameStore:
+    """Growable columnar frame store, allocated in chunks of CHUNK_ROWS rows.
+
+    Rows are appended from the frame path into preallocated NumPy columns; the
+    first column must be the frame number. Clicked rows are kept as a bitmask,
+    set by row index (mark_clicked_row) or resolved from frame numbers at export
+    time (mark_clicked). format_rows() turns a row range into CSV text with
+    vectorized string operations, so exporting never loops over rows in Python.
+    Chunks are released once drained, so a streaming consumer keeps memory flat.
+
+    append() and mark_clicked_row() run on the frame path, mark_clicked() on any
+    thread and drain() on the writer thread. drain() claims a row range under
+    `_lock` before it reads the clicked bits, and click marks take the same lock,
+    so a mark either lands before its row is claimed or is refused.
+    """
+
+    def __init__(self, schema):
+        self.schema = list(schema)
+        self.headers = [header for header, _ in self.schema] + ["Clicked"]
+        self._label_codes = [
+            {label: code for code, label in enumerate(kind)} if isinstance(kind, tuple) else None
+            for _, kind in self.schema
+        ]
+        self._chunks = deque()
+        self._free = deque()
+        self._current = None
+        self.row_count = 0
+        self.clicked_frames = set()
+        self._lock = threading.Lock()  # Chunk release and row claims vs. click marks
+
+    def _new_chunk(self):
+        try:
+            chunk = self._free.popleft()
+            chunk.reset(self.row_count)
+        except IndexError:
+            chunk = _Chunk(self.schema)
+            chunk.first_row = self.row_count
+        self._chunks.append(chunk)
+        self._current = chunk
+        return chunk
+
+    def append(self, *values):
+        """Append one row (values in schema order) and return its row index"""
+        chunk = self._current
+        if chunk is None or chunk.n == CHUNK_ROWS:
+            chunk = self._new_chunk()
+        i = chunk.n
+        for column, codes, value in zip(chunk.columns, self._label_codes, values):
+            column[i] = codes[value] if codes is not None else value
+        chunk.arrival[i] = time.monotonic()
+        chunk.n = i + 1  # Publish the row only after all columns are written
+        self.row_count += 1
+        return self.row_count - 1
+
+    def mark_clicked_row(self, row):
+        """Set the clicked bit of a row that has not been drained yet. Returns False if too late."""
+        current = self._current
+        if current is None or not 0 <= row < self.row_count:
+            return False
+        # Chunks are contiguous, so the row's chunk is found by counting back from the current one
+        back = (current.first_row + CHUNK_ROWS - 1 - row) // CHUNK_ROWS
+        with self._lock:
+            if back >= len(self._chunks):
+                return False  # Already drained and released
+            chunk = self._chunks[-1 - back]
+            i = row - chunk.first_row
+            if i < chunk.flushed:
+                return False  # Claimed by the writer
+            chunk.clicked[i] = True
+            return True
+
+    def mark_clicked(self, frame):
+        """Mark a frame as clicked by number, e.g. from a thread that only knows latest_frame"""
+        with self._lock:
+            self.clicked_frames.add(frame)
+
+    def drain(self, cutoff=None):
+        """Yield (chunk, start, end) ranges of rows that arrived at or before `cutoff`
+        (monotonic time; all rows if None) and release fully drained chunks."""
+        with self._lock:
+            chunks = list(self._chunks)
+        for chunk in chunks:
+            n = chunk.n
+            with self._lock:
+                clicked_frames = np.fromiter(self.clicked_frames, np.int64, len(self.clicked_frames))
+                start = chunk.flushed
+                end = n
+                if cutoff is not None:
+                    end = start + int(np.searchsorted(chunk.arrival[start:n], cutoff, side="right"))
+                chunk.flushed = end  # Claimed: later marks for these rows are refused
+            if end > start:
+                if len(clicked_frames):
+                    chunk.clicked[start:end] |= np.isin(chunk.columns[0][start:end], clicked_frames)
+                yield chunk, start, end
+            if end == CHUNK_ROWS:
+                with self._lock:
+                    self._chunks.popleft()
+                self._free.append(chunk)
+            else:
+                break  # Later chunks only hold newer rows
+
+    def format_rows(self, chunk, start, end, line_terminator="\r\n"):
+        """CSV text for rows [start, end) of a chunk, and the text of its clicked subset"""
+        fields = []
+        for (_, kind), column in zip(self.schema, chunk.columns):
+            values = column[start:end]
+            if kind == "nan_float":
+                text = np.where(np.isnan(values), "NaN", values.astype(str))
+            elif isinstance(kind, tuple):
+                text = np.asarray(kind)[values]
+            else:
+                text = values.astype(str)
+            fields.append(text)
+        clicked = chunk.clicked[start:end]
+        fields.append(clicked.astype(np.uint8).astype(str))
+
+        lines = fields[0]
+        for text in fields[1:]:
+            lines = np.char.add(np.char.add(lines, ","), text)
+        lines = lines.tolist()
+        clicked_lines = [line for line, c in zip(lines, clicked.tolist()) if c]
+        join = lambda rows: line_terminator.join(rows) + line_terminator if rows else ""
+        return join(lines), join(clicked_lines)
+
+
+class XlsxLogSink:
+    """Streams drained rows into write-only XLSX workbooks (all rows and clicked rows).
+
+    Rows go to openpyxl's write-only worksheets as they are drained, so neither
+    workbook is held in memory and closing only finalises the files. Highlighting is
+    expressed as conditional formatting over the written range instead of per-cell
+    styles: in the full log the status column is filled green/red by its label
+    and clicked rows are filled yellow and bold.
+    """
+
+    STATUS_FILLS = {"Green": "C6EFCE", "Red": "FFC7CE"}
+    CLICKED_FILL = "FFF475"
+
+    def __init__(self, path, clicked_path, status_header="Touch Status"):
+        if Workbook is None:
+            raise RuntimeError("openpyxl is not installed; XLSX export is unavailable")
+        self.path = Path(path)
+        self.clicked_path = Path(clicked_path)
+        self.status_header = status_header
+        self.rows_written = 0
+        self.clicked_written = 0
+        self._store = None
+
+    def open(self, store):
+        self._store = store
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Touch Log")
+        self._clicked_workbook = Workbook(write_only=True)
+        self._clicked_sheet = self._clicked_workbook.create_sheet("Clicked Touches")
+        for sheet in (self._sheet, self._clicked_sheet):
+            sheet.append(store.headers)
+
+    def write(self, chunk, start, end):
+        """Append rows [start, end) of a chunk, with NaN as 'NaN' and categories as labels"""
+        columns = []
+        for (_, kind), column in zip(self._store.schema, chunk.columns):
+            values = column[start:end]
+            if kind == "nan_float":
+                columns.append(np.where(np.isnan(values), "NaN", values.astype(object)).tolist())
+            elif isinstance(kind, tuple):
+                columns.append(np.asarray(kind, dtype=object)[values].tolist())
+            else:
+                columns.append(values.tolist())
+        clicked = chunk.clicked[start:end].astype(np.uint8)
+        columns.append(clicked.tolist())
+
+        for row in zip(*columns):
+            self._sheet.append(row)
+            if row[-1]:
+                self._clicked_sheet.append(row)
+                self.clicked_written += 1
+        self.rows_written += end - start
+
+    def _highlight(self, sheet, row_count):
+        if row_count == 0:
+            return
+        headers = self._store.headers
+        clicked_column = get_column_letter(len(headers))  # Clicked is always the last column
+        last_row = row_count + 1
+        # Added first so it has priority over the status fills, as the per-cell styling had
+        sheet.conditional_formatting.add(
+            f"A2:{clicked_column}{last_row}",
+            FormulaRule(formula=[f"${clicked_column}2=1"], font=Font(bold=True),
+                        fill=PatternFill(start_color=self.CLICKED_FILL, end_color=self.CLICKED_FILL, fill_type="solid")))
+        if self.status_header in headers:
+            status_column = get_column_letter(headers.index(self.status_header) + 1)
+            for label, color in self.STATUS_FILLS.items():
+                sheet.conditional_formatting.add(
+                    f"{status_column}2:{status_column}{last_row}",
+                    FormulaRule(formula=[f'ISNUMBER(SEARCH("{label}",${status_column}2))'],
+                                fill=PatternFill(start_color=color, end_color=color, fill_type="solid")))
+
+    def close(self):
+        self._highlight(self._sheet, self.rows_written)
+        self._workbook.save(self.path)
+        self._clicked_workbook.save(self.clicked_path)
+
+
+class TouchLogWriter:
+    """Streams logged frames to CSV from a background thread during the session.
+
+    The frame path only calls append() and mark_clicked_row()/mark_clicked(); these
+    write into a FrameStore and never touch the disk. Every `flush_interval_s` the
+    writer thread formats the rows older than `hold_s` in one vectorized pass,
+    appends them to the touch log with the Clicked column filled in, and appends the
+    clicked rows to the clicked log. Holding rows back briefly lets a click that
+    arrives just after its frame was logged (serial button, trigger) still be
+    attributed to it. Memory use and the final flush are bounded by
+    frame rate x (hold_s + flush_interval_s), independent of session length.
+
+    Both files are written as <name>.part and renamed when close() completes, so an
+    existing final file always means a complete log and a crash leaves a readable
+    .part file with everything up to the last flush.
+    """
+
+    def __init__(self, path, clicked_path, schema, flush_interval_s=0.25, hold_s=0.5, fsync=False, sinks=()):
+        self.path = Path(path)
+        self.clicked_path = Path(clicked_path)
+        self.store = FrameStore(schema)
+        self.sinks = list(sinks)  # e.g. XlsxLogSink, fed on the writer thread alongside the CSV
+        self.flush_interval_s = flush_interval_s
+        self.hold_s = hold_s
+        self.fsync = fsync
+        self.rows_written = 0
+        self.clicked_written = 0
+        self._stopping = threading.Event()
+        self._thread = None
+        self._files = []
+
+        # Frame path entry points
+        self.append = self.store.append
+        self.mark_clicked_row = self.store.mark_clicked_row
+        self.mark_clicked = self.store.mark_clicked
+
+    def _part(self, path):
+        return path.with_name(path.name + ".part")
+
+    def start(self):
+        header = ",".join(self.store.headers) + "\r\n"
+        self._file = open(self._part(self.path), "w", newline="")
+        self._clicked_file = open(self._part(self.clicked_path), "w", newline="")
+        self._files = [self._file, self._clicked_file]
+        for f in self._files:
+            f.write(header)
+        for sink in self.sinks:
+            sink.open(self.store)
+        self._thread = threading.Thread(target=self._run, name="touch-log-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval_s):
+            self._flush(time.monotonic() - self.hold_s)
+        self._flush(None)
+
+    def _flush(self, cutoff):
+        """Write rows that arrived before `cutoff` (all rows if None)"""
+        written = 0
+        for chunk, start, end in self.store.drain(cutoff):
+            text, clicked_text = self.store.format_rows(chunk, start, end)
+            self._file.write(text)
+            if clicked_text:
+                self._clicked_file.write(clicked_text)
+                self.clicked_written += int(chunk.clicked[start:end].sum())
+            for sink in self.sinks:
+                sink.write(chunk, start, end)
+            written += end - start
+
+        if written:
+            self.rows_written += written
+            for f in self._files:
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+
+    def close(self):
+        """Write the remaining rows, close both files and move them to their final names"""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+        for f in self._files:
+            f.close()
+        for sink in self.sinks:
+            sink.close()
+        os.replace(self._part(self.path), self.path)
+        os.replace(self._part(self.clicked_path), self.clicked_path)
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+class ScreenFrame:
+    """Cached geometry of the screen rectangle spanned by the four corner markers.
+
+    Corners are ordered [top right, bottom right, bottom left, top left], matching
+    MARKER_TOP_RIGHT..MARKER_TOP_LEFT in the publisher. The plane normal, the
+    reference-line basis and the edge lengths are derived once and only rebuilt
+    when a corner moves more than `tolerance_mm` away from where it was at the
+    last rebuild, so per-frame work is a single (4, 3) @ (3,) projection.
+    """
+
+    def __init__(self, tolerance_mm=0.5):
+        self.tolerance_mm = tolerance_mm
+        self.corners = None      # (4, 3) corners the cached basis was built from
+        self.normal = None       # Unit normal of the plane through corners 0, 1, 3
+        self.width = 0.0         # |top right - bottom right|, edge 0-1
+        self.height = 0.0        # |top left - top right|, edge 0-3
+        self.reference_length = 0.0  # Left edge length (bottom left -> top left)
+        self.screen_height = 0.0     # Bottom edge length orthogonal to the left edge
+        self.rebuild_count = 0
+        # Rows: plane normal, bottom edge unit, reference-line axis, height axis
+        self._axes = np.zeros((4, 3))
+        self._offsets = np.zeros(4)
+        self._result = np.zeros(4)
+
+    def update(self, screen_corners):
+        """Refresh the cached basis if any corner moved past the tolerance.
+
+        Returns True if the basis was rebuilt.
+        """
+        if self.corners is not None and \
+           np.abs(screen_corners - self.corners).max() <= self.tolerance_mm:
+            return False
+        self._rebuild(np.array(screen_corners, dtype=np.float64))
+        return True
+
+    def _rebuild(self, corners):
+        p0, p1, p2, p3 = corners
+
+        normal = np.cross(p1 - p0, p3 - p0)
+        normal /= np.linalg.norm(normal)
+
+        # Reference line: left edge, bottom left (p2) to top left (p3)
+        reference_vector = p3 - p2
+        reference_length = np.linalg.norm(reference_vector)
+        reference_unit = reference_vector / reference_length
+
+        # Height direction: bottom edge made exactly perpendicular to the reference line
+        height_vector = p1 - p2
+        height_vector = height_vector - np.dot(height_vector, reference_unit) * reference_unit
+        screen_height = np.linalg.norm(height_vector)
+        height_direction = height_vector / screen_height
+
+        # Horizontal axis for x_local: bottom left to bottom right, unprojected
+        bottom_vector = p1 - p2
+        bottom_unit = bottom_vector / np.linalg.norm(bottom_vector)
+
+        # The reference-line distances are measured on the pen tip projected onto
+        # the plane. Folding the projection (I - n n^T) into the axes lets us skip it.
+        reference_axis = reference_unit - np.dot(reference_unit, normal) * normal
+        height_axis = height_direction - np.dot(height_direction, normal) * normal
+
+        self._axes[0] = normal
+        self._axes[1] = bottom_unit
+        self._axes[2] = reference_axis
+        self._axes[3] = height_axis
+        self._offsets[0] = np.dot(normal, p0)
+        self._offsets[1] = np.dot(bottom_unit, p2)
+        self._offsets[2] = np.dot(reference_axis, p2)
+        self._offsets[3] = np.dot(height_axis, p2)
+
+        self.corners = corners
+        self.normal = normal
+        self.width = float(np.linalg.norm(p1 - p0))
+        self.height = float(np.linalg.norm(p3 - p0))
+        self.reference_length = float(reference_length)
+        self.screen_height = float(screen_height)
+        self.rebuild_count += 1
+
+    def project(self, pen_tip):
+        """Project the pen tip into the cached screen frame.
+
+        Returns:
+            dist: absolute distance from the screen plane in mm
+            x_local: horizontal distance from the bottom left corner along the bottom edge, in mm
+            distance_from_reference: perpendicular distance from the left edge, in mm
+            is_valid: True if the projection onto the plane is within screen bounds
+        """
+        r = self._result
+        np.dot(self._axes, pen_tip, out=r)
+        r -= self._offsets
+        dist = abs(float(r[0]))
+        x_local = float(r[1])
+        distance_along_reference = float(r[2])
+        distance_from_reference = float(r[3])
+        is_valid = (0 <= distance_from_reference <= self.screen_height and
+                    0 <= distance_along_reference <= self.reference_length)
+        return dist, x_local, distance_from_reference, is_valid
@@ -0,0 +1,706 @@
+import time
+import threading
+from collections import deque
+
+import numpy as np
+
+from qtm_latency import LatencyHistogram, now_ns
+
+try:
+    import nidaqmx
+    from nidaqmx.constants import AcquisitionType, RegenerationMode
+except ImportError:  # Only the NI backend needs the driver; the simulated one runs anywhere
+    nidaqmx = None
+
+
+class HapticBackend:
+    """Analog output used for vibration. One instance owns one output channel.
+
+    configure_continuous() sets up a looping waveform that start()/stop() gate;
+    configure_burst() sets up a finite waveform that burst() plays once;
+    configure_stream() sets up non-regenerating output that is fed with write()
+    while running, samples_generated() telling how far the sample clock got.
+    """
+
+    name = "base"
+
+    def configure_continuous(self, waveform):
+        raise NotImplementedError
+
+    def configure_burst(self, waveform):
+        raise NotImplementedError
+
+    def configure_stream(self, buffer_samples):
+        raise NotImplementedError
+
+    def write(self, samples):
+        raise NotImplementedError
+
+    def samples_generated(self):
+        raise NotImplementedError
+
+    def start(self):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    def burst(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class NIDAQBackend(HapticBackend):
+    """NI-DAQ analog output via nidaqmx"""
+
+    name = "nidaqmx"
+
+    def __init__(self, device, fs, min_val=-10.0, max_val=10.0):
+        if nidaqmx is None:
+            raise RuntimeError("nidaqmx is not installed; use the simulated haptic backend")
+        self.fs = fs
+        self.task = nidaqmx.Task()
+        self.task.ao_channels.add_ao_voltage_chan(device, min_val=min_val, max_val=max_val)
+
+    def configure_continuous(self, waveform):
+        self.task.timing.cfg_samp_clk_timing(
+            rate=self.fs,
+            sample_mode=AcquisitionType.CONTINUOUS,
+            samps_per_chan=len(waveform)
+        )
+        self.task.write(waveform, auto_start=False)
+
+    def configure_burst(self, waveform):
+        self.task.timing.cfg_samp_clk_timing(
+            rate=self.fs,
+            sample_mode=AcquisitionType.FINITE,
+            samps_per_chan=len(waveform)
+        )
+        self.task.write(waveform, auto_start=False)
+
+    def configure_stream(self, buffer_samples):
+        self.task.timing.cfg_samp_clk_timing(
+            rate=self.fs,
+            sample_mode=AcquisitionType.CONTINUOUS,
+            samps_per_chan=buffer_samples
+        )
+        self.task.out_stream.regen_mode = RegenerationMode.DONT_ALLOW_REGENERATION
+        self.task.out_stream.output_buf_size = buffer_samples
+
+    def write(self, samples):
+        self.task.write(samples, auto_start=False, timeout=1.0)
+
+    def samples_generated(self):
+        return self.task.out_stream.total_samp_per_chan_generated
+
+    def start(self):
+        self.task.start()
+
+    def stop(self):
+        self.task.stop()
+
+    def burst(self):
+        self.task.start()
+        self.task.wait_until_done(timeout=1.0)
+        self.task.stop()
+
+    def close(self):
+        self.task.close()
+
+
+class SimulatedDAQBackend(HapticBackend):
+    """Hardware-free DAQ model for latency and throughput tests.
+
+    Calls block like the driver does: start() costs `start_latency_ms`, stop() costs
+    `stop_latency_ms` and burst() additionally waits for the waveform to play out at
+    the sample clock. Every emitted waveform is recorded in `emitted` as a dict with
+    perf_counter timestamps (the command time, the first and the last sample time)
+    and its peak level. Streamed output records each write() block, timed on the
+    modelled sample clock; blocks written before start() get their sample times when
+    the clock starts. `emitted` keeps the last `max_records` entries; report() works
+    from statistics aggregated as the output runs, so a session-long stream stays
+    in fixed memory.
+    """
+
+    name = "simulated"
+
+    def __init__(self, fs, start_latency_ms=2.0, stop_latency_ms=0.5, max_records=1000):
+        self.fs = fs
+        self.start_latency_s = start_latency_ms / 1000.0
+        self.stop_latency_s = stop_latency_ms / 1000.0
+        self.waveform = None
+        self.mode = None
+        self.emitted = deque(maxlen=max_records)
+        self.blocks = 0
+        self.latency = LatencyHistogram()  # Command to first sample of audible output, us
+        self.burst_count = 0
+        self._first_burst_at = None
+        self._last_burst_end = None
+        self._unclocked = []  # Stream blocks written before start(), timed when the clock starts
+        self._started_at = None
+        self._start_command_at = None
+
+    def _record(self, entry):
+        self.emitted.append(entry)
+        self.blocks += 1
+        if entry["first_sample_at"] is None:
+            self._unclocked.append(entry)
+        else:
+            self._clocked(entry)
+
+    def _clocked(self, entry):
+        """Fold an entry whose sample times are known into the running statistics"""
+        if not entry.get("silent"):
+            self.latency.record((entry["first_sample_at"] - entry["command_at"]) * 1e6)
+        if entry["kind"] == "burst":
+            self.burst_count += 1
+            if self._first_burst_at is None:
+                self._first_burst_at = entry["command_at"]
+            self._last_burst_end = entry["last_sample_at"]
+
+    def configure_continuous(self, waveform):
+        self.mode = "continuous"
+        self.waveform = np.asarray(waveform)
+
+    def configure_burst(self, waveform):
+        self.mode = "burst"
+        self.waveform = np.asarray(waveform)
+
+    def configure_stream(self, buffer_samples):
+        self.mode = "stream"
+        self.buffer_samples = buffer_samples
+        self.stream_written = 0
+        self.underflows = 0
+
+    def write(self, samples):
+        """Queue samples; blocks like the driver while the output buffer is full"""
+        command_at = time.perf_counter()
+        first_sample_at = None
+        if self._started_at is not None:
+            while self.stream_written + len(samples) - self.samples_generated() > self.buffer_samples:
+                time.sleep(0.0005)
+            clocked = int((time.perf_counter() - self._started_at) * self.fs)
+            if clocked > self.stream_written:
+                # Buffer ran dry; the card would raise, the model counts and carries on
+                self.underflows += 1
+                self._started_at += (clocked - self.stream_written) / self.fs
+            first_sample_at = self._started_at + self.stream_written / self.fs
+        peak = float(np.abs(samples).max()) if len(samples) else 0.0
+        self._record({
+            "kind": "stream",
+            "command_at": command_at,
+            "first_sample_at": first_sample_at,
+            "last_sample_at": None if first_sample_at is None else first_sample_at + (len(samples) - 1) / self.fs,
+            "samples": len(samples),
+            "first_sample": self.stream_written,
+            "silent": peak == 0.0,
+            "peak": peak,
+        })
+        self.stream_written += len(samples)
+
+    def samples_generated(self):
+        if self._started_at is None:
+            return 0
+        return min(int((time.perf_counter() - self._started_at) * self.fs), self.stream_written)
+
+    def start(self):
+        self._start_command_at = time.perf_counter()
+        time.sleep(self.start_latency_s)
+        self._started_at = time.perf_counter()
+        if self.mode == "stream":
+            # Prefilled blocks: clocked out from the start, waiting since the start command
+            for e in self._unclocked:
+                e["first_sample_at"] = self._started_at + e["first_sample"] / self.fs
+                e["last_sample_at"] = e["first_sample_at"] + (e["samples"] - 1) / self.fs
+                self._clocked(e)
+            self._unclocked.clear()
+
+    def stop(self):
+        if self._started_at is None:
+            return
+        if self.mode == "stream":
+            self._started_at = None
+            time.sleep(self.stop_latency_s)
+            return
+        stopped_at = time.perf_counter()
+        # Regenerating output: whole samples clocked out since start
+        sample_count = int((stopped_at - self._started_at) * self.fs)
+        self._record({
+            "kind": "continuous",
+            "command_at": self._start_command_at,
+            "first_sample_at": self._started_at,
+            "last_sample_at": self._started_at + max(sample_count - 1, 0) / self.fs,
+            "samples": sample_count,
+            "peak": float(np.abs(self.waveform).max()),
+        })
+        self._started_at = None
+        time.sleep(self.stop_latency_s)
+
+    def burst(self):
+        command_at = time.perf_counter()
+        time.sleep(self.start_latency_s)
+        first_sample_at = time.perf_counter()
+        duration = len(self.waveform) / self.fs
+        time.sleep(duration)
+        self._record({
+            "kind": "burst",
+            "command_at": command_at,
+            "first_sample_at": first_sample_at,
+            "last_sample_at": first_sample_at + (len(self.waveform) - 1) / self.fs,
+            "samples": len(self.waveform),
+            "peak": float(np.abs(self.waveform).max()),
+        })
+        time.sleep(self.stop_latency_s)
+
+    def report(self):
+        """Command-to-first-sample latency (ms) and burst throughput of the recorded output.
+
+        Silent stream blocks (idle zeros) are counted but left out of the latency.
+        """
+        latency = self.latency
+        if latency.count == 0:
+            return {"emitted": 0, "blocks": self.blocks}
+        report = {
+            "emitted": latency.count,
+            "blocks": self.blocks,
+            "latency_mean_ms": latency.total / latency.count / 1000.0,
+            "latency_p95_ms": latency.percentile(95) / 1000.0,
+            "latency_max_ms": latency.max / 1000.0,
+        }
+        if self.burst_count > 1:
+            span = self._last_burst_end - self._first_burst_at
+            report["bursts_per_s"] = self.burst_count / span if span > 0 else 0.0
+        if self.mode == "stream":
+            report["underflows"] = self.underflows
+        return report
+
+
+def create_backend(name, device, fs):
+    """Create a haptic backend by name (HAPTIC_BACKEND in the publisher)"""
+    if name == "nidaqmx":
+        return NIDAQBackend(device, fs)
+    if name == "simulated":
+        return SimulatedDAQBackend(fs)
+    raise ValueError(f"Unknown haptic backend: {name}")
+
+
+class ContactDebouncer:
+    """Debounced touch/no-touch decision for continuous vibration.
+
+    Contact starts below `touch_mm` and only ends above `release_mm`, so noise
+    around a single threshold cannot chatter, and a new state must hold for
+    `hold_frames` consecutive frames before it is reported.
+    """
+
+    def __init__(self, touch_mm=8.0, release_mm=9.0, hold_frames=3):
+        self.touch_mm = touch_mm
+        self.release_mm = release_mm
+        self.hold_frames = hold_frames
+        self.touching = False
+        self._pending = 0
+
+    def update(self, is_valid_position, distance):
+        """Feed one frame; returns (touching, changed)"""
+        limit = self.release_mm if self.touching else self.touch_mm
+        raw = bool(is_valid_position and distance < limit)
+        if raw == self.touching:
+            self._pending = 0
+            return self.touching, False
+        self._pending += 1
+        if self._pending < self.hold_frames:
+            return self.touching, False
+        self._pending = 0
+        self.touching = raw
+        return self.touching, True
+
+
+class StreamFeeder:
+    """Base for outputs fed by a thread into a non-regenerating, always-running task.
+
+    The buffer holds at most `buffer_samples`; subclasses implement _run() and use
+    _wait_until_ahead() to sample their inputs as late as possible before a write.
+    A driver error (e.g. an underflow) ends the feeder thread; it is logged and kept
+    in `error`, which the owner polls to restart the output.
+    """
+
+    def __init__(self, backend, buffer_samples, prefill_samples):
+        self.backend = backend
+        self.buffer_samples = buffer_samples
+        self.prefill_samples = prefill_samples
+        self._written = 0
+        self._stopping = False
+        self._thread = None
+        self.error = None
+
+    def start(self):
+        self.error = None
+        self.backend.configure_stream(self.buffer_samples)
+        # Non-regenerating output needs data queued before the clock starts
+        self._write(np.zeros(self.prefill_samples))
+        self.backend.start()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._feed, name=f"haptic-{type(self).__name__}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.backend.stop()
+
+    def _write(self, samples):
+        self.backend.write(samples)
+        self._written += len(samples)
+
+    def _ahead(self):
+        """Samples queued but not yet clocked out"""
+        return self._written - self.backend.samples_generated()
+
+    def _wait_until_ahead(self, limit):
+        """Sleep until at most `limit` samples are queued; returns the queued count"""
+        while True:
+            ahead = self._ahead()
+            if ahead <= limit:
+                return ahead
+            time.sleep((ahead - limit) / self.backend.fs)
+
+    def _feed(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.error = e
+            print(f"❌ {type(self).__name__} feeder stopped: {e}")
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class StreamedOutput(StreamFeeder):
+    """Continuous vibration from an output task that runs for the whole session.
+
+    A feeder thread keeps a non-regenerating buffer of `buffer_blocks` half-period
+    blocks filled, writing the sine when the gate is open and zeros when it is
+    closed. Blocks start and end at 0 V and a gate opening always starts on the
+    rising half-cycle, so switching is glitch-free. The gate state is read just
+    before each block is written, so a change reaches the output within about
+    `buffer_blocks` half-periods, with no driver call on the frame path.
+
+    Every gate change is recorded in `gate_events` with perf_counter_ns stamps:
+    requested (frame path), written (first block with the new state queued) and
+    output (estimated time that block's first sample is clocked out, from the
+    samples still ahead of it in the buffer).
+    """
+
+    def __init__(self, backend, cycle, buffer_blocks=2, tracer=None, max_events=10000):
+        half = len(cycle) // 2
+        self.on_blocks = [np.asarray(cycle[:half], dtype=np.float64), np.asarray(cycle[half:], dtype=np.float64)]
+        self.zero_block = np.zeros(half)
+        buffer_samples = buffer_blocks * max(len(b) for b in self.on_blocks)
+        super().__init__(backend, buffer_samples, buffer_samples - buffer_samples % half)
+        self.tracer = tracer
+        self.gate_events = deque(maxlen=max_events)
+        self._gate = (False, 0)  # (open, requested_ns), replaced atomically by set_gate()
+        self._at_rest = threading.Event()  # Set by the feeder once the whole buffer is zeros
+
+    def set_gate(self, is_open, requested_ns=0):
+        """Open or close the gate from the frame path. Never blocks."""
+        self._gate = (is_open, requested_ns or now_ns())
+
+    def stop(self, timeout=2.0):
+        # Close the gate and wait until the feeder has filled the buffer with zeros,
+        # so the output rests at 0 V when the task stops
+        self._at_rest.clear()
+        self._gate = (False, now_ns())
+        if self.error is None and self._thread is not None:
+            self._at_rest.wait(timeout)
+        super().stop(timeout)
+
+    def _run(self):
+        output_open = False
+        phase = 0
+        zeros_queued = 0  # Consecutive zero samples written since the gate closed
+        while not self._stopping:
+            block_size = len(self.on_blocks[phase] if output_open else self.zero_block)
+            ahead = self._wait_until_ahead(self.buffer_samples - block_size)
+            is_open, requested_ns = self._gate
+            if is_open != output_open:
+                written_ns = now_ns()
+                output_ns = written_ns + int(ahead * 1e9 / self.backend.fs)
+                self.gate_events.append({
+                    "open": is_open,
+                    "requested_ns": requested_ns,
+                    "written_ns": written_ns,
+                    "output_ns": output_ns,
+                })
+                if self.tracer is not None:
+                    self.tracer.record("gate_requested->gate_written", requested_ns, written_ns)
+                    self.tracer.record("gate_requested->gate_output", requested_ns, output_ns)
+                output_open = is_open
+                phase = 0
+            if output_open:
+                block = self.on_blocks[phase]
+                phase ^= 1
+                zeros_queued = 0
+            else:
+                block = self.zero_block
+                zeros_queued += len(block)
+            self._write(block)
+            if zeros_queued >= self.buffer_samples and not is_open:
+                self._at_rest.set()
+
+    def summary(self):
+        """Gate change count and request-to-output latency statistics (ms)"""
+        latencies_ms = np.array([(e["output_ns"] - e["requested_ns"]) / 1e6 for e in self.gate_events])
+        stats = {"gate_changes": len(latencies_ms), "buffer_ms": self.buffer_samples * 1000.0 / self.backend.fs}
+        if len(latencies_ms):
+            stats.update(
+                onset_mean_ms=float(latencies_ms.mean()),
+                onset_p95_ms=float(np.percentile(latencies_ms, 95)),
+                onset_max_ms=float(latencies_ms.max()),
+            )
+        return stats
+
+
+class BurstTimeline(StreamFeeder):
+    """Pre-armed burst output on an always-running streamed task.
+
+    The output idles on `lead_ms` zero blocks, refilled whenever only `lead_ms` of
+    samples is left queued, so the buffer never holds less than that: a short stall
+    of the feeder thread must not run it dry, since an underflow is fatal on the card.
+    burst() is a single deque append from the frame path; the feeder thread splices
+    the burst waveform in behind the queued zeros, so it reaches the output between
+    `lead_ms` and twice that later, with no task start/stop per burst. stop() lets
+    the bursts already accepted play out and waits for the output to rest at 0 V.
+
+    Requests that arrive while a burst is playing (or waiting) follow `policy`:
+      - "queue": played back-to-back, at most `max_pending` waiting; extra ones are dropped.
+      - "merge": all of them collapse into one follow-up burst.
+      - "drop":  ignored until the current burst has finished.
+    Back-to-back playback bounds the sustained rate at fs / len(waveform); summary()
+    reports it next to the observed peak rate and the request-to-output latency.
+    """
+
+    POLICIES = ("queue", "merge", "drop")
+
+    def __init__(self, backend, waveform, lead_ms=20.0, policy="queue", max_pending=4,
+                 tracer=None, max_events=10000):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown burst policy: {policy}")
+        self.waveform = np.asarray(waveform, dtype=np.float64)
+        self.lead_samples = max(2, int(lead_ms * backend.fs / 1000.0))
+        self.idle_block = np.zeros(self.lead_samples)
+        super().__init__(backend, self.lead_samples + max(self.lead_samples, len(self.waveform)), self.lead_samples)
+        self.policy = policy
+        self.max_pending = 1 if policy == "merge" else max_pending
+        self.tracer = tracer
+        self.burst_events = deque(maxlen=max_events)
+        self.counts = {"requested": 0, "played": 0, "merged": 0, "dropped": 0}
+        self._requests = deque()
+        self._pending = deque()
+        self._lock = threading.Lock()  # Moving requests to _pending vs. depth() from other threads
+        self._burst_end = 0  # Sample index where the last written burst ends
+        self._closing = False
+        self._at_rest = threading.Event()  # Set by the feeder once stop() was called and no burst is left to play
+
+    def burst(self, requested_ns=0):
+        """Request one burst from the frame path. Never blocks."""
+        self.counts["requested"] += 1
+        if self._closing:
+            self.counts["dropped"] += 1
+            return
+        self._requests.append(requested_ns or now_ns())
+
+    def stop(self, timeout=2.0):
+        # Play the bursts already accepted, then wait until the last one has been
+        # clocked out, so the output rests at 0 V when the task stops
+        self._at_rest.clear()
+        self._closing = True
+        if self.error is None and self._thread is not None:
+            self._at_rest.wait(timeout)
+        super().stop(timeout)
+
+    def depth(self):
+        """Bursts requested or waiting but not yet written; safe from any thread"""
+        with self._lock:
+            return len(self._pending) + len(self._requests)
+
+    def _admit_requests(self):
+        playing = self._burst_end > self.backend.samples_generated()
+        with self._lock:
+            while True:
+                try:
+                    requested_ns = self._requests.popleft()
+                except IndexError:
+                    return
+                if self.policy == "drop" and (playing or self._pending):
+                    self.counts["dropped"] += 1
+                elif self.policy == "merge" and self._pending:
+                    self.counts["merged"] += 1
+                elif len(self._pending) >= self.max_pending:
+                    self.counts["dropped"] += 1
+                else:
+                    self._pending.append(requested_ns)
+
+    def _idle_until_ahead(self, limit):
+        """Like _wait_until_ahead(), but returns early when a burst is requested"""
+        poll = max(1, self.backend.fs // 1000)  # Check for requests every millisecond
+        while True:
+            ahead = self._ahead()
+            if ahead <= limit or self._requests:
+                return ahead
+            time.sleep(min(ahead - limit, poll) / self.backend.fs)
+
+    def _run(self):
+        while not self._stopping:
+            self._admit_requests()
+            if not self._pending:
+                if self._closing and not self._requests and self._burst_end <= self.backend.samples_generated():
+                    self._at_rest.set()
+                ahead = self._idle_until_ahead(self.lead_samples)
+                if ahead <= self.lead_samples:
+                    self._write(self.idle_block)
+                continue
+
+            ahead = self._wait_until_ahead(self.buffer_samples - len(self.waveform))
+            with self._lock:
+                requested_ns = self._pending.popleft()
+            written_ns = now_ns()
+            output_ns = written_ns + int(ahead * 1e9 / self.backend.fs)
+            self._write(self.waveform)
+            self._burst_end = self._written
+            self.counts["played"] += 1
+            self.burst_events.append({"requested_ns": requested_ns, "written_ns": written_ns, "output_ns": output_ns})
+            if self.tracer is not None:
+                self.tracer.record("burst_requested->burst_output", requested_ns, output_ns)
+
+    def max_sustained_rate(self):
+        """Bursts per second when played back-to-back"""
+        return self.backend.fs / len(self.waveform)
+
+    def summary(self):
+        """Counts, sustained/peak burst rates and request-to-output latency (ms)"""
+        events = list(self.burst_events)
+        stats = dict(self.counts)
+        stats["max_sustained_rate_hz"] = self.max_sustained_rate()
+        if events:
+            outputs = np.array([e["output_ns"] for e in events]) / 1e9
+            latencies_ms = np.array([(e["output_ns"] - e["requested_ns"]) / 1e6 for e in events])
+            # Peak number of burst onsets within any one-second window
+            per_window = np.searchsorted(outputs, outputs + 1.0) - np.arange(len(outputs))
+            stats.update(
+                peak_rate_hz=int(per_window.max()),
+                latency_mean_ms=float(latencies_ms.mean()),
+                latency_p95_ms=float(np.percentile(latencies_ms, 95)),
+                latency_max_ms=float(latencies_ms.max()),
+            )
+        return stats
+
+
+class HapticWorker:
+    """Runs haptic output commands on a dedicated thread.
+
+    The QTM frame callback only calls submit(), which appends to a bounded deque
+    (append/popleft are atomic, so no lock is taken on the frame path) and never
+    waits for the DAQ. The worker drains the queue in batches:
+      - "start"/"stop" are level commands: only the last one in a batch is run,
+        earlier ones are counted as coalesced.
+      - "burst" commands older than `stale_ms` are dropped instead of played late.
+      - When the queue is full the oldest command is discarded.
+    The time every command spent in the queue is recorded in `waits` and, if a
+    LatencyTracer is given, as "haptic_issued->daq_command" plus the per-command
+    driver time as "daq_<command>".
+    """
+
+    LEVEL_COMMANDS = ("start", "stop")
+
+    def __init__(self, handlers, max_queue=64, stale_ms=50.0, max_wait_log=10000, tracer=None):
+        self.handlers = handlers  # command name -> callable run on the worker thread
+        self.tracer = tracer
+        self.max_queue = max_queue
+        self.stale_s = stale_ms / 1000.0
+        self._queue = deque(maxlen=max_queue)
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self.waits = deque(maxlen=max_wait_log)  # (command, queue wait in s)
+        self.counts = {"submitted": 0, "executed": 0, "coalesced": 0, "stale": 0, "overflow": 0, "errors": 0}
+
+    def start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="haptic-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, command):
+        """Enqueue a command from the frame path. Never blocks."""
+        if len(self._queue) >= self.max_queue:
+            self.counts["overflow"] += 1
+        self._queue.append((command, time.perf_counter()))
+        self.counts["submitted"] += 1
+        self._wakeup.set()
+
+    def queue_depth(self):
+        return len(self._queue)
+
+    def _drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.popleft())
+            except IndexError:
+                return batch
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(0.1)
+            self._wakeup.clear()
+            batch = self._drain()
+            if not batch:
+                continue
+
+            # Index of the last level command; earlier start/stops are superseded
+            last_level = -1
+            for i, (command, _) in enumerate(batch):
+                if command in self.LEVEL_COMMANDS:
+                    last_level = i
+
+            for i, (command, queued_at) in enumerate(batch):
+                wait = time.perf_counter() - queued_at
+                if command in self.LEVEL_COMMANDS and i != last_level:
+                    self.counts["coalesced"] += 1
+                    continue
+                if command not in self.LEVEL_COMMANDS and wait > self.stale_s:
+                    self.counts["stale"] += 1
+                    continue
+                self.waits.append((command, wait))
+                try:
+                    started = time.perf_counter()
+                    self.handlers[command]()
+                    self.counts["executed"] += 1
+                    if self.tracer is not None:
+                        self.tracer.record_us("haptic_issued->daq_command", wait * 1e6)
+                        self.tracer.record_us(f"daq_{command}", (time.perf_counter() - started) * 1e6)
+                except Exception as e:
+                    self.counts["errors"] += 1
+                    print(f"Haptic worker error ({command}): {e}")
+
+    def summary(self):
+        """Counts plus queue-wait statistics (ms) of the executed commands."""
+        waits_ms = np.array([w for _, w in self.waits]) * 1000.0
+        stats = dict(self.counts)
+        if len(waits_ms):
+            stats.update(
+                wait_mean_ms=float(waits_ms.mean()),
+                wait_p95_ms=float(np.percentile(waits_ms, 95)),
+                wait_max_ms=float(waits_ms.max()),
+            )
+        return stats
@@ -0,0 +1,245 @@
+import os
+import queue
+import struct
+import time
+
+import zmq
+
+from qtm_wire import decode_frame, peek_frame
+from qtm_latency import LatencyTracer, now_ns
+from qtm_metrics import MetricsRegistry, MetricsReporter
+from qtm_lifecycle import LifecycleClient
+
+# Messages to the GUI (events queue):
+#   ("config", config_dict)                                   config of the next block arrived
+#   ("run_start",)                                            publisher is streaming frames for the block
+#   ("log_complete", paths)                                   publisher closed its logs (also sets log_complete)
+#   ("session_end",)                                          last block done, the GUI may exit
+#   ("trigger", frame, x_local, status, t_packet_in, t_received)  outside -> inside transition
+#   ("frame", frame, x_local, status)                         latest pen state, at most ui_update_hz
+# Messages from the GUI (control queue):
+#   ("target", rect_x_mm, rect_x_end_mm)                      new target bounds
+#   ("block_done",)                                           block saved, GUI back on its start screen
+#   ("stop",)                                                 finish, dump latency histograms, exit
+
+DEFAULT_SETTINGS = {
+    "host": "localhost",
+    "port": 5555,
+    "config_port": 5556,
+    "topic": "qtm_data",
+    "conflate": False,
+    "rcvhwm": 64,
+    "max_drain": 1000,
+    "metrics_port": 5558,
+    "ui_update_hz": 30.0,
+    "canvas_size": None,  # (width, height) px of the GUI canvas, reported to the publisher with ready
+}
+
+
+def run_ingest(events, control, log_complete, settings=None):
+    """Entry point of the ingest process started by qtm_zmq_subscriber.py"""
+    IngestWorker(events, control, log_complete, dict(DEFAULT_SETTINGS, **(settings or {}))).run()
+
+
+class IngestWorker:
+    """Receives the qtm_data feed and runs the trigger state machine, away from Tk.
+
+    Each wake-up drains every pending message without blocking, records frame gaps
+    and backlog age, and decodes only the newest frame. The GUI gets trigger events
+    and throttled pen-state updates through a multiprocessing queue that it polls in
+    batches, so rendering jitter never slows ingest and vice versa.
+    """
+
+    def __init__(self, events, control, log_complete, settings):
+        self.events = events
+        self.control = control
+        self.log_complete = log_complete  # multiprocessing.Event the GUI waits on at teardown
+        self.settings = settings
+        self.topic = settings["topic"].encode()
+        self.config = None
+        self.block_open = False  # Between a block's config and its log_complete
+        self.lifecycle = None
+        self.rect_x_mm = None
+        self.rect_x_end_mm = None
+        self.previous_inside = False
+        self.last_frame = None
+        self.running = True
+        self._next_ui_update = 0.0
+
+        self.latency_tracer = LatencyTracer("subscriber-ingest")
+        self.metrics = MetricsRegistry("subscriber")
+        self.metric_zmq_received = self.metrics.counter("zmq_received")
+        self.metric_decode_errors = self.metrics.counter("decode_errors")
+        self.metric_triggers = self.metrics.counter("triggers")
+        self.metric_frames_skipped = self.metrics.counter("frames_skipped")  # Drained but superseded by a newer frame
+        self.metric_frame_gaps = self.metrics.counter("frame_gaps")          # Frame numbers never received
+        self.metric_backlog_depth = self.metrics.gauge("backlog_depth")      # Messages drained at the last wake-up
+        self.metric_backlog_age = self.metrics.distribution("backlog_age_us")  # Age of the oldest drained message
+        self.metric_frame_age = self.metrics.distribution("frame_age_us")    # Publisher packet in -> received here
+        self.metrics.gauge("gui_queue_depth", self._events_depth)
+        self.metrics_reporter = MetricsReporter(self.metrics, settings["metrics_port"],
+                                                summary_counters=("zmq_received", "decode_errors", "triggers"))
+
+    def _events_depth(self):
+        try:
+            return self.events.qsize()
+        except NotImplementedError:  # macOS
+            return -1
+
+    def _session_prefix(self):
+        c = self.config
+        return os.path.join(c["participant_folder"],
+                            f"{c['participant_name']}_{c['conditions']}_ID{c['ID']}_{c['attempts']}_{c['delaytime']}")
+
+    def run(self):
+        ctx = zmq.Context()
+        data_socket = ctx.socket(zmq.SUB)
+        data_socket.setsockopt(zmq.RCVHWM, self.settings["rcvhwm"])
+        if self.settings["conflate"]:
+            data_socket.setsockopt(zmq.CONFLATE, 1)  # Must be set before connect
+        connect_addr = f"tcp://{self.settings['host']}:{self.settings['port']}"
+        data_socket.connect(connect_addr)
+        data_socket.setsockopt_string(zmq.SUBSCRIBE, self.settings["topic"])
+
+        # Lifecycle handshake with the publisher (qtm_lifecycle.py); announce we are subscribed
+        lifecycle = LifecycleClient(ctx, self.settings["host"], self.settings["config_port"])
+        canvas_size = self.settings["canvas_size"]
+        lifecycle.send("ready", {"canvas_width": canvas_size[0], "canvas_height": canvas_size[1]} if canvas_size else None)
+        self.lifecycle = lifecycle
+
+        poller = zmq.Poller()
+        poller.register(data_socket, zmq.POLLIN)
+        poller.register(lifecycle.socket, zmq.POLLIN)
+
+        print(f"\U0001F4E1 Connected to {connect_addr}")
+        print(f"\U0001F4E5 Subscribed to topic: '{self.settings['topic']}'")
+        print("\U0001F7E2 Waiting for data...\n")
+        self.metrics_reporter.start()
+
+        while self.running:
+            try:
+                ready = dict(poller.poll(10))
+                self._handle_control()
+                if lifecycle.socket in ready:
+                    try:
+                        self._handle_lifecycle(lifecycle)
+                    except Exception as e:
+                        # Tell the publisher instead of leaving it waiting for an ack that never comes
+                        lifecycle.send("error", {"message": str(e)})
+                        raise
+                if data_socket in ready:
+                    self._handle_data(data_socket)
+            except Exception as e:
+                print(f"❌ ZMQ error: {e}")
+                time.sleep(0.1)
+
+        self.metrics_reporter.stop()
+        if self.block_open:
+            self._dump_latency()
+        data_socket.close()
+        lifecycle.close()
+        ctx.term()
+        print("🛑 ZMQ listener stopped.")
+
+    def _handle_control(self):
+        while True:
+            try:
+                message = self.control.get_nowait()
+            except queue.Empty:
+                return
+            if message[0] == "target":
+                _, self.rect_x_mm, self.rect_x_end_mm = message
+            elif message[0] == "block_done":
+                self.lifecycle.send("block_done")
+            elif message[0] == "stop":
+                self.running = False
+
+    def _handle_lifecycle(self, lifecycle):
+        command, payload = lifecycle.recv()
+        if command == "config":
+            # Next block: forget the previous block's target and frame numbering
+            self.config = payload
+            self.block_open = True
+            self.rect_x_mm = self.rect_x_end_mm = None
+            self.previous_inside = False
+            self.last_frame = None
+            self.latency_tracer = LatencyTracer("subscriber-ingest")
+            self.metrics_reporter.set_snapshot_path(self._session_prefix() + "_metrics_subscriber.jsonl")
+            self.events.put(("config", self.config))
+            lifecycle.send("config_ack")
+        elif command == "run_start":
+            self.events.put(("run_start",))
+        elif command == "log_complete":
+            self.log_complete.set()
+            self.events.put(("log_complete", payload))
+            lifecycle.send("log_complete_ack")
+            self._dump_latency()
+            self.block_open = False
+        elif command == "session_end":
+            self.events.put(("session_end",))
+
+    def _dump_latency(self):
+        self.latency_tracer.print_summary()
+        self.latency_tracer.dump(self._session_prefix() + "_latency_subscriber_ingest.json")
+
+    def _payload_of(self, parts):
+        # [topic, payload], or topic + payload in one frame when the publisher sends single frames
+        return parts[1] if len(parts) > 1 else parts[0][len(self.topic):]
+
+    def _handle_data(self, socket):
+        # Drain whatever is pending without blocking and act on the newest frame only,
+        # so a slow consumer never works through stale positions
+        batch = []
+        while len(batch) < self.settings["max_drain"]:
+            try:
+                batch.append(self._payload_of(socket.recv_multipart(zmq.NOBLOCK)))
+            except zmq.Again:
+                break
+        if not batch:
+            return
+        t_received = now_ns()
+        self.metric_zmq_received.inc(len(batch))
+        self.metric_frames_skipped.inc(len(batch) - 1)
+        self.metric_backlog_depth.set(len(batch))
+
+        # Frame gaps (dropped by ZMQ, conflated, or rejected by the publisher) and backlog age
+        for i, queued in enumerate(batch):
+            try:
+                frame, t_sent = peek_frame(queued)
+            except (ValueError, KeyError, IndexError, struct.error):
+                continue
+            if self.last_frame is not None and frame > self.last_frame + 1:
+                self.metric_frame_gaps.inc(frame - self.last_frame - 1)
+            self.last_frame = frame
+            if i == 0 and t_sent:
+                self.metric_backlog_age.record((t_received - t_sent) / 1000.0)
+
+        try:
+            data = decode_frame(batch[-1])
+        except ValueError:
+            self.metric_decode_errors.inc()
+            return
+        t_packet_in = data.get('t_packet_in', 0)
+        self.latency_tracer.record("zmq_sent->received", data.get('t_sent', 0), t_received)
+        self.latency_tracer.record("packet_in->received", t_packet_in, t_received)
+        if t_packet_in:
+            self.metric_frame_age.record((t_received - t_packet_in) / 1000.0)
+
+        frame = data['frame']
+        x_local = data.get('x_local')
+        status = data.get('status', 'unknown')
+
+        # Calculate inside_bounds based on x_local position and actual target bounds
+        if x_local is not None and self.rect_x_mm is not None and self.rect_x_end_mm is not None:
+            inside_bounds = (self.rect_x_mm <= abs(x_local) <= self.rect_x_end_mm)
+        else:
+            inside_bounds = False
+
+        # State Machine: Trigger only on transition from 0 → 1 (outside → inside)
+        if inside_bounds and not self.previous_inside:
+            self.metric_triggers.inc()
+            self.events.put(("trigger", frame, x_local, status, t_packet_in, t_received))
+        elif time.monotonic() >= self._next_ui_update:
+            self._next_ui_update = time.monotonic() + 1.0 / self.settings["ui_update_hz"]
+            self.events.put(("frame", frame, x_local, status))
+        self.previous_inside = inside_bounds
@@ -0,0 +1,116 @@
+import json
+import time
+import numpy as np
+
+# All stage stamps are time.perf_counter_ns(). It is system-wide monotonic on Windows
+# (QueryPerformanceCounter) and Linux (CLOCK_MONOTONIC), so publisher and subscriber
+# stamps taken on the same machine can be subtracted directly.
+now_ns = time.perf_counter_ns
+
+
+class LatencyHistogram:
+    """HDR-style histogram of latencies in microseconds.
+
+    Values are bucketed log-linearly: each power-of-two range is split into
+    SUB_BUCKETS/2 linear sub-buckets, so any recorded value is reproduced within
+    ~1.6% (SUB_BUCKETS = 128) while memory stays fixed. record() is O(1).
+    """
+
+    SUB_BITS = 7
+    SUB_BUCKETS = 1 << SUB_BITS
+    HALF = SUB_BUCKETS >> 1
+    MAX_BUCKET = 36  # 2^(36 + 7) us, far beyond any session
+
+    def __init__(self):
+        self.counts = np.zeros((self.MAX_BUCKET + 2) * self.HALF, dtype=np.int64)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def _index(self, value):
+        bucket = max(0, value.bit_length() - self.SUB_BITS)
+        return min(bucket, self.MAX_BUCKET) * self.HALF + (value >> bucket)
+
+    def _value(self, index):
+        """Upper edge of the sub-bucket, i.e. the largest value it can hold"""
+        if index < self.SUB_BUCKETS:
+            return index
+        bucket = index // self.HALF - 1
+        sub = index - bucket * self.HALF
+        return ((sub + 1) << bucket) - 1
+
+    def record(self, value_us):
+        value = max(0, int(value_us))
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        if self.count == 0:
+            return None
+        target = max(1, int(np.ceil(self.count * p / 100.0)))
+        index = int(np.searchsorted(np.cumsum(self.counts), target))
+        return min(self._value(index), self.max)
+
+    def summary(self):
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min_us": self.min,
+            "mean_us": self.total / self.count,
+            "p50_us": self.percentile(50),
+            "p90_us": self.percentile(90),
+            "p99_us": self.percentile(99),
+            "p99_9_us": self.percentile(99.9),
+            "max_us": self.max,
+        }
+
+    def buckets(self):
+        """Non-empty buckets as [upper value in us, count] pairs"""
+        return [[self._value(int(i)), int(self.counts[i])] for i in np.flatnonzero(self.counts)]
+
+
+class LatencyTracer:
+    """Per-stage latency histograms, keyed by "<from>-><to>" stage names"""
+
+    def __init__(self, process_name):
+        self.process_name = process_name
+        self.histograms = {}
+
+    def record(self, name, start_ns, end_ns):
+        """Record end - start for a stage pair; ignored if either stamp is missing"""
+        if not start_ns or not end_ns:
+            return
+        self.record_us(name, (end_ns - start_ns) / 1000.0)
+
+    def record_us(self, name, value_us):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.record(value_us)
+
+    def print_summary(self):
+        print(f"⏱️ Latency ({self.process_name}), us:")
+        for name, histogram in self.histograms.items():
+            s = histogram.summary()
+            print(f"  {name:32s} n={s['count']:6d}  p50={s['p50_us']:8d}  p99={s['p99_us']:8d}  max={s['max_us']:8d}")
+
+    def dump(self, path):
+        """Write summaries and bucket counts of every stage to a JSON file"""
+        data = {
+            "process": self.process_name,
+            "clock": "perf_counter_ns",
+            "stages": {
+                name: {"summary": h.summary(), "buckets": h.buckets()}
+                for name, h in self.histograms.items()
+            },
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"✅ Latency histograms saved to: {path}")
@@ -0,0 +1,93 @@
+import json
+import time
+from collections import deque
+
+import zmq
+
+# Session lifecycle between publisher (ROUTER, binds ZMQ_CONFIG_PORT) and subscriber
+# (DEALER, connects). Every message is [command, JSON payload]; each step is acknowledged,
+# so neither side needs fixed sleeps or resends:
+#
+#   subscriber -> publisher   ready {canvas size}    ingest is up and subscribed to qtm_data
+#   publisher  -> subscriber  config {...}           block config and screen calibration
+#   subscriber -> publisher   config_ack
+#   publisher  -> subscriber  run_start              QTM frames are streaming
+#   publisher  -> subscriber  log_complete {paths}   touch/clicked logs are closed
+#   subscriber -> publisher   log_complete_ack
+#   subscriber -> publisher   block_done             block saved, GUI back on its start screen
+#   publisher  -> subscriber  session_end            no more blocks
+#   subscriber -> publisher   error {message}        ingest failed; any pending wait_for gives up
+#
+# config .. block_done repeats once per block of the session. A message that arrives while
+# the publisher waits for a different one (e.g. an early block_done) is kept for a later wait_for.
+#
+# ROUTER only routes to peers it has heard from, and DEALER queues messages until it
+# is connected, so the subscriber may start before or after the publisher binds.
+
+
+class LifecycleServer:
+    """Publisher side of the lifecycle handshake"""
+
+    def __init__(self, context, port):
+        self.socket = context.socket(zmq.ROUTER)
+        self.socket.setsockopt(zmq.LINGER, 1000)
+        self.socket.bind(f"tcp://*:{port}")
+        self.peer = None
+        self.pending = deque()  # (command, payload) received while waiting for something else
+        self.error = None       # payload of the last `error` from the subscriber
+
+    def wait_for(self, command, timeout_s):
+        """Wait for `command` from the subscriber; returns its payload, or None on timeout or `error`"""
+        for i, (received, payload) in enumerate(self.pending):
+            if received == command:
+                del self.pending[i]
+                return payload
+        deadline = time.monotonic() + timeout_s
+        while True:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0 or not self.socket.poll(remaining_ms):
+                return None
+            peer, received, payload = self.socket.recv_multipart()
+            self.peer = peer
+            received, payload = received.decode(), json.loads(payload)
+            if received == command:
+                return payload
+            if received == "error":
+                self.error = payload
+                print(f"❌ Subscriber error while waiting for {command}: {payload.get('message')}")
+                return None
+            print(f"⚠️ Lifecycle: got {received} while waiting for {command}; kept for later")
+            self.pending.append((received, payload))
+
+    def send(self, command, payload=None):
+        if self.peer is None:
+            return False
+        self.socket.send_multipart([self.peer, command.encode(), json.dumps(payload or {}).encode()])
+        return True
+
+    def request(self, command, payload, ack, timeout_s):
+        """Send `command` and wait for `ack`; returns True if it arrived in time"""
+        return self.send(command, payload) and self.wait_for(ack, timeout_s) is not None
+
+    def close(self):
+        self.socket.close()
+
+
+class LifecycleClient:
+    """Subscriber side of the lifecycle handshake; poll `socket` and call recv() when readable"""
+
+    def __init__(self, context, host, port):
+        self.socket = context.socket(zmq.DEALER)
+        self.socket.setsockopt(zmq.LINGER, 1000)
+        self.socket.connect(f"tcp://{host}:{port}")
+
+    def send(self, command, payload=None):
+        self.socket.send_multipart([command.encode(), json.dumps(payload or {}).encode()])
+
+    def recv(self):
+        """(command, payload) of the next message"""
+        command, payload = self.socket.recv_multipart()
+        return command.decode(), json.loads(payload)
+
+    def close(self):
+        self.socket.close()
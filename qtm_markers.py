@@ -0,0 +1,260 @@
+import struct
+import xml.etree.ElementTree as ET
+import numpy as np
+from qtm_rt.packet import QRTComponentType
+
+# 3D component header: marker_count, drop_rate, out_of_sync_rate (see qtm_rt.packet.RT3DComponent)
+RT3D_HEADER = struct.Struct("<Ihh")
+# 6D component header: body_count, drop_rate, out_of_sync_rate (see qtm_rt.packet.RT6DComponent)
+RT6D_HEADER = struct.Struct("<ihh")
+RT6D_BODY_FLOATS = 12  # Position (3), then the rotation matrix (9, column-major)
+TIP_OFFSET_SAMPLES = 60  # Frames with tip marker and pen body both seen to calibrate an unknown tip offset
+
+
+def marker_view(packet):
+    """Return the labelled 3D markers of a qtm_rt packet as a read-only (N, 3) float32 view.
+
+    The view points straight into packet.data, so no per-marker objects are created.
+    Returns None if the packet has no 3D component.
+    """
+    position = packet.components.get(QRTComponentType.Component3d)
+    if position is None:
+        return None
+    marker_count = RT3D_HEADER.unpack_from(packet.data, position)[0]
+    return np.frombuffer(packet.data, dtype="<f4", count=marker_count * 3,
+                         offset=position + RT3D_HEADER.size).reshape(marker_count, 3)
+
+
+def body_view(packet):
+    """Return the 6D bodies of a qtm_rt packet as a read-only (N, 12) float32 view.
+
+    Each row is the body position followed by its rotation matrix in QTM's
+    column-major order. Untracked bodies are NaN. Returns None if the packet has
+    no 6D component.
+    """
+    position = packet.components.get(QRTComponentType.Component6d)
+    if position is None:
+        return None
+    body_count = RT6D_HEADER.unpack_from(packet.data, position)[0]
+    return np.frombuffer(packet.data, dtype="<f4", count=body_count * RT6D_BODY_FLOATS,
+                         offset=position + RT6D_HEADER.size).reshape(body_count, RT6D_BODY_FLOATS)
+
+
+def label_names(xml_text):
+    """3D marker labels in stream order, from QTM's 3D parameters or a QTM label list file"""
+    root = ET.fromstring(xml_text)
+    section = root.find(".//The_3D")
+    if section is not None:
+        return [label.findtext("Name", "").strip() for label in section.iter("Label")]
+    return [trajectory.findtext("Name", "").strip() for trajectory in root.iter("Trajectory")]
+
+
+def body_names(xml_text):
+    """6D rigid body names in stream order, from QTM's 6D parameters"""
+    section = ET.fromstring(xml_text).find(".//The_6D")
+    if section is None:
+        return []
+    return [body.findtext("Name", "").strip() for body in section.iter("Body")]
+
+
+def rigid_transform(reference, current):
+    """Rotation R and translation t that best map reference points onto current (Kabsch)"""
+    reference_centroid = reference.mean(axis=0)
+    current_centroid = current.mean(axis=0)
+    u, _, vt = np.linalg.svd((reference - reference_centroid).T @ (current - current_centroid))
+    if np.linalg.det(vt.T @ u.T) < 0:
+        vt[2] *= -1  # Reflection, not a rotation
+    rotation = vt.T @ u.T
+    return rotation, current_centroid - rotation @ reference_centroid
+
+
+def valid_marker_mask(xyz):
+    """True for markers that are neither NaN nor exactly (0, 0, 0), QTM's value for a missing marker"""
+    return xyz.any(axis=1) & ~np.isnan(xyz).any(axis=1)
+
+
+class MarkerReader:
+    """Extracts the tracked markers of each packet into preallocated arrays.
+
+    `indices` are the 0-based marker indices to track (e.g. four screen corners and
+    the pen tip). After read(), `xyz` holds all markers of the frame, `tracked` the
+    selected rows in `indices` order and `valid` their per-marker validity mask.
+    The arrays are reused across frames, so copy anything that must outlive the frame.
+
+    With the default `dtype` (the wire's "<f4") `xyz` is the packet buffer itself;
+    any other dtype copies every frame into a reused buffer of that type.
+    """
+
+    def __init__(self, indices, capacity=32, dtype="<f4"):
+        self.indices = np.asarray(indices, dtype=np.intp)
+        self.min_markers = int(self.indices.max()) + 1
+        self.dtype = np.dtype(dtype)
+        self._buffer = np.empty((max(capacity, self.min_markers), 3), self.dtype)
+        self.xyz = self._buffer[:0]
+        self.tracked = np.empty((len(self.indices), 3), self.dtype)
+        self.valid = np.zeros(len(self.indices), dtype=bool)
+        self.all_valid = False
+        self.recovered = False  # Never set here; see PenScreenTracker
+
+    def read(self, packet):
+        """Read the packet's 3D markers. Returns `tracked`, or None if too few markers."""
+        view = marker_view(packet)
+        if view is None or len(view) < self.min_markers:
+            self.all_valid = False
+            return None
+
+        if self.dtype == view.dtype:
+            # Same layout as the wire: use the packet buffer directly
+            self.xyz = view
+        else:
+            marker_count = len(view)
+            if marker_count > len(self._buffer):
+                self._buffer = np.empty((marker_count, 3), self.dtype)
+            self.xyz = self._buffer[:marker_count]
+            np.copyto(self.xyz, view)
+
+        np.take(self.xyz, self.indices, axis=0, out=self.tracked)
+        self.valid[:] = valid_marker_mask(self.tracked)
+        self.all_valid = bool(self.valid.all())
+        return self.tracked
+
+
+class PenScreenTracker:
+    """Screen corners and pen tip of each packet, tolerant of occluded markers.
+
+    Drop-in for MarkerReader in the publisher: read() fills `tracked` with the four
+    corners [top right, bottom right, bottom left, top left] and the pen tip, and
+    sets `valid` / `all_valid`. Markers are given by index, usually resolved from
+    their labels with resolve_tracker(). Instead of dropping the frame:
+
+    - one occluded corner is rebuilt from the other three, which span a rectangle
+      (corner = both neighbours - the opposite corner);
+    - the pen tip is its own marker (`tip_index`) when visible, else the 6D pen
+      body pose (`body_index`) applied to `tip_offset`, else a rigid fit of the
+      visible pen body markers (at least 3 of `pen_indices`) onto the last frame
+      in which all of them and the tip were seen.
+
+    A `tip_offset` of None (or zero, which would put the tip at the body origin)
+    is calibrated: the tip marker's position in the body frame is averaged over
+    the first TIP_OFFSET_SAMPLES frames that show both, and the body only stands
+    in for the tip after that. Without a tip marker the offset must be given.
+
+    `recovered` tells whether the frame was completed by one of these fallbacks.
+    """
+
+    def __init__(self, corner_indices, tip_index=None, pen_indices=(), body_index=None, tip_offset=None):
+        if tip_index is None and body_index is None:
+            raise ValueError("Pen tip needs a tip marker or a 6D body")
+        calibrate = tip_offset is None or not np.any(tip_offset)
+        if tip_index is None and calibrate:
+            raise ValueError("Pen tip from the 6D body alone needs its tip offset; "
+                             "set it, or stream a tip marker to calibrate it")
+        self.corner_indices = np.asarray(corner_indices, dtype=np.intp)
+        self.tip_index = tip_index
+        self.pen_indices = np.asarray(pen_indices, dtype=np.intp)
+        self.body_index = body_index
+        self.tip_offset = np.zeros(3) if calibrate else np.asarray(tip_offset, dtype=np.float64)
+        self.offset_samples = 0 if calibrate and body_index is not None else TIP_OFFSET_SAMPLES
+        # One gather per frame: corners, pen body markers, then the tip marker if there is one
+        self._rows = np.concatenate([self.corner_indices, self.pen_indices,
+                                     [tip_index] if tip_index is not None else []]).astype(np.intp)
+        self._pen_rows = slice(4, 4 + len(self.pen_indices))
+        self.min_markers = int(self._rows.max()) + 1
+        self.xyz = None
+        self.tracked = np.zeros((5, 3))
+        self.valid = np.zeros(5, dtype=bool)
+        self.all_valid = False
+        self.recovered = False
+        self._pen_reference = np.zeros((len(self.pen_indices), 3))
+        self._tip_reference = np.zeros(3)
+        self._has_reference = False
+
+    def read(self, packet):
+        """Read the packet's markers. Returns `tracked`, or None if too few markers."""
+        view = marker_view(packet)
+        if view is None or len(view) < self.min_markers:
+            self.all_valid = False
+            return None
+        self.xyz = view
+        rows = view[self._rows]
+        rows_valid = valid_marker_mask(rows)
+        tracked, valid = self.tracked, self.valid
+        self.recovered = False
+
+        tracked[:4] = rows[:4]
+        valid[:4] = rows_valid[:4]
+        if valid[:4].sum() == 3:
+            i = int(np.flatnonzero(~valid[:4])[0])
+            tracked[i] = tracked[(i + 1) % 4] + tracked[(i + 3) % 4] - tracked[(i + 2) % 4]
+            valid[i] = self.recovered = True
+
+        valid[4] = self._read_tip(packet, rows, rows_valid)
+        self.all_valid = bool(valid.all())
+        return tracked
+
+    def _read_tip(self, packet, rows, rows_valid):
+        tip = self.tracked[4]
+        pen, pen_valid = rows[self._pen_rows], rows_valid[self._pen_rows]
+
+        found = False
+        if self.tip_index is not None and rows_valid[-1]:
+            tip[:] = rows[-1]
+            found = True
+            if self.offset_samples < TIP_OFFSET_SAMPLES:
+                self._calibrate_offset(packet, tip)
+        if not found and self.body_index is not None and self.offset_samples >= TIP_OFFSET_SAMPLES:
+            bodies = body_view(packet)
+            if bodies is not None and len(bodies) > self.body_index:
+                body = bodies[self.body_index]
+                if not np.isnan(body[:3]).any():
+                    # Column-major rotation: reshaped row-major it is the transpose
+                    tip[:] = body[:3] + self.tip_offset @ body[3:].reshape(3, 3)
+                    found = True
+                    if self.tip_index is not None:
+                        self.recovered = True
+        if found:
+            if len(pen) and pen_valid.all():
+                self._pen_reference[:] = pen
+                self._tip_reference[:] = tip
+                self._has_reference = True
+            return True
+
+        if self._has_reference and pen_valid.sum() >= 3:
+            rotation, translation = rigid_transform(self._pen_reference[pen_valid], pen[pen_valid])
+            tip[:] = rotation @ self._tip_reference + translation
+            self.recovered = True
+            return True
+        return False
+
+    def _calibrate_offset(self, packet, tip):
+        """Fold the tip marker, seen in the pen body's frame, into the running mean of `tip_offset`"""
+        bodies = body_view(packet)
+        if bodies is None or len(bodies) <= self.body_index:
+            return
+        body = bodies[self.body_index]
+        if np.isnan(body[:3]).any():
+            return
+        # tip = position + offset @ R, R orthonormal, so offset = (tip - position) @ R.T
+        offset = (tip - body[:3]) @ body[3:].reshape(3, 3).T
+        self.offset_samples += 1
+        self.tip_offset += (offset - self.tip_offset) / self.offset_samples
+
+
+def resolve_tracker(labels, bodies, corner_labels, pen_labels=(), tip_label=None, body_name=None,
+                    tip_offset=None):
+    """PenScreenTracker for markers given by label; raises ValueError if they cannot all be found.
+
+    `labels` / `bodies` are the stream's 3D labels and 6D body names in order (see
+    label_names / body_names). The tip is tracked by `tip_label`, by the 6D body
+    `body_name`, or both (the body then covers an occluded tip marker).
+    """
+    index = {name: i for i, name in enumerate(labels)}
+    missing = [name for name in [*corner_labels, *pen_labels] if name not in index]
+    if missing:
+        raise ValueError(f"Labels not in the QTM label list: {', '.join(missing)}")
+    tip_index = index.get(tip_label) if tip_label else None
+    body_index = bodies.index(body_name) if body_name in bodies else None
+    if tip_index is None and body_index is None:
+        raise ValueError(f"No pen tip: neither label '{tip_label}' nor 6D body '{body_name}' is streamed")
+    return PenScreenTracker([index[name] for name in corner_labels], tip_index,
+                            [index[name] for name in pen_labels], body_index, tip_offset)
@@ -0,0 +1,215 @@
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+
+import zmq
+
+from qtm_latency import LatencyHistogram
+
+
+class Counter:
+    """Monotonic event count. inc() is a plain integer add, safe to call from the frame path."""
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+
+class Gauge:
+    """Current value of something, either set() explicitly or read from `fn` at snapshot time"""
+
+    def __init__(self, fn=None):
+        self.fn = fn
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def read(self):
+        return self.fn() if self.fn is not None else self.value
+
+
+class MetricsRegistry:
+    """Named counters, gauges and distributions of one process.
+
+    Counters get a per-second rate computed over the interval between two tick()
+    calls; distributions are LatencyHistograms and are reported as percentiles.
+    """
+
+    def __init__(self, process_name):
+        self.process_name = process_name
+        self.counters = {}
+        self.gauges = {}
+        self.distributions = {}
+        self.rates = {}
+        self._last_counts = {}
+        self._last_tick = time.monotonic()
+
+    def counter(self, name):
+        return self.counters.setdefault(name, Counter())
+
+    def gauge(self, name, fn=None):
+        gauge = self.gauges.setdefault(name, Gauge(fn))
+        if fn is not None:
+            gauge.fn = fn
+        return gauge
+
+    def distribution(self, name):
+        return self.distributions.setdefault(name, LatencyHistogram())
+
+    def tick(self):
+        """Update counter rates over the interval since the previous tick"""
+        now = time.monotonic()
+        elapsed = now - self._last_tick
+        if elapsed <= 0:
+            return
+        for name, counter in list(self.counters.items()):
+            value = counter.value
+            self.rates[name] = (value - self._last_counts.get(name, 0)) / elapsed
+            self._last_counts[name] = value
+        self._last_tick = now
+
+    def snapshot(self):
+        gauges = {}
+        for name, gauge in list(self.gauges.items()):
+            try:
+                gauges[name] = gauge.read()
+            except Exception as e:
+                gauges[name] = f"error: {e}"
+        return {
+            "process": self.process_name,
+            "time": time.time(),
+            "counters": {
+                name: {"value": c.value, "rate_per_s": round(self.rates.get(name, 0.0), 2)}
+                for name, c in list(self.counters.items())
+            },
+            "gauges": gauges,
+            "distributions": {name: h.summary() for name, h in list(self.distributions.items())},
+        }
+
+
+class MetricsReporter:
+    """Publishes a MetricsRegistry from a background thread.
+
+    - Answers any request on a local ZMQ REP socket (tcp://127.0.0.1:`port`) with the
+      current snapshot as JSON; `python qtm_metrics.py --port <port>` queries it.
+    - Every `interval_s` updates the rates and, once set_snapshot_path() was called,
+      appends the snapshot as one JSON line to that file.
+    - Every `summary_every_s` prints one console line with the counters in
+      `summary_counters` instead of per-frame output.
+    """
+
+    def __init__(self, registry, port, interval_s=1.0, summary_every_s=5.0, summary_counters=()):
+        self.registry = registry
+        self.port = port
+        self.interval_s = interval_s
+        self.summary_every_s = summary_every_s
+        self.summary_counters = summary_counters
+        self.snapshot_path = None
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def set_snapshot_path(self, path):
+        self.snapshot_path = Path(path)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="metrics-reporter", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+
+    def _run(self):
+        ctx = zmq.Context.instance()
+        socket = ctx.socket(zmq.REP)
+        socket.setsockopt(zmq.LINGER, 0)
+        try:
+            socket.bind(f"tcp://127.0.0.1:{self.port}")
+        except zmq.ZMQError as e:
+            print(f"⚠️ Metrics endpoint unavailable on port {self.port}: {e}")
+            socket.close()
+            socket = None
+
+        next_tick = time.monotonic() + self.interval_s
+        next_summary = time.monotonic() + self.summary_every_s
+        while not self._stopping.is_set():
+            timeout_ms = max(0, int((next_tick - time.monotonic()) * 1000))
+            if socket is not None and socket.poll(timeout_ms):
+                socket.recv()
+                socket.send_string(json.dumps(self.registry.snapshot()))
+                continue
+            if socket is None:
+                self._stopping.wait(timeout_ms / 1000.0)
+
+            now = time.monotonic()
+            if now < next_tick:
+                continue
+            next_tick = now + self.interval_s
+            self.registry.tick()
+            if self.snapshot_path is not None:
+                self._write_snapshot()
+            if now >= next_summary:
+                next_summary = now + self.summary_every_s
+                self._print_summary()
+
+        self.registry.tick()
+        if self.snapshot_path is not None:
+            self._write_snapshot()
+        if socket is not None:
+            socket.close()
+
+    def _write_snapshot(self):
+        try:
+            with open(self.snapshot_path, "a") as f:
+                f.write(json.dumps(self.registry.snapshot()) + "\n")
+        except OSError as e:
+            print(f"⚠️ Metrics snapshot failed: {e}")
+
+    def _print_summary(self):
+        registry = self.registry
+        parts = []
+        for name in self.summary_counters:
+            counter = registry.counters.get(name)
+            if counter is not None:
+                parts.append(f"{name} {counter.value} ({registry.rates.get(name, 0.0):.0f}/s)")
+        print(f"📊 {registry.process_name}: " + " | ".join(parts))
+
+
+def query(port, host="127.0.0.1", timeout_ms=1000):
+    """Fetch one snapshot from a running process's metrics endpoint"""
+    ctx = zmq.Context.instance()
+    socket = ctx.socket(zmq.REQ)
+    socket.setsockopt(zmq.LINGER, 0)
+    socket.connect(f"tcp://{host}:{port}")
+    try:
+        socket.send(b"snapshot")
+        if not socket.poll(timeout_ms):
+            raise TimeoutError(f"No metrics endpoint answering on {host}:{port}")
+        return json.loads(socket.recv())
+    finally:
+        socket.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print live metrics of the publisher or subscriber")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5557, help="5557 = publisher, 5558 = subscriber")
+    parser.add_argument("--watch", type=float, default=0.0, help="Refresh every N seconds (0 = once)")
+    args = parser.parse_args()
+
+    while True:
+        print(json.dumps(query(args.port, args.host), indent=2))
+        if args.watch <= 0:
+            break
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    main()
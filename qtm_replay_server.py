@@ -0,0 +1,276 @@
+"""Stand-in for the QTM real-time server, for load testing the publisher without the lab.
+
+Speaks enough of the QTM RT protocol (little endian, port 22223) for
+`qtm_rt.connect()` + `stream_frames(components=['3d', '6d'])`. Frames come from a
+recorded *_touch_log.csv (pen tip only; the screen corners are taken from
+SCREEN_CORNERS) or from a synthetic reciprocal-tapping pen trajectory.
+
+Point the publisher at it by setting QTM_HOST = '127.0.0.1', then e.g.:
+    python qtm_replay_server.py --rate 1000 --nan-rate 0.01
+    python qtm_replay_server.py --csv Results/test/test_continuous_ID2_2_250_touch_log.csv
+    python qtm_replay_server.py --disconnect-every 30 --disconnect-for 2
+"""
+import argparse
+import asyncio
+import csv
+import struct
+import numpy as np
+from qtm_rt.packet import QRTPacketType, QRTComponentType, QRTEvent
+
+# Configuration - server
+HOST = "0.0.0.0"
+PORT = 22223
+FRAME_RATE = 300          # Hz
+REPORT_EVERY_S = 5.0
+
+# Screen corners in QTM coordinates (mm): top right, bottom right, bottom left, top left
+SCREEN_CORNERS = np.array([
+    [444.0, 294.0, 1000.0],
+    [444.0, 100.0, 1000.0],
+    [100.0, 100.0, 1000.0],
+    [100.0, 294.0, 1000.0],
+])
+
+# Marker order matches the publisher's MARKER_* indices: 4 corners, 4 pen body markers, pen tip
+MARKER_LABELS = ["Screen - 1", "Screen - 2", "Screen - 3", "Screen - 4",
+                 "Pen - 1", "Pen - 2", "Pen - 3", "Pen - 4", "Pen - tip"]
+PEN_BODY_OFFSETS = np.array([   # Pen body markers relative to the tip (mm)
+    [0.0, 0.0, 120.0],
+    [15.0, 0.0, 130.0],
+    [0.0, 15.0, 140.0],
+    [-15.0, 0.0, 150.0],
+])
+PEN_BODY_ORIGIN = PEN_BODY_OFFSETS.mean(axis=0)  # Pen 6D body origin relative to the tip, as QTM places it
+BODY_NAMES = ["Screen", "Pen"]
+
+# Synthetic trajectory: reciprocal tapping between two targets
+SYNTH_TARGETS_MM = (151.4, 194.6)   # x_local of the ID 2 target centres (346 mm over 1920 px)
+SYNTH_MOVE_S = 0.45                 # Movement time per stroke
+SYNTH_LIFT_MM = 25.0                # Pen lift above the screen mid-stroke
+
+RT_HEADER = struct.Struct("<II")            # size, packet type
+DATA_HEADER = struct.Struct("<qII")         # timestamp (us), frame number, component count
+COMPONENT_HEADER = struct.Struct("<II")     # size, component type
+HEADER_3D = struct.Struct("<Ihh")           # marker count, drop rate, out of sync rate
+HEADER_6D = struct.Struct("<ihh")           # body count, drop rate, out of sync rate
+
+
+def screen_point(x_local, height_mm, z_mm):
+    """Point(s) on/above the screen given x along the bottom edge, y up the left edge and z off the plane"""
+    x_local = np.asarray(x_local, dtype=float)[..., None]
+    height_mm = np.asarray(height_mm, dtype=float)[..., None]
+    z_mm = np.asarray(z_mm, dtype=float)[..., None]
+    p0, p1, p2, p3 = SCREEN_CORNERS
+    x_unit = (p1 - p2) / np.linalg.norm(p1 - p2)
+    y_unit = (p3 - p2) / np.linalg.norm(p3 - p2)
+    normal = np.cross(p1 - p0, p3 - p0)
+    normal /= np.linalg.norm(normal)
+    return p2 + x_local * x_unit + height_mm * y_unit + z_mm * normal
+
+
+def synthetic_pen_tips(frame_rate, seconds=60.0):
+    """Pen tip trajectory (N, 3) tapping back and forth between SYNTH_TARGETS_MM"""
+    t = np.arange(int(frame_rate * seconds)) / frame_rate
+    phase = (t % SYNTH_MOVE_S) / SYNTH_MOVE_S
+    stroke = (t // SYNTH_MOVE_S).astype(int) % 2
+    start = np.where(stroke == 0, SYNTH_TARGETS_MM[0], SYNTH_TARGETS_MM[1])
+    end = np.where(stroke == 0, SYNTH_TARGETS_MM[1], SYNTH_TARGETS_MM[0])
+    # Minimum-jerk stroke along x, lifted off the screen in the middle
+    s = 10 * phase**3 - 15 * phase**4 + 6 * phase**5
+    x = start + (end - start) * s
+    z = SYNTH_LIFT_MM * np.sin(np.pi * phase) ** 2
+    return screen_point(x, 90.0, z)
+
+
+def recorded_pen_tips(csv_path):
+    """Pen tip trajectory (N, 3) from a publisher *_touch_log.csv"""
+    with open(csv_path, newline="") as f:
+        reader = csv.DictReader(f)
+        rows = [(float(r["Pen X"]), float(r["Pen Y"]), float(r["Pen Z"])) for r in reader]
+    return np.array(rows)
+
+
+class ReplaySource:
+    """Builds QTM data packets for successive frames of a pen trajectory"""
+
+    def __init__(self, pen_tips, dropout_rate=0.0, nan_rate=0.0, seed=0):
+        self.pen_tips = pen_tips
+        self.dropout_rate = dropout_rate
+        self.nan_rate = nan_rate
+        self.rng = np.random.default_rng(seed)
+        self.markers = np.empty((len(MARKER_LABELS), 3), dtype="<f4")
+        self.markers[:4] = SCREEN_CORNERS
+        self.screen_center = SCREEN_CORNERS.mean(axis=0)
+        self.identity = np.eye(3, dtype="<f4").ravel()
+
+    def packet(self, frame, timestamp_us, components):
+        tip = self.pen_tips[frame % len(self.pen_tips)]
+        self.markers[4:8] = tip + PEN_BODY_OFFSETS
+        self.markers[8] = tip
+        if self.dropout_rate or self.nan_rate:
+            draw = self.rng.random(len(self.markers))
+            self.markers[draw < self.dropout_rate] = 0.0
+            self.markers[(draw >= self.dropout_rate) & (draw < self.dropout_rate + self.nan_rate)] = np.nan
+
+        parts = []
+        if "3d" in components:
+            body = HEADER_3D.pack(len(self.markers), 0, 0) + self.markers.tobytes()
+            parts.append(COMPONENT_HEADER.pack(COMPONENT_HEADER.size + len(body), QRTComponentType.Component3d.value) + body)
+        if "6d" in components:
+            body = HEADER_6D.pack(len(BODY_NAMES), 0, 0)
+            for position in (self.screen_center, tip + PEN_BODY_ORIGIN):
+                body += np.asarray(position, dtype="<f4").tobytes() + self.identity.tobytes()
+            parts.append(COMPONENT_HEADER.pack(COMPONENT_HEADER.size + len(body), QRTComponentType.Component6d.value) + body)
+
+        # Restore the corners for the next frame if a dropout hit them
+        self.markers[:4] = SCREEN_CORNERS
+        payload = DATA_HEADER.pack(timestamp_us, frame, len(parts)) + b"".join(parts)
+        return RT_HEADER.pack(RT_HEADER.size + len(payload), QRTPacketType.PacketData.value) + payload
+
+
+def rt_string_packet(packet_type, text):
+    data = text.encode() + b"\0"
+    return RT_HEADER.pack(RT_HEADER.size + len(data), packet_type.value) + data
+
+
+def rt_event_packet(event):
+    return RT_HEADER.pack(RT_HEADER.size + 1, QRTPacketType.PacketEvent.value) + bytes([event.value])
+
+
+def parameters_xml():
+    labels = "".join(f"<Label><Name>{name}</Name><RGBColor>255</RGBColor></Label>" for name in MARKER_LABELS)
+    bodies = "".join(f"<Body><Name>{name}</Name></Body>" for name in BODY_NAMES)
+    return ("<QTM_Parameters_Ver_1.25>"
+            f"<The_3D><AxisUpwards>+Z</AxisUpwards><Labels>{len(MARKER_LABELS)}</Labels>{labels}</The_3D>"
+            f"<The_6D><Bodies>{len(BODY_NAMES)}</Bodies>{bodies}</The_6D>"
+            "</QTM_Parameters_Ver_1.25>")
+
+
+class ReplayServer:
+    def __init__(self, source, frame_rate, disconnect_every=0.0, disconnect_for=0.0):
+        self.source = source
+        self.frame_rate = frame_rate
+        self.disconnect_every = disconnect_every
+        self.disconnect_for = disconnect_for
+
+    async def handle_client(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        print(f"🔌 Client connected: {peer}")
+        writer.write(rt_string_packet(QRTPacketType.PacketCommand, "QTM RT Interface connected"))
+        stream_task = None
+        try:
+            while True:
+                header = await reader.readexactly(RT_HEADER.size)
+                size, packet_type = RT_HEADER.unpack(header)
+                body = await reader.readexactly(size - RT_HEADER.size)
+                command = body.rstrip(b"\0").decode().strip()
+                words = command.lower().split()
+                if not words:
+                    continue
+
+                if words[0] == "version":
+                    writer.write(rt_string_packet(QRTPacketType.PacketCommand, f"Version set to {words[1]}"))
+                elif words[0] == "qtmversion":
+                    writer.write(rt_string_packet(QRTPacketType.PacketCommand, "QTM Version is 2025.1 (replay)"))
+                elif words[0] == "byteorder":
+                    writer.write(rt_string_packet(QRTPacketType.PacketCommand, "Byte order is little endian"))
+                elif words[0] == "getstate":
+                    writer.write(rt_event_packet(QRTEvent.EventRTfromFileStarted))
+                elif words[0] == "getparameters":
+                    writer.write(rt_string_packet(QRTPacketType.PacketXML, parameters_xml()))
+                elif words[:2] == ["streamframes", "stop"]:
+                    if stream_task is not None:
+                        stream_task.cancel()
+                        stream_task = None
+                elif words[0] == "streamframes":
+                    if stream_task is not None:
+                        stream_task.cancel()
+                    components = set(words[2:])
+                    stream_task = asyncio.create_task(self.stream(writer, components))
+                else:
+                    writer.write(rt_string_packet(QRTPacketType.PacketError, f"Command not supported: {command}"))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            if stream_task is not None:
+                stream_task.cancel()
+            writer.close()
+            print(f"🔌 Client disconnected: {peer}")
+
+    async def stream(self, writer, components):
+        """Send frames at frame_rate on absolute deadlines; report achieved rate and lag"""
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.frame_rate
+        start = loop.time()
+        next_report = start + REPORT_EVERY_S
+        next_disconnect = start + self.disconnect_every if self.disconnect_every else None
+        frame = 0
+        sent = 0
+        window_start, window_sent, max_lag = start, 0, 0.0
+        print(f"▶️ Streaming {sorted(components)} at {self.frame_rate} Hz")
+        try:
+            while True:
+                deadline = start + frame * period
+                now = loop.time()
+                if deadline > now:
+                    await asyncio.sleep(deadline - now)
+                else:
+                    max_lag = max(max_lag, now - deadline)
+
+                if next_disconnect is not None and now >= next_disconnect:
+                    # Camera connection lost: QTM stops sending frames until it reconnects
+                    print(f"⚠️ Simulated disconnect for {self.disconnect_for:.1f} s")
+                    writer.write(rt_event_packet(QRTEvent.EventConnectionClosed))
+                    await asyncio.sleep(self.disconnect_for)
+                    writer.write(rt_event_packet(QRTEvent.EventConnected))
+                    writer.write(rt_event_packet(QRTEvent.EventRTfromFileStarted))
+                    next_disconnect = loop.time() + self.disconnect_every
+                    # Frame numbers keep counting through the outage, like QTM's
+                    frame = int((loop.time() - start) / period)
+                    continue
+
+                writer.write(self.source.packet(frame, int(frame * period * 1e6), components))
+                # Back-pressure from a slow client shows up as a lower achieved rate
+                await writer.drain()
+                frame += 1
+                sent += 1
+                window_sent += 1
+
+                if now >= next_report:
+                    elapsed = now - window_start
+                    print(f"📈 {window_sent / elapsed:8.1f} Hz achieved (target {self.frame_rate}) | "
+                          f"max lag {max_lag * 1000:.2f} ms | frames sent {sent}")
+                    window_start, window_sent, max_lag = now, 0, 0.0
+                    next_report = now + REPORT_EVERY_S
+        except (asyncio.CancelledError, ConnectionError):
+            print(f"⏹️ Streaming stopped after {sent} frames")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--rate", type=float, default=FRAME_RATE, help="Frame rate in Hz")
+    parser.add_argument("--csv", help="Replay pen tips from a *_touch_log.csv instead of the synthetic trajectory")
+    parser.add_argument("--dropout-rate", type=float, default=0.0, help="Per-marker probability of (0, 0, 0)")
+    parser.add_argument("--nan-rate", type=float, default=0.0, help="Per-marker probability of NaN")
+    parser.add_argument("--disconnect-every", type=float, default=0.0, help="Seconds between simulated camera disconnects")
+    parser.add_argument("--disconnect-for", type=float, default=2.0, help="Length of each simulated disconnect (s)")
+    args = parser.parse_args()
+
+    pen_tips = recorded_pen_tips(args.csv) if args.csv else synthetic_pen_tips(args.rate)
+    source = ReplaySource(pen_tips, dropout_rate=args.dropout_rate, nan_rate=args.nan_rate)
+    server = ReplayServer(source, args.rate, args.disconnect_every, args.disconnect_for)
+
+    tcp_server = await asyncio.start_server(server.handle_client, args.host, args.port)
+    print(f"✅ QTM replay server on {args.host}:{args.port} | {len(pen_tips)} frames | {args.rate} Hz")
+    async with tcp_server:
+        await tcp_server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\nShutting down...")
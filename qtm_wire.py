@@ -0,0 +1,146 @@
+import json
+import math
+import numbers
+import struct
+import numpy as np
+
+# Wire format of the qtm_data stream. Each frame is sent as a two-part ZMQ message
+# [topic, payload]. The payload is either a fixed-layout binary frame (default) or,
+# in debug mode, the UTF-8 JSON object the stream used originally.
+#
+# Binary frame, version 2 (little-endian, 104 bytes):
+#   B   version
+#   B   status             (index into STATUS_CODES)
+#   B   flags              (FLAG_INSIDE_BOUNDS | FLAG_VALID_POSITION)
+#   x   padding
+#   I   frame
+#   h   current_bin        (-1 = None)
+#   2x  padding
+#   4f  x_local, y_local, distance, distance_from_reference   (NaN = None)
+#   15f pen_tip xyz, then screen_corners xyz x 4
+#   2q  perf_counter_ns stamps: packet in, ZMQ sent (0 = not stamped)
+# Version 1 frames are the same without the stamps (88 bytes) and still decode.
+# The two stamps are all the subscriber's latency trace needs; the publisher's own stages
+# (geometry, haptic) stay in its tracer and only the JSON debug frames carry them.
+WIRE_VERSION = 2
+HEADER = struct.Struct("<BBBxIh2x4f")
+XYZ_COUNT = 15
+STAMP_KEYS = ("t_packet_in", "t_geometry", "t_haptic", "t_sent")
+STAMPS = struct.Struct("<2q")
+WIRE_STAMP_KEYS = ("t_packet_in", "t_sent")
+FRAME_SIZE_V1 = HEADER.size + XYZ_COUNT * 4
+FRAME_SIZE = FRAME_SIZE_V1 + STAMPS.size
+
+STATUS_CODES = ("not_touching", "touching", "outside")
+STATUS_INDEX = {name: i for i, name in enumerate(STATUS_CODES)}
+
+FLAG_INSIDE_BOUNDS = 0x01
+FLAG_VALID_POSITION = 0x02
+
+NAN = float("nan")
+
+_xyz_block = np.empty(XYZ_COUNT, dtype="<f4")
+
+
+def _float_or_nan(value):
+    # Real numbers include NumPy scalars (e.g. float32 coordinates from the marker views)
+    return value if isinstance(value, numbers.Real) else NAN
+
+
+def encode_frame(frame, x_local, y_local, distance, distance_from_reference, current_bin,
+                 status, is_valid_position, pen_tip, screen_corners, stamps=(0, 0, 0, 0)):
+    """Pack one publisher frame into the binary wire format.
+
+    x_local/y_local may be the 'NaN' placeholder string, distance_from_reference and
+    current_bin may be None; both are sent as NaN / -1. `stamps` are the latency
+    stamps in STAMP_KEYS order, of which WIRE_STAMP_KEYS are sent.
+    """
+    flags = FLAG_INSIDE_BOUNDS if status == "touching" else 0
+    if is_valid_position:
+        flags |= FLAG_VALID_POSITION
+    _xyz_block[:3] = pen_tip
+    _xyz_block[3:] = np.ravel(screen_corners)
+    return HEADER.pack(
+        WIRE_VERSION,
+        STATUS_INDEX[status],
+        flags,
+        frame,
+        -1 if current_bin is None else current_bin,
+        _float_or_nan(x_local),
+        _float_or_nan(y_local),
+        distance,
+        NAN if distance_from_reference is None else distance_from_reference,
+    ) + _xyz_block.tobytes() + STAMPS.pack(stamps[0], stamps[3])
+
+
+def _round_or_none(value):
+    return round(float(value), 2) if isinstance(value, numbers.Real) else None
+
+
+def encode_frame_json(frame, x_local, y_local, distance, distance_from_reference, current_bin,
+                      status, is_valid_position, pen_tip, screen_corners, stamps=(0, 0, 0, 0)):
+    """Debug encoding: the human-readable JSON object, rounded to 0.01 mm."""
+    data = {
+        "frame": frame,
+        "x_local": _round_or_none(x_local),
+        "y_local": _round_or_none(y_local),
+        "distance": round(float(distance), 2),
+        "distance_from_reference": _round_or_none(distance_from_reference),
+        "current_bin": current_bin,
+        "status": status,
+        "inside_bounds": int(status == "touching"),
+        "is_valid_position": int(is_valid_position),
+        "pen_tip": [round(float(v), 2) for v in pen_tip],
+        "screen_corners": [[round(float(v), 2) for v in corner] for corner in screen_corners],
+    }
+    data.update(zip(STAMP_KEYS, stamps))
+    return json.dumps(data).encode()
+
+
+def _none_if_nan(value):
+    return None if math.isnan(value) else value
+
+
+_FRAME_FIELD = struct.Struct("<I")
+_T_SENT_FIELD = struct.Struct("<q")
+
+
+def peek_frame(payload):
+    """(frame, t_sent) of a payload without decoding the rest; t_sent is 0 if not stamped."""
+    if payload[:1] == b"{":
+        data = json.loads(payload)
+        return data["frame"], data.get("t_sent", 0)
+    frame = _FRAME_FIELD.unpack_from(payload, 4)[0]
+    if payload[0] >= 2 and len(payload) == FRAME_SIZE:
+        return frame, _T_SENT_FIELD.unpack_from(payload, FRAME_SIZE - _T_SENT_FIELD.size)[0]
+    return frame, 0
+
+
+def decode_frame(payload):
+    """Decode a qtm_data payload (binary or JSON) into the frame dict."""
+    if payload[:1] == b"{":
+        return json.loads(payload)
+
+    version = payload[0] if payload else None
+    if not ((version == 2 and len(payload) == FRAME_SIZE) or (version == 1 and len(payload) == FRAME_SIZE_V1)):
+        raise ValueError(f"Unsupported qtm_data frame (version {version}, {len(payload)} bytes)")
+
+    (_, status, flags, frame, current_bin,
+     x_local, y_local, distance, distance_from_reference) = HEADER.unpack_from(payload)
+    xyz = np.frombuffer(payload, dtype="<f4", count=XYZ_COUNT, offset=HEADER.size).tolist()
+    data = {
+        "frame": frame,
+        "x_local": _none_if_nan(x_local),
+        "y_local": _none_if_nan(y_local),
+        "distance": distance,
+        "distance_from_reference": _none_if_nan(distance_from_reference),
+        "current_bin": None if current_bin < 0 else current_bin,
+        "status": STATUS_CODES[status],
+        "inside_bounds": flags & FLAG_INSIDE_BOUNDS,
+        "is_valid_position": (flags & FLAG_VALID_POSITION) >> 1,
+        "pen_tip": xyz[:3],
+        "screen_corners": [xyz[3:6], xyz[6:9], xyz[9:12], xyz[12:15]],
+    }
+    if version >= 2:
+        data.update(zip(WIRE_STAMP_KEYS, STAMPS.unpack_from(payload, FRAME_SIZE_V1)))
+    return data
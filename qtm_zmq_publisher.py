@@ -1,6 +1,6 @@
+import os
 import time
 import asyncio
-import csv
 import subprocess
 import numpy as np
 from pathlib import Path
@@ -11,16 +11,34 @@ from datetime import datetime
 from pythonosc.udp_client import SimpleUDPClient
 import zmq
 import json
-import nidaqmx
-from nidaqmx.constants import AcquisitionType
+from qtm_geometry import ScreenFrame
+from qtm_markers import MarkerReader, PenScreenTracker, TIP_OFFSET_SAMPLES, label_names, body_names, resolve_tracker
+from qtm_bins import BinTracker
+from qtm_wire import encode_frame, encode_frame_json
+from qtm_haptics import HapticWorker, StreamedOutput, BurstTimeline, ContactDebouncer, create_backend
+from qtm_latency import LatencyTracer, now_ns
+from qtm_metrics import MetricsRegistry, MetricsReporter
+from qtm_lifecycle import LifecycleServer
+from qtm_framelog import TouchLogWriter
+from qtm_blocks import make_block, load_blocks, order_blocks
+from qtm_calibration import ScreenCalibration, CornerSampler, CALIBRATION_FILENAME
+from qtm_catalog import SessionCatalog, catalog_path, block_key
+from qtm_predict import OneEuroPredictor
 
 # Configuration - QTM and Logging
 QTM_HOST = '139.19.40.134'
 OSC_HOST = '139.19.40.35'
 UDP_port = 12345
 ZMQ_PORT = 5555
-ZMQ_CONFIG_PORT = 5556  # Port for sending config to subscriber
+ZMQ_CONFIG_PORT = 5556  # Lifecycle handshake with the subscriber (config, run start, log complete)
+SUBSCRIBER_READY_TIMEOUT_S = 30  # Max wait for the launched subscriber to report ready
+HANDSHAKE_TIMEOUT_S = 5  # Max wait for the subscriber to acknowledge a lifecycle step
 ZMQ_TOPIC = "qtm_data"
+ZMQ_WIRE_FORMAT = "binary"  # "binary" (compact, see qtm_wire.py) | "json" (human-readable, for debugging)
+ZMQ_SNDHWM = 64  # Max messages queued per subscriber; beyond it ZMQ drops new frames (seen as frame gaps)
+ZMQ_SINGLE_FRAME = False  # Send topic + payload as one frame, required by a ZMQ_CONFLATE subscriber
+METRICS_PORT = 5557  # Local status endpoint (query with: python qtm_metrics.py --port 5557)
+METRICS_INTERVAL_S = 1.0  # Rate update / snapshot interval; console summary every 5 s
 
 # Configuration - Motion-triggered vibration
 FSR_MIN = 0
@@ -30,7 +48,26 @@ FREQUENCY = 50
 AMPLITUDE = 1  # V
 FS_OUTPUT = 5000  # Output sample rate (Hz)
 DEVICE_AO = "Dev1/ao0"  # Analog output
+HAPTIC_BACKEND = "nidaqmx"  # "nidaqmx" (NI card) | "simulated" (no hardware, records output timing)
 HYSTERESIS_PERCENT = 0.3  # Hysteresis as fraction of bin width (0.3 = 30%)
+BIN_EDGES_FILE = None     # Optional .npy/.csv table of bin edges (mm) replacing the uniform FSR_MIN..FSR_MAX layout
+HAPTIC_QUEUE_SIZE = 64    # Max pending DAQ commands; oldest are dropped when full
+HAPTIC_STALE_MS = 50      # Bursts that waited longer than this are dropped, not played late
+CONTINUOUS_OUTPUT = "streamed"  # "streamed" (AO runs all session, sine/zero gated in ~1 period) | "gated" (task start/stop per touch)
+STREAM_BUFFER_BLOCKS = 2  # Streamed output buffer, in half-periods; bounds gate latency
+BURST_OUTPUT = "timeline"  # "timeline" (pre-armed bursts spliced into a running stream) | "finite" (start/wait/stop per burst)
+BURST_LEAD_MS = 20.0      # Timeline: least output queued ahead of the clock; bursts start lead..2x lead later
+BURST_POLICY = "queue"    # Bursts requested while one plays: "queue" | "merge" | "drop" (see BurstTimeline)
+BURST_MAX_PENDING = 4     # "queue" policy: bursts that may wait behind the playing one
+CONTACT_TOUCH_MM = 8.0    # Continuous mode: contact starts below this distance...
+CONTACT_RELEASE_MM = 9.0  # ...and ends above this one
+CONTACT_DEBOUNCE_FRAMES = 3  # Frames a new contact state must hold before the gate follows
+PEN_PREDICTOR = None      # None (raw pen tip) | "one-euro": bins and contact are decided on the tip predicted PREDICT_LEAD_MS ahead
+PREDICT_LEAD_MS = 20.0    # About the capture -> output latency to compensate
+ONE_EURO_MIN_CUTOFF = 1.0  # Hz; lower = steadier at rest
+ONE_EURO_BETA = 0.05      # Hz per mm/s of pen speed: 1 -> 16 Hz at 300 mm/s; higher = less lag, more jitter
+                          # (300 Hz, 0.2 mm noise, 500 mm/s strokes: lag ~6 mm at 0.02, ~2.7 mm at 0.05; rest jitter 0.02 mm)
+ONE_EURO_D_CUTOFF = 10.0  # Hz; velocity smoothing, trades extrapolation lag against jitter
 
 # Marker indices (0-based) — set these to match your QTM marker setup
 MARKER_TOP_RIGHT = 0     # Index for top right screen corner marker
@@ -38,8 +75,31 @@ MARKER_BOTTOM_RIGHT = 1  # Index for bottom right screen corner marker
 MARKER_BOTTOM_LEFT = 2   # Index for bottom left screen corner marker
 MARKER_TOP_LEFT = 3      # Index for top left screen corner marker
 MARKER_PEN_TIP = 8       # Index for pen tip marker
-# Minimum number of markers expected from QTM
-MIN_MARKERS = max(MARKER_TOP_RIGHT, MARKER_BOTTOM_RIGHT, MARKER_BOTTOM_LEFT, MARKER_TOP_LEFT, MARKER_PEN_TIP) + 1
+MARKER_PEN_BODY = [4, 5, 6, 7]  # Indices of the pen body markers, refit to place an occluded tip
+# Markers read from each frame: four screen corners, then the pen tip
+TRACKED_MARKERS = [MARKER_TOP_RIGHT, MARKER_BOTTOM_RIGHT, MARKER_BOTTOM_LEFT, MARKER_TOP_LEFT, MARKER_PEN_TIP]
+# Marker tracking: "labels" (markers found by label in QTM's 3D parameters, or in LABEL_LIST_FILE if
+# QTM reports none; an occluded corner is rebuilt from the other three and an occluded tip from the
+# pen body, see PenScreenTracker) | "indices" (the fixed MARKER_* positions above; frames with an
+# occluded marker are dropped). If a label cannot be found, "labels" keeps the occlusion handling
+# but takes the markers from the MARKER_* indices.
+TRACKING = "labels"
+LABEL_LIST_FILE = Path(__file__).parent / "MoCap Temporal binding" / "vhnm.xml"
+SCREEN_LABELS = ["Screen - 1", "Screen - 2", "Screen - 3", "Screen - 4"]  # Top right, bottom right, bottom left, top left
+PEN_LABELS = ["Pen - 1", "Pen - 2", "Pen - 3", "Pen - 4"]  # Pen body markers, refit to place an occluded tip
+PEN_TIP_LABEL = "Pen - tip"  # None = tip from the 6D body only
+PEN_BODY = "Pen"             # 6D rigid body of the pen; 6D is only streamed if the body is defined in QTM
+PEN_TIP_OFFSET_MM = None  # Tip in the pen body's local frame (mm); None = calibrated from the tip marker
+                          # while both are seen. Required if the tip comes from the body alone.
+# Screen basis is only rebuilt when a corner marker moves more than this (mm)
+SCREEN_FRAME_TOLERANCE_MM = 0.5
+# Screen calibration at session start, saved to Results/<participant>/screen_calibration.json and
+# sent to the subscriber with every block config:
+#   "measure" (corner markers over CALIBRATION_WINDOW_S) | "reuse" (saved file, measure if missing)
+#   | "off" (SCREEN_WIDTH_MM x SCREEN_HEIGHT_MM)
+SCREEN_CALIBRATION = "measure"
+CALIBRATION_WINDOW_S = 1.0
+CALIBRATION_TIMEOUT_S = 10.0  # Fall back to the default size if the corners are not seen by then
 
 # Vibration condition: "motion-coupled" | "continuous" | "no-vibration"
 CONDITION = "continuous"
@@ -48,6 +108,31 @@ attempts = 2
 ID = 2                    # Set to 2 or 4 (Index of Difficulty)
 delaytime = 250
 
+# Session blocks: the runner keeps QTM, ZMQ, the DAQ device and the subscriber window
+# open across blocks and only reconfigures them in between. None = one block from the
+# settings above; otherwise a list of make_block(condition, ID, attempts, delaytime)
+# or the path of a JSON file with the same fields (see qtm_blocks.py)
+SESSION_BLOCKS = None
+BLOCK_ORDER = "as-listed"  # "as-listed" | "latin" (balanced Latin square row PARTICIPANT_INDEX) | "shuffle" (seeded by participant_name)
+PARTICIPANT_INDEX = 0      # Counterbalancing row of this participant
+BLOCK_DONE_TIMEOUT_S = 60  # Max wait for the subscriber to save a block and return to its start screen
+
+# Stations: several pen/screen setups run side by side off one QTM connection, each with its
+# own subscriber, ports, DAQ device, markers, blocks and output folder. None = one station
+# from the settings above; otherwise a list of overrides of station_defaults(), e.g.
+#   STATIONS = [
+#       {"name": "A"},
+#       {"name": "B", "zmq_port": 5565, "config_port": 5566, "metrics_port": 5567,
+#        "subscriber_metrics_port": 5568, "monitor": 2, "osc_address": "/qtm/B",
+#        "device_ao": "Dev2/ao0", "participant_name": "p02",
+#        "screen_labels": ["Screen B - 1", "Screen B - 2", "Screen B - 3", "Screen B - 4"],
+#        "pen_labels": ["Pen B - 1", "Pen B - 2", "Pen B - 3", "Pen B - 4"],
+#        "pen_tip_label": "Pen B - tip", "pen_body": "Pen B"},
+#   ]
+# Each station runs its own hardware-timed AO task, and NI-DAQmx allows one such task per
+# device, so give every station its own device (Dev1, Dev2, ...), not another channel of Dev1.
+STATIONS = None
+
 # ID-to-parameters lookup: W (px), D (px)
 ID_PARAMS = {
     2: {"W": 80, "D": 240},    # log2(240/80 + 1) = 2 bits
@@ -64,550 +149,843 @@ single_cycle_wave = AMPLITUDE * np.sin(2 * np.pi * FREQUENCY * t)
 # Append a zero sample at the end to reset output to 0V
 single_cycle_wave = np.append(single_cycle_wave, 0.0)
 
-# Global variables
-task_ao = None
-last_bin = -1
-last_trigger_x = None  # Hysteresis: track x_local at last bin change
-start_time = None
-streaming_enabled = True
-continuous_playing = False  # For continuous mode: is DAQ currently outputting?
-
 # Trigger detection (replicated from subscriber)
-W_VALUES = [ID_PARAMS[ID]["W"]]       # Target width in pixels (derived from ID)
-D_VALUES = [ID_PARAMS[ID]["D"]]       # Distance between targets in pixels (derived from ID)
 TOTAL_TRIALS = 10
-SCREEN_WIDTH_MM = 346.0   # Physical screen width in mm (default)
-CANVAS_WIDTH = 1920       # Screen resolution width in pixels (adjust to your monitor)
-target_side = 1           # 1 = right, -1 = left
-trigger_count = 0
-previous_inside = False
-rect_x_mm = None
-rect_x_end_mm = None
+SCREEN_WIDTH_MM = 346.0   # Physical screen size in mm when not calibrated
+SCREEN_HEIGHT_MM = 194.57
+CANVAS_WIDTH = 1920       # Canvas size in pixels until the subscriber reports its own
+CANVAS_HEIGHT = 1080
 
 client = SimpleUDPClient(OSC_HOST, UDP_port)
-osc_address = '/qtm'
-
-session_file = Path(__file__).parent / "current_session_path.txt"
-
-log_dir = None  # Set in main()
-log_rows = []
-clicked_frames = set()
-latest_frame = None
-
-# Set vibration mode from CONDITION
-vibration_mode = CONDITION
-print(f"🔧 Vibration mode: {vibration_mode}")
-
-
-def calculate_target_bounds():
-    """Calculate target bounds in mm based on current target_side, replicating subscriber logic."""
-    global rect_x_mm, rect_x_end_mm
-    rect_width = W_VALUES[0]
-    distance = D_VALUES[0]
-    center_x = CANVAS_WIDTH / 2
-    rect_x = center_x + (target_side * (distance / 2)) - (rect_width / 2)
-    px_to_mm = SCREEN_WIDTH_MM / CANVAS_WIDTH
-    rect_x_mm = rect_x * px_to_mm
-    rect_x_end_mm = (rect_x + rect_width) * px_to_mm
-    print(f"Target bounds (mm): {rect_x_mm:.2f} to {rect_x_end_mm:.2f} | Side: {'right' if target_side == 1 else 'left'}")
-
-
-# Initialize first target bounds
-calculate_target_bounds()
-
-# ZeroMQ setup
-zmq_context = zmq.Context()
-zmq_socket = zmq_context.socket(zmq.PUB)
-zmq_socket.bind(f"tcp://*:{ZMQ_PORT}")
-print(f"✅ ZeroMQ publisher started on port {ZMQ_PORT}")
-
-
-def initialize_daq():
-    """Initialize NI-DAQ analog output based on vibration_mode"""
-    global task_ao, start_time
-    
-    if vibration_mode == "no-vibration":
-        print("DAQ: no-vibration mode — DAQ not initialized")
-        start_time = time.time()
-        return True
-    
-    try:
-        # Close any existing task
-        if task_ao is not None:
-            try:
-                task_ao.close()
-            except:
-                pass
-        
-        task_ao = nidaqmx.Task()
-        task_ao.ao_channels.add_ao_voltage_chan(
-            DEVICE_AO,
-            min_val=-10.0,
-            max_val=10.0
-        )
-
-        if vibration_mode == "continuous":
-            # Continuous mode: repeating sine wave, started/stopped on touch
-            task_ao.timing.cfg_samp_clk_timing(
-                rate=FS_OUTPUT,
-                sample_mode=AcquisitionType.CONTINUOUS,
-                samps_per_chan=samples_per_period
-            )
-            task_ao.write(single_cycle_wave[:-1], auto_start=False)  # exclude trailing zero for seamless looping
-            print(f"DAQ configured (continuous mode):")
-            print(f"  Output: {FREQUENCY}Hz sine wave, ±{AMPLITUDE}V (loops while touching)")
+
+
+def station_file(stem, name):
+    """Hand-off file `stem`.txt of the default station, `stem`_<name>.txt of a named one"""
+    return Path(__file__).parent / (f"{stem}_{name}.txt" if name else f"{stem}.txt")
+
+
+# Typed columns of the touch log; TouchLogWriter appends the Clicked column
+LOG_COLUMNS = [('Frame', 'int'), ('Pen X', 'float'), ('Pen Y', 'float'), ('Pen Z', 'float'),
+               ('Distance to Plane (mm)', 'float'), ('Local X', 'nan_float')]
+if PEN_PREDICTOR:
+    LOG_COLUMNS += [('Predicted Distance (mm)', 'nan_float'), ('Predicted Local X', 'nan_float')]
+zmq_topic = ZMQ_TOPIC.encode()
+encode_zmq_frame = encode_frame_json if ZMQ_WIRE_FORMAT == "json" else encode_frame
+
+stations = []  # Running stations, set in main()
+
+
+def station_results_dir(settings):
+    """Output folder of a station: results_dir, or Results/<participant_name>"""
+    return Path(settings["results_dir"] or Path(__file__).parent / "Results" / settings["participant_name"])
+
+
+def station_defaults():
+    """Settings of the single station described by the constants above; STATIONS entries override them"""
+    return {
+        "name": "",
+        "zmq_port": ZMQ_PORT,
+        "config_port": ZMQ_CONFIG_PORT,
+        "metrics_port": METRICS_PORT,
+        "subscriber_metrics_port": None,  # None = metrics_port + 1 (5558, the subscriber's own default)
+        "monitor": None,                  # Subscriber window: None = second monitor if there is one
+        "osc_address": "/qtm",
+        "device_ao": DEVICE_AO,
+        "markers": TRACKED_MARKERS,       # Four screen corners, then the pen tip ("indices" tracking)
+        "pen_markers": MARKER_PEN_BODY,
+        "tracking": TRACKING,
+        "screen_labels": SCREEN_LABELS,
+        "pen_labels": PEN_LABELS,
+        "pen_tip_label": PEN_TIP_LABEL,
+        "pen_body": PEN_BODY,
+        "pen_tip_offset_mm": PEN_TIP_OFFSET_MM,
+        "participant_name": participant_name,
+        "condition": CONDITION,
+        "ID": ID,
+        "attempts": attempts,
+        "delaytime": delaytime,
+        "session_blocks": SESSION_BLOCKS,
+        "block_order": BLOCK_ORDER,
+        "participant_index": PARTICIPANT_INDEX,
+        "results_dir": None,              # None = Results/<participant_name>
+    }
+
+
+class Station:
+    """One pen/screen station: its subscriber, DAQ channel, markers, blocks and output folder.
+
+    Owns everything that used to be module state: the ZMQ PUB socket, lifecycle
+    channel and metrics endpoint on its own ports, the bin tracker, DAQ output and
+    trigger state machine. main() opens one QTM stream and fans every packet out to
+    handle_qtm_data() of each station, which only reads its own markers.
+    """
+
+    def __init__(self, zmq_context, settings):
+        self.settings = settings
+        self.name = settings["name"]
+        self.tag = f"[{self.name}] " if self.name else ""
+        self.zmq_context = zmq_context
+        self.participant_name = settings["participant_name"]
+        self.osc_address = settings["osc_address"]
+
+        # Block settings, switched by apply_block()
+        self.condition = self.vibration_mode = settings["condition"]
+        self.ID = settings["ID"]
+        self.attempts = settings["attempts"]
+        self.delaytime = settings["delaytime"]
+        self.W_VALUES = [ID_PARAMS[self.ID]["W"]]  # Target width in pixels (derived from ID)
+        self.D_VALUES = [ID_PARAMS[self.ID]["D"]]  # Distance between targets in pixels (derived from ID)
+
+        if BIN_EDGES_FILE:
+            self.bin_tracker = BinTracker.from_file(BIN_EDGES_FILE, HYSTERESIS_PERCENT)
         else:
-            # Motion-coupled mode: single-cycle burst per bin change
-            task_ao.timing.cfg_samp_clk_timing(
-                rate=FS_OUTPUT,
-                sample_mode=AcquisitionType.FINITE,
-                samps_per_chan=len(single_cycle_wave)
-            )
-            task_ao.write(single_cycle_wave, auto_start=False)
-            print(f"DAQ configured (motion-coupled mode):")
-            print(f"  Output: {FREQUENCY}Hz sine wave, ±{AMPLITUDE}V (burst per bin change)")
-        
-        print(f"  Sample rate: {FS_OUTPUT}Hz ({samples_per_period} samples/cycle)")
-        start_time = time.time()
-        return True
-        
-    except Exception as e:
-        print(f"Error initializing DAQ: {e}")
+            self.bin_tracker = BinTracker.uniform(FSR_MIN, FSR_MAX, NUM_BINS, HYSTERESIS_PERCENT)
+        self.daq_backend = None
+        self.start_time = None
+        self.streaming_enabled = True
+        self.continuous_playing = False  # For continuous mode: is DAQ currently outputting?
+        self.continuous_requested = False  # For continuous mode: last state the frame path asked for
+        self.haptic_worker = None  # Runs DAQ commands off the QTM callback, set per block in start_haptic_worker()
+        self.streamed_output = None  # Continuous mode with CONTINUOUS_OUTPUT = "streamed", set in initialize_daq()
+        self.burst_timeline = None  # Motion-coupled mode with BURST_OUTPUT = "timeline", set in initialize_daq()
+        self.contact_debouncer = ContactDebouncer(CONTACT_TOUCH_MM, CONTACT_RELEASE_MM, CONTACT_DEBOUNCE_FRAMES)
+
+        self.canvas_width = CANVAS_WIDTH
+        self.canvas_height = CANVAS_HEIGHT
+        self.screen_calibration = ScreenCalibration(SCREEN_WIDTH_MM, SCREEN_HEIGHT_MM, CANVAS_WIDTH, CANVAS_HEIGHT)
+        self.corner_sampler = None  # CornerSampler while the session start calibration runs
+        self.target_side = 1        # 1 = right, -1 = left
+        self.trigger_count = 0
+        self.trigger_frames = []    # Frame numbers of this block's triggers, for the session catalog
+        self.block_active = False   # Frames are only processed while a block is running
+        self.previous_inside = False
+        self.rect_x_mm = None
+        self.rect_x_end_mm = None
+
+        self.results_folder = None  # Set in start()
+        self.log_dir = None
+        self.touch_log = None  # TouchLogWriter streaming frames to disk, one per block, set in run_block()
+        self.pen_predictor = OneEuroPredictor(PREDICT_LEAD_MS, ONE_EURO_MIN_CUTOFF, ONE_EURO_BETA,
+                                              ONE_EURO_D_CUTOFF) if PEN_PREDICTOR == "one-euro" else None
+        self.latest_frame = None
+        self.screen_frame = ScreenFrame(tolerance_mm=SCREEN_FRAME_TOLERANCE_MM)
+        self.marker_reader = MarkerReader(settings["markers"])  # Replaced in configure_tracking()
+        self.process_name = f"publisher-{self.name}" if self.name else "publisher"
+        self.latency_tracer = LatencyTracer(self.process_name)
+        self.metrics = MetricsRegistry(self.process_name)
+        self.metric_frames_received = self.metrics.counter("frames_received")
+        self.metric_frames_rejected = self.metrics.counter("frames_rejected")  # Missing or invalid markers
+        self.metric_frames_recovered = self.metrics.counter("frames_recovered")  # Occluded marker filled in
+        self.metric_zmq_sent = self.metrics.counter("zmq_sent")
+        self.metric_triggers = self.metrics.counter("triggers")
+        self.metric_output_restarts = self.metrics.counter("output_restarts")  # Feeder thread died, task reopened
+        self.metric_frame_process = self.metrics.distribution("frame_process_us")  # Packet in -> ZMQ sent
+        self.metrics_reporter = None
+        self.lifecycle = None
+
+        self.calculate_target_bounds()
+
+        # ZeroMQ setup
+        self.zmq_socket = zmq_context.socket(zmq.PUB)
+        self.zmq_socket.setsockopt(zmq.SNDHWM, ZMQ_SNDHWM)
+        self.zmq_socket.bind(f"tcp://*:{settings['zmq_port']}")
+        self.log(f"✅ ZeroMQ publisher started on port {settings['zmq_port']} ({ZMQ_WIRE_FORMAT} wire format)")
+
+    def log(self, message):
+        print(f"{self.tag}{message}")
+
+    def configure_tracking(self, labels, bodies):
+        """Pick the marker reader for the stream's labels and bodies; returns True if it needs 6D"""
+        settings = self.settings
+        if settings["tracking"] == "labels":
+            try:
+                self.marker_reader = resolve_tracker(
+                    labels, bodies, settings["screen_labels"], settings["pen_labels"], settings["pen_tip_label"],
+                    settings["pen_body"], settings["pen_tip_offset_mm"])
+                tip = [f"marker '{settings['pen_tip_label']}'" if self.marker_reader.tip_index is not None else None,
+                       f"6D body '{settings['pen_body']}'" if self.marker_reader.body_index is not None else None]
+                self.log(f"🏷️ Tracking by label; pen tip from {' then '.join(filter(None, tip))}")
+                self.log_tip_offset()
+                return self.marker_reader.body_index is not None
+            except ValueError as e:
+                # Same occlusion handling, with the markers at their MARKER_* positions
+                self.log(f"⚠️ {e}; tracking by marker index instead")
+                markers = list(settings["markers"])
+                body_index = bodies.index(settings["pen_body"]) if settings["pen_body"] in bodies else None
+                self.marker_reader = PenScreenTracker(markers[:4], markers[4], settings["pen_markers"], body_index,
+                                                      settings["pen_tip_offset_mm"])
+                if labels and self.marker_reader.min_markers > len(labels):
+                    self.log(f"⚠️ QTM labels only {len(labels)} markers; index {self.marker_reader.min_markers - 1} "
+                             f"will not be streamed")
+                self.log(f"🏷️ Tracking by marker index: {markers}, pen body {list(settings['pen_markers'])}"
+                         + (f", 6D body '{settings['pen_body']}'" if body_index is not None else ""))
+                self.log_tip_offset()
+                return body_index is not None
+        self.marker_reader = MarkerReader(settings["markers"])
+        self.log(f"🏷️ Tracking by marker index: {list(settings['markers'])}")
         return False
 
+    def log_tip_offset(self):
+        reader = self.marker_reader
+        if reader.body_index is not None and reader.offset_samples < TIP_OFFSET_SAMPLES:
+            self.log(f"📏 Pen tip offset unset; calibrating it from the first {TIP_OFFSET_SAMPLES} frames "
+                     f"with tip marker and body both seen")
+
+    def calculate_target_bounds(self):
+        """Calculate target bounds in mm based on current target_side, replicating subscriber logic."""
+        rect_width = self.W_VALUES[0]
+        distance = self.D_VALUES[0]
+        center_x = self.screen_calibration.width_px / 2
+        rect_x = center_x + (self.target_side * (distance / 2)) - (rect_width / 2)
+        self.rect_x_mm, self.rect_x_end_mm = self.screen_calibration.span_mm(rect_x, rect_width)
+        self.log(f"Target bounds (mm): {self.rect_x_mm:.2f} to {self.rect_x_end_mm:.2f} | "
+                 f"Side: {'right' if self.target_side == 1 else 'left'}")
+
+    def initialize_daq(self):
+        """Initialize haptic analog output based on vibration_mode"""
+        if self.vibration_mode == "no-vibration":
+            self.log("DAQ: no-vibration mode — DAQ not initialized")
+            self.start_time = time.time()
+            return True
 
-def cleanup_daq():
-    """Cleanup DAQ resources"""
-    global task_ao, continuous_playing
-    
-    if vibration_mode == "no-vibration":
-        return
-    
-    try:
-        if task_ao is not None:
-            if continuous_playing:
-                task_ao.stop()
-                continuous_playing = False
-            task_ao.close()
-            print("DAQ task closed")
-    except Exception as e:
-        print(f"DAQ cleanup warning: {e}")
+        try:
+            # Close any existing task
+            if self.daq_backend is not None:
+                try:
+                    self.daq_backend.close()
+                except:
+                    pass
+
+            self.daq_backend = create_backend(HAPTIC_BACKEND, self.settings["device_ao"], FS_OUTPUT)
+            daq_name = f"{self.daq_backend.name}, {self.settings['device_ao']}"
+
+            if self.vibration_mode == "continuous" and CONTINUOUS_OUTPUT == "streamed":
+                # Continuous mode: the task runs all session, a feeder thread gates sine/zeros
+                self.streamed_output = StreamedOutput(self.daq_backend, single_cycle_wave[:-1], STREAM_BUFFER_BLOCKS,
+                                                      tracer=self.latency_tracer)
+                self.streamed_output.start()
+                self.log(f"DAQ configured (continuous mode, streamed, {daq_name}):")
+                self.log(f"  Output: {FREQUENCY}Hz sine wave, ±{AMPLITUDE}V (gated while touching, "
+                         f"{self.streamed_output.buffer_samples} samples buffered)")
+            elif self.vibration_mode == "continuous":
+                # Continuous mode: repeating sine wave, started/stopped on touch
+                self.daq_backend.configure_continuous(single_cycle_wave[:-1])  # exclude trailing zero for seamless looping
+                self.log(f"DAQ configured (continuous mode, {daq_name}):")
+                self.log(f"  Output: {FREQUENCY}Hz sine wave, ±{AMPLITUDE}V (loops while touching)")
+            elif BURST_OUTPUT == "timeline":
+                # Motion-coupled mode: the burst stays armed; each bin change splices one cycle into the stream
+                self.burst_timeline = BurstTimeline(self.daq_backend, single_cycle_wave, BURST_LEAD_MS, BURST_POLICY,
+                                                    BURST_MAX_PENDING, tracer=self.latency_tracer)
+                self.burst_timeline.start()
+                self.log(f"DAQ configured (motion-coupled mode, timeline, {daq_name}):")
+                self.log(f"  Output: {FREQUENCY}Hz sine wave, ±{AMPLITUDE}V (burst per bin change, "
+                         f"policy {BURST_POLICY}, max {self.burst_timeline.max_sustained_rate():.0f} bursts/s)")
+            else:
+                # Motion-coupled mode: single-cycle burst per bin change
+                self.daq_backend.configure_burst(single_cycle_wave)
+                self.log(f"DAQ configured (motion-coupled mode, {daq_name}):")
+                self.log(f"  Output: {FREQUENCY}Hz sine wave, ±{AMPLITUDE}V (burst per bin change)")
 
+            self.log(f"  Sample rate: {FS_OUTPUT}Hz ({samples_per_period} samples/cycle)")
+            self.start_time = time.time()
+            return True
 
-def start_continuous():
-    """Start continuous sine wave output (for continuous mode)"""
-    global continuous_playing
-    if not continuous_playing and task_ao is not None:
-        try:
-            task_ao.start()
-            continuous_playing = True
         except Exception as e:
-            print(f"Continuous start error: {e}")
+            self.log(f"Error initializing DAQ: {e}")
+            return False
 
+    def cleanup_daq(self):
+        """Cleanup DAQ resources"""
+        if self.vibration_mode == "no-vibration":
+            return
 
-def stop_continuous():
-    """Stop continuous sine wave output (for continuous mode)"""
-    global continuous_playing
-    if continuous_playing and task_ao is not None:
+        # Stop the output worker first so nothing touches the task while it closes
+        if self.haptic_worker is not None:
+            self.haptic_worker.stop()
+            self.log(f"Haptic worker: {self.haptic_worker.summary()}")
+            self.haptic_worker = None
+
+        # Each step is guarded on its own: whatever fails, the task is still closed,
+        # otherwise the device stays reserved and the next block cannot open it
         try:
-            task_ao.stop()
-            continuous_playing = False
+            if self.streamed_output is not None:
+                self.streamed_output.stop()
+                self.log(f"Streamed output: {self.streamed_output.summary()}")
         except Exception as e:
-            print(f"Continuous stop error: {e}")
-
+            self.log(f"Streamed output stop warning: {e}")
+        self.streamed_output = None
 
-def trigger_burst():
-    """Trigger single cycle output (motion-coupled mode only)"""
-    global task_ao
-    
-    if vibration_mode != "motion-coupled" or task_ao is None:
-        return
-    
-    try:
-        task_ao.start()
-        task_ao.wait_until_done(timeout=1.0)
-        task_ao.stop()
-    except Exception as e:
-        print(f"Trigger error: {e}")
-
-
-def map_value(value, in_min, in_max, out_min, out_max):
-    """Arduino-style map function"""
-    return int((value - in_min) * (out_max - out_min) / (in_max - in_min) + out_min)
-
-
-def calculate_screen_plane_normal(screen_corners):
-    """Calculate the normal vector of the screen plane"""
-    p0 = np.array(screen_corners[0])
-    p1 = np.array(screen_corners[1])
-    p3 = np.array(screen_corners[3])
-    
-    # Two vectors in the plane
-    v1 = p1 - p0
-    v2 = p3 - p0
-    
-    # Normal is cross product
-    normal = np.cross(v1, v2)
-    return normal / np.linalg.norm(normal)
-
-
-def project_point_to_plane(point, plane_point, plane_normal):
-    """Project a point onto a plane defined by a point and normal vector"""
-    point = np.array(point)
-    plane_point = np.array(plane_point)
-    plane_normal = np.array(plane_normal)
-    
-    # Vector from plane point to the point
-    v = point - plane_point
-    
-    # Distance from point to plane
-    dist = np.dot(v, plane_normal)
-    
-    # Project point onto plane
-    projected = point - dist * plane_normal
-    
-    return projected
-
-
-def get_distance_from_reference_line(pen_tip, screen_corners):
-    """Calculate perpendicular distance from reference line (Point 2-3)
-    
-    Args:
-        pen_tip: [x, y, z] coordinates of pen tip
-        screen_corners: list of [x, y, z] coordinates for 4 screen corners
-    
-    Returns:
-        distance: perpendicular distance from reference line in mm
-        is_valid: True if projection is within screen bounds
-    """
-    # Get corner positions
-    p0 = np.array(screen_corners[0])
-    p1 = np.array(screen_corners[1])
-    p2 = np.array(screen_corners[2])
-    p3 = np.array(screen_corners[3])
-    
-    # Calculate screen plane normal
-    plane_normal = calculate_screen_plane_normal(screen_corners)
-    
-    # Project pen tip onto screen plane
-    projected_point = project_point_to_plane(np.array(pen_tip), p2, plane_normal)
-    
-    # Reference line is now from Point 2 to Point 3 (left edge)
-    reference_line_vector = p3 - p2  # left edge: bottom left to top left
-    reference_line_length = np.linalg.norm(reference_line_vector)
-    reference_line_unit = reference_line_vector / reference_line_length
-
-    # Height direction (perpendicular to reference line, in screen plane)
-    # This points from left edge to right edge
-    height_vector = p1 - p2  # bottom left to bottom right (horizontal)
-    # Make it exactly perpendicular by removing component along reference line
-    height_vector = height_vector - np.dot(height_vector, reference_line_unit) * reference_line_unit
-    height_direction = height_vector / np.linalg.norm(height_vector)
-    screen_height = np.linalg.norm(height_vector)
-
-    # Vector from reference line start (Point 2) to projected point
-    to_projected = projected_point - p2
-
-    # Distance along reference line (for width validation)
-    distance_along_reference = np.dot(to_projected, reference_line_unit)
-
-    # Distance perpendicular to reference line (this is what we want)
-    distance_from_reference = np.dot(to_projected, height_direction)
-
-    # Check if projection is within screen bounds
-    is_valid = (0 <= distance_from_reference <= screen_height and 
-                0 <= distance_along_reference <= reference_line_length)
-    
-    return distance_from_reference, is_valid
-
-
-def rect_point_to_local_xy(corners, point):
-    """
-    Calculate the horizontal distance (x_local) from the left edge (bottom left to bottom right) of the screen rectangle.
-    corners: list of 4 points [top right, bottom right, bottom left, top left]
-    point: the [x, y, z] coordinates to project (e.g., pen tip)
-    Returns:
-        x_local: horizontal distance from the left edge (bottom left), in mm
-        y_local: always 0 (not used)
-    """
-    corners = np.array(corners)
-    point = np.array(point)
-    left_edge_start = corners[2]  # p2 (bottom left)
-    right_edge_end = corners[1]   # p1 (bottom right)
-    horizontal_vec = right_edge_end - left_edge_start
-    horizontal_unit = horizontal_vec / np.linalg.norm(horizontal_vec)
-    pen_vec = point - left_edge_start
-    x_local = np.dot(pen_vec, horizontal_unit)
-    return x_local, 0  # y_local not used
+        try:
+            if self.burst_timeline is not None:
+                self.burst_timeline.stop()
+                self.log(f"Burst timeline: {self.burst_timeline.summary()}")
+        except Exception as e:
+            self.log(f"Burst timeline stop warning: {e}")
+        self.burst_timeline = None
 
+        if self.daq_backend is None:
+            return
+        try:
+            if self.continuous_playing:
+                self.daq_backend.stop()
+            if hasattr(self.daq_backend, "report"):
+                self.log(f"Simulated DAQ output: {self.daq_backend.report()}")
+        except Exception as e:
+            self.log(f"DAQ stop warning: {e}")
+        finally:
+            self.continuous_playing = False
+            try:
+                self.daq_backend.close()
+                self.log("DAQ task closed")
+            except Exception as e:
+                self.log(f"DAQ close warning: {e}")
+            self.daq_backend = None
+
+    def output_error(self):
+        """Error that stopped the streamed output's feeder thread, or None"""
+        for output in (self.streamed_output, self.burst_timeline):
+            if output is not None and output.error is not None:
+                return output.error
+        return None
+
+    def restart_output(self):
+        """Reopen the DAQ output after its feeder died, keeping the current contact state"""
+        self.cleanup_daq()
+        if not self.initialize_daq():
+            return False
+        self.start_haptic_worker()
+        if self.streamed_output is not None and self.contact_debouncer.touching:
+            self.streamed_output.set_gate(True)
+        return True
 
-def distance_point_to_plane(point, plane_point, plane_normal):
-    point = np.array(point)
-    plane_point = np.array(plane_point)
-    plane_normal = np.array(plane_normal)
-    plane_normal = plane_normal / np.linalg.norm(plane_normal)
-    return np.dot(point - plane_point, plane_normal)
+    def start_continuous(self):
+        """Start continuous sine wave output (for continuous mode)"""
+        if not self.continuous_playing and self.daq_backend is not None:
+            try:
+                self.daq_backend.start()
+                self.continuous_playing = True
+            except Exception as e:
+                self.log(f"Continuous start error: {e}")
+
+    def stop_continuous(self):
+        """Stop continuous sine wave output (for continuous mode)"""
+        if self.continuous_playing and self.daq_backend is not None:
+            try:
+                self.daq_backend.stop()
+                self.continuous_playing = False
+            except Exception as e:
+                self.log(f"Continuous stop error: {e}")
+
+    def trigger_burst(self):
+        """Trigger single cycle output (motion-coupled mode only)"""
+        if self.vibration_mode != "motion-coupled" or self.daq_backend is None:
+            return
 
+        try:
+            self.daq_backend.burst()
+        except Exception as e:
+            self.log(f"Trigger error: {e}")
 
-def handle_qtm_data(packet):
-    global latest_frame, streaming_enabled, last_bin, start_time, last_trigger_x, previous_inside, trigger_count, target_side
+    def send_haptic(self, command):
+        """Queue a DAQ command for the haptic worker (never blocks the QTM callback).
 
-    try:
-        # Stop streaming after TOTAL_TRIALS triggers
-        if trigger_count >= TOTAL_TRIALS:
-            return
+        Returns the perf_counter_ns stamp of the enqueue, or 0 if there is no worker.
+        """
+        if self.haptic_worker is None:
+            return 0
+        self.haptic_worker.submit(command)
+        return now_ns()
 
-        frame = packet.framenumber
-        latest_frame = frame
-
-        header, markers = packet.get_3d_markers()
-        marker_xyz = [[m.x, m.y, m.z] for m in markers]
-        
-        if len(marker_xyz) >= MIN_MARKERS:
-            screen_corners = [
-                marker_xyz[MARKER_TOP_RIGHT],
-                marker_xyz[MARKER_BOTTOM_RIGHT],
-                marker_xyz[MARKER_BOTTOM_LEFT],
-                marker_xyz[MARKER_TOP_LEFT],
-            ]
-            pen_tip = marker_xyz[MARKER_PEN_TIP]
-
-            # Check for invalid markers (NaN or all zeros)
-            all_markers_valid = True
-            for i in [MARKER_TOP_RIGHT, MARKER_BOTTOM_RIGHT, MARKER_BOTTOM_LEFT, MARKER_TOP_LEFT, MARKER_PEN_TIP]:
-                m = marker_xyz[i]
-                if (m[0] == 0 and m[1] == 0 and m[2] == 0) or \
-                   np.isnan(m[0]) or np.isnan(m[1]) or np.isnan(m[2]):
-                    all_markers_valid = False
-                    break
-            
-            if not all_markers_valid:
+    def handle_qtm_data(self, packet, t_packet_in=None):
+        if t_packet_in is None:
+            t_packet_in = now_ns()
+        try:
+            # QTM streams for the whole session; frames between blocks and after TOTAL_TRIALS are ignored
+            if not self.block_active or self.trigger_count >= TOTAL_TRIALS:
+                if self.corner_sampler is not None:
+                    tracked_xyz = self.marker_reader.read(packet)
+                    if tracked_xyz is not None:
+                        self.corner_sampler.add(tracked_xyz[:4], self.marker_reader.valid[:4].all())
                 return
 
-            # Calculate plane normal and distance
-            v1 = np.array(screen_corners[1]) - np.array(screen_corners[0])
-            v2 = np.array(screen_corners[3]) - np.array(screen_corners[0])
-            normal = np.cross(v1, v2)
-            normal /= np.linalg.norm(normal)
-
-            dist = abs(distance_point_to_plane(pen_tip, screen_corners[0], normal))
-            
-            # Calculate distance from reference line for bin triggering
-            distance_from_ref, is_valid_position = get_distance_from_reference_line(
-                pen_tip,
-                screen_corners
-            )
-            
-            status = "not_touching"
-            x_local = y_local = 'NaN'
-
-            if dist < 8.0:
-                x_local, y_local = rect_point_to_local_xy(screen_corners, pen_tip)
-                if streaming_enabled:
-                    client.send_message(osc_address, [round(x_local, 1), round(y_local, 1)])
-
-                width = np.linalg.norm(np.array(screen_corners[1]) - np.array(screen_corners[0]))
-                height = np.linalg.norm(np.array(screen_corners[3]) - np.array(screen_corners[0]))
-                if -width/2 <= x_local <= width/2 and -height/2 <= y_local <= height/2:
-                    status = "touching"
+            frame = packet.framenumber
+            self.latest_frame = frame
+            self.metric_frames_received.inc()
+
+            # Reads the 3D component straight from the packet buffer into a reused array
+            tracked_xyz = self.marker_reader.read(packet)
+
+            if tracked_xyz is not None:
+                screen_corners = tracked_xyz[:4]
+                pen_tip = tracked_xyz[4]
+
+                # Check for invalid markers (NaN or all zeros)
+                if not self.marker_reader.all_valid:
+                    self.metric_frames_rejected.inc()
+                    return
+                if self.marker_reader.recovered:
+                    self.metric_frames_recovered.inc()
+
+                # Screen basis is cached; per frame we only project the pen tip
+                screen_frame = self.screen_frame
+                screen_frame.update(screen_corners)
+                dist, x_proj, distance_from_ref, is_valid_position = screen_frame.project(pen_tip)
+                # Haptic decisions use the predicted tip when a predictor is configured
+                if self.pen_predictor is not None:
+                    haptic_dist, haptic_x, _, haptic_valid = screen_frame.project(
+                        self.pen_predictor.update(pen_tip, packet.timestamp))
                 else:
-                    status = "outside"
-
-            # VIBRATION OUTPUT LOGIC (depends on vibration_mode)
-            if vibration_mode == "motion-coupled":
-                # BIN-BASED TRIGGERING LOGIC with hysteresis
-                # Only trigger if pen is close enough to the plane
-                BIN_WIDTH = (FSR_MAX - FSR_MIN) / NUM_BINS  # Width of each bin in mm
-                HYSTERESIS = BIN_WIDTH * HYSTERESIS_PERCENT
-                if is_valid_position and dist < 8.0:
-                    # Map x_local to bins
-                    fsr_value = int(x_local)
-                    current_bin = map_value(fsr_value, FSR_MIN, FSR_MAX, 0, NUM_BINS)
-                    current_bin = max(0, min(current_bin, NUM_BINS - 1))
-                    if current_bin != last_bin:
-                        # Only trigger if x_local has moved enough past the boundary (hysteresis)
-                        if last_trigger_x is not None and abs(x_local - last_trigger_x) < HYSTERESIS:
-                            pass  # Too close to last trigger point, ignore
-                        elif last_bin == -1:
-                            last_bin = current_bin
-                            last_trigger_x = x_local
-                        else:
-                            trigger_time = time.time() - start_time
-                            trigger_burst()
-                            last_bin = current_bin
-                            last_trigger_x = x_local
+                    haptic_dist, haptic_x, haptic_valid = dist, x_proj, is_valid_position
+                t_geometry = now_ns()
+                t_haptic = 0
+
+                status = "not_touching"
+                x_local = y_local = 'NaN'
+
+                if dist < 8.0:
+                    x_local, y_local = x_proj, 0  # y_local not used
+                    if self.streaming_enabled:
+                        client.send_message(self.osc_address, [round(x_local, 1), round(y_local, 1)])
+
+                    width = screen_frame.width
+                    height = screen_frame.height
+                    if -width/2 <= x_local <= width/2 and -height/2 <= y_local <= height/2:
+                        status = "touching"
+                    else:
+                        status = "outside"
+
+                # VIBRATION OUTPUT LOGIC (depends on vibration_mode)
+                bin_tracker = self.bin_tracker
+                if self.vibration_mode == "motion-coupled":
+                    # BIN-BASED TRIGGERING LOGIC: one burst per bin boundary crossed (with hysteresis)
+                    # Only trigger if pen is close enough to the plane
+                    if haptic_valid and haptic_dist < 8.0:
+                        for _, _, t_cross in bin_tracker.update(haptic_x, packet.timestamp):
+                            # Host time of the crossing, interpolated between frames (QTM timestamps are us)
+                            crossed_ns = t_packet_in - int((packet.timestamp - t_cross) * 1000)
+                            # Local reference: restart_output() may swap the output meanwhile
+                            burst_timeline = self.burst_timeline
+                            if burst_timeline is not None:
+                                burst_timeline.burst(crossed_ns)
+                                t_haptic = now_ns()
+                            else:
+                                t_haptic = self.send_haptic("burst")
+                    else:
+                        bin_tracker.reset()
+
+                elif self.vibration_mode == "continuous":
+                    # CONTINUOUS MODE: output sine wave while pen is touching the screen
+                    # Contact is debounced; only state changes reach the output
+                    touching, changed = self.contact_debouncer.update(haptic_valid, haptic_dist)
+                    streamed_output = self.streamed_output
+                    if streamed_output is not None:
+                        if changed:
+                            streamed_output.set_gate(touching, t_packet_in)
+                            t_haptic = now_ns()
+                    elif touching != self.continuous_requested:
+                        self.continuous_requested = touching
+                        t_haptic = self.send_haptic("start" if touching else "stop")
+
+                # no-vibration: do nothing
+
+                # Send via ZeroMQ as [topic, payload]; stage stamps travel with the frame
+                t_sent = now_ns()
+                payload = encode_zmq_frame(
+                    frame, x_local, y_local, dist,
+                    distance_from_ref if is_valid_position else None,
+                    bin_tracker.current_bin if is_valid_position and bin_tracker.current_bin != -1 else None,
+                    status, is_valid_position, pen_tip, screen_corners,
+                    (t_packet_in, t_geometry, t_haptic, t_sent),
+                )
+                if ZMQ_SINGLE_FRAME:
+                    self.zmq_socket.send(zmq_topic + payload)
                 else:
-                    if last_bin != -1:
-                        last_bin = -1
-                        last_trigger_x = None
-
-            elif vibration_mode == "continuous":
-                # CONTINUOUS MODE: output sine wave while pen is touching the screen
-                if is_valid_position and dist < 8.0:
-                    start_continuous()
+                    self.zmq_socket.send_multipart([zmq_topic, payload])
+                self.metric_zmq_sent.inc()
+                self.metric_frame_process.record((t_sent - t_packet_in) / 1000.0)
+                self.latency_tracer.record("packet_in->geometry", t_packet_in, t_geometry)
+                self.latency_tracer.record("packet_in->haptic_issued", t_packet_in, t_haptic)
+                self.latency_tracer.record("packet_in->zmq_sent", t_packet_in, t_sent)
+
+                if self.pen_predictor is not None:
+                    log_row = self.touch_log.append(frame, pen_tip[0], pen_tip[1], pen_tip[2], dist, x_local,
+                                                    haptic_dist, haptic_x if haptic_valid else 'NaN')
                 else:
-                    stop_continuous()
-
-            # no-vibration: do nothing
-
-            # Send via ZeroMQ
-            data = {
-                "frame": frame,
-                "x_local": round(x_local, 2) if isinstance(x_local, (int, float)) else None,
-                "y_local": round(y_local, 2) if isinstance(y_local, (int, float)) else None,
-                "distance": round(dist, 2),
-                "distance_from_reference": round(distance_from_ref, 2) if is_valid_position else None,
-                "current_bin": int(current_bin) if is_valid_position and last_bin != -1 else None,
-                "status": status,
-                "inside_bounds": int(status == "touching"),
-                "is_valid_position": int(is_valid_position),
-                "pen_tip": [round(pen_tip[0], 2), round(pen_tip[1], 2), round(pen_tip[2], 2)],
-                "screen_corners": [
-                    [round(screen_corners[0][0], 2), round(screen_corners[0][1], 2), round(screen_corners[0][2], 2)],
-                    [round(screen_corners[1][0], 2), round(screen_corners[1][1], 2), round(screen_corners[1][2], 2)],
-                    [round(screen_corners[2][0], 2), round(screen_corners[2][1], 2), round(screen_corners[2][2], 2)],
-                    [round(screen_corners[3][0], 2), round(screen_corners[3][1], 2), round(screen_corners[3][2], 2)]
-                ]
-            }
-            message = f"{ZMQ_TOPIC} {json.dumps(data)}"
-            zmq_socket.send_string(message)
-
-            # TRIGGER DETECTION (replicated from subscriber)
-            # Check if x_local is inside current target bounds
-            if x_local is not None and isinstance(x_local, (int, float)) and rect_x_mm is not None and rect_x_end_mm is not None:
-                inside_bounds = (rect_x_mm <= x_local <= rect_x_end_mm)
+                    log_row = self.touch_log.append(frame, pen_tip[0], pen_tip[1], pen_tip[2], dist, x_local)
+
+                # TRIGGER DETECTION (replicated from subscriber)
+                # Check if x_local is inside current target bounds
+                if x_local is not None and isinstance(x_local, (int, float)) and self.rect_x_mm is not None and self.rect_x_end_mm is not None:
+                    inside_bounds = (self.rect_x_mm <= x_local <= self.rect_x_end_mm)
+                else:
+                    inside_bounds = False
+
+                # State Machine: Trigger only on transition from 0 → 1 (outside → inside)
+                if inside_bounds and not self.previous_inside:
+                    self.trigger_count += 1
+                    self.trigger_frames.append(frame)
+                    self.metric_triggers.inc()
+                    self.touch_log.mark_clicked_row(log_row)
+                    self.log(f"🔘 TRIGGER {self.trigger_count}/{TOTAL_TRIALS} | x_local: {x_local:.2f}mm | "
+                             f"Target: {self.rect_x_mm:.2f}-{self.rect_x_end_mm:.2f}mm")
+                    # Flip target side for next trial
+                    self.target_side *= -1
+                    self.calculate_target_bounds()
+
+                self.previous_inside = inside_bounds
+
             else:
-                inside_bounds = False
-
-            # State Machine: Trigger only on transition from 0 → 1 (outside → inside)
-            if inside_bounds and not previous_inside:
-                trigger_count += 1
-                clicked_frames.add(frame)
-                print(f"🔘 TRIGGER {trigger_count}/{TOTAL_TRIALS} | x_local: {x_local:.2f}mm | Target: {rect_x_mm:.2f}-{rect_x_end_mm:.2f}mm")
-                # Flip target side for next trial
-                target_side *= -1
-                calculate_target_bounds()
-
-            previous_inside = inside_bounds
-
-            log_rows.append([
-                frame, pen_tip[0], pen_tip[1], pen_tip[2],
-                dist, x_local
-            ])
-            
+                self.metric_frames_rejected.inc()  # Too few markers in the frame
+        except Exception as e:
+            self.log(f"❌ QTM error: {e}")
+
+    def daq_command_count(self):
+        """DAQ commands issued so far by whichever output path is active"""
+        if self.burst_timeline is not None:
+            return self.burst_timeline.counts["played"]
+        if self.streamed_output is not None:
+            return len(self.streamed_output.gate_events)
+        if self.haptic_worker is not None:
+            return self.haptic_worker.counts["executed"]
+        return 0
+
+    def haptic_queue_depth(self):
+        """Metrics gauge, read on the reporter thread; the outputs may be swapped meanwhile"""
+        burst_timeline, haptic_worker = self.burst_timeline, self.haptic_worker
+        if burst_timeline is not None:
+            return burst_timeline.depth()
+        if haptic_worker is not None:
+            return haptic_worker.queue_depth()
+        return 0
+
+    async def calibrate_screen(self):
+        """Set screen_calibration for the session: measured from the corner markers, reused or default"""
+        path = Path(self.results_folder) / CALIBRATION_FILENAME
+        default = ScreenCalibration(SCREEN_WIDTH_MM, SCREEN_HEIGHT_MM, self.canvas_width, self.canvas_height)
+
+        if SCREEN_CALIBRATION == "reuse" and path.exists():
+            calibration = ScreenCalibration.load(path)
+            if calibration.width_px != self.canvas_width or calibration.height_px != self.canvas_height:
+                self.log(f"⚠️ {path.name} was made for a {calibration.width_px}x{calibration.height_px} canvas; remapping")
+                calibration.width_px, calibration.height_px = self.canvas_width, self.canvas_height
+            self.screen_calibration = calibration
+            self.log(f"📐 Screen calibration loaded: {calibration}")
+            return
+        if SCREEN_CALIBRATION == "off":
+            self.screen_calibration = default
+            self.log(f"📐 Screen calibration off: {default}")
+            return
+
+        # handle_qtm_data feeds the sampler while no block is running
+        self.log(f"📐 Measuring screen corners for {CALIBRATION_WINDOW_S:g}s...")
+        self.corner_sampler = sampler = CornerSampler(CALIBRATION_WINDOW_S)
+        deadline = time.monotonic() + CALIBRATION_TIMEOUT_S
+        while not sampler.done and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self.corner_sampler = None
+
+        if sampler.done:
+            self.screen_calibration = sampler.result(self.canvas_width, self.canvas_height)
+            self.screen_calibration.save(path)
+            self.log(f"📐 Screen calibration saved to {path.name}: {self.screen_calibration}")
+        else:
+            self.screen_calibration = default
+            self.log(f"⚠️ Corner markers not visible ({sampler.count} frames); using {default}")
+
+    def session_blocks(self):
+        """Block queue of this station's session, in the order its participant runs it"""
+        settings = self.settings
+        if settings["session_blocks"] is None:
+            blocks = [make_block(settings["condition"], settings["ID"], settings["attempts"], settings["delaytime"])]
+        elif isinstance(settings["session_blocks"], (str, Path)):
+            blocks = load_blocks(settings["session_blocks"])
+        else:
+            blocks = settings["session_blocks"]
+        return order_blocks(blocks, settings["block_order"], settings["participant_index"], seed=self.participant_name)
+
+    def apply_block(self, block):
+        """Switch the block settings (condition, ID, attempt, delay) and reset the trial state"""
+        if block["ID"] not in ID_PARAMS:
+            raise ValueError(f"Unsupported ID={block['ID']}. Supported values: {list(ID_PARAMS.keys())}")
+        self.condition = self.vibration_mode = block["condition"]
+        self.ID = block["ID"]
+        self.attempts = block["attempts"]
+        self.delaytime = block["delaytime"]
+        self.W_VALUES = [ID_PARAMS[self.ID]["W"]]
+        self.D_VALUES = [ID_PARAMS[self.ID]["D"]]
+
+        self.trigger_count = 0
+        self.trigger_frames.clear()
+        self.previous_inside = False
+        self.target_side = 1
+        self.continuous_requested = False
+        self.bin_tracker.reset()
+        if self.pen_predictor is not None:
+            self.pen_predictor.reset()
+        self.contact_debouncer = ContactDebouncer(CONTACT_TOUCH_MM, CONTACT_RELEASE_MM, CONTACT_DEBOUNCE_FRAMES)
+        self.calculate_target_bounds()
+
+    def block_prefix(self):
+        return f"{self.participant_name}_{self.condition}_ID{self.ID}_{self.attempts}_{self.delaytime}"
+
+    def start_haptic_worker(self):
+        """Worker for the DAQ paths that issue blocking task commands (gated continuous, finite bursts)"""
+        if self.vibration_mode != "no-vibration" and self.streamed_output is None and self.burst_timeline is None:
+            self.haptic_worker = HapticWorker(
+                {"burst": self.trigger_burst, "start": self.start_continuous, "stop": self.stop_continuous},
+                max_queue=HAPTIC_QUEUE_SIZE,
+                stale_ms=HAPTIC_STALE_MS,
+                tracer=self.latency_tracer,
+            )
+            self.haptic_worker.start()
+
+    def record_catalog(self, output_file, clicked_file):
+        """Add the finished block to Results/catalog.sqlite (the subscriber adds its block CSV)"""
+        try:
+            catalog = SessionCatalog(catalog_path(self.results_folder))
+            stat = output_file.stat()
+            catalog.record_block(
+                block_key(self.results_folder, self.participant_name, self.condition, self.ID, self.attempts,
+                          self.delaytime),
+                touch_log=str(output_file.resolve()), clicked_log=str(clicked_file.resolve()),
+                rows=self.touch_log.rows_written, triggers=len(self.trigger_frames),
+                trigger_frames=self.trigger_frames, touch_log_mtime=stat.st_mtime, touch_log_size=stat.st_size)
+            catalog.close()
+        except Exception as e:
+            self.log(f"⚠️ Session catalog not updated: {e}")
+
+    async def start(self):
+        """Open the metrics endpoint, results folder and lifecycle channel, and launch the subscriber"""
+        settings = self.settings
+        self.metrics.gauge("daq_commands", self.daq_command_count)
+        self.metrics.gauge("haptic_queue_depth", self.haptic_queue_depth)
+        self.metrics.gauge("log_rows_written", lambda: self.touch_log.rows_written if self.touch_log is not None else 0)
+        self.metrics_reporter = MetricsReporter(
+            self.metrics, settings["metrics_port"], METRICS_INTERVAL_S,
+            summary_counters=("frames_received", "frames_rejected", "frames_recovered", "zmq_sent", "triggers"))
+        self.metrics_reporter.start()
+
+        # Create results folder and session file
+        self.results_folder = str(station_results_dir(settings))
+        os.makedirs(self.results_folder, exist_ok=True)
+        station_file("current_session_path", self.name).write_text(self.results_folder)
+        self.log_dir = Path(self.results_folder)
+
+        # Lifecycle channel first, so the subscriber's ready message is queued whenever it starts
+        self.lifecycle = LifecycleServer(self.zmq_context, settings["config_port"])
+
+        # Launch subscriber automatically; it keeps its window open for the whole session
+        subscriber_path = Path(__file__).parent / "qtm_zmq_subscriber.py"
+        args = [sys.executable, str(subscriber_path),
+                "--port", str(settings["zmq_port"]), "--config-port", str(settings["config_port"])]
+        args += ["--metrics-port", str(settings["subscriber_metrics_port"])]
+        if settings["monitor"] is not None:
+            args += ["--monitor", str(settings["monitor"])]
+        if self.name:
+            args += ["--station", self.name]
+        self.log(f"🚀 Launching subscriber: {subscriber_path.name}")
+        subprocess.Popen(args, cwd=str(Path(__file__).parent))
+        # Waited off the event loop so the stations start their subscribers side by side
+        ready = await asyncio.to_thread(self.lifecycle.wait_for, "ready", SUBSCRIBER_READY_TIMEOUT_S)
+        if ready is None:
+            self.log(f"⚠️ Subscriber did not report ready within {SUBSCRIBER_READY_TIMEOUT_S}s")
+        elif "canvas_width" in ready:
+            # Target geometry is computed on the subscriber's actual canvas
+            self.canvas_width, self.canvas_height = ready["canvas_width"], ready["canvas_height"]
+
+    async def run_block(self, block, number):
+        """Run one block on the open QTM stream: reconfigure, log TOTAL_TRIALS triggers, hand over the logs"""
+        lifecycle = self.lifecycle
+        self.apply_block(block)
+        self.latency_tracer = LatencyTracer(self.process_name)
+        self.log("=" * 40)
+        self.log(f"📋 Block {number}: {self.condition}, ID{self.ID}, attempt {self.attempts}, delay {self.delaytime}")
+
+        # A fresh DAQ task per block: cleanup_daq closed the previous block's task, and the
+        # condition may change the output mode. QTM, ZMQ and the subscriber stay open.
+        if not self.initialize_daq():
+            raise RuntimeError("Failed to initialize DAQ")
+        self.start_haptic_worker()
+
+        # Write participant_info.txt (participant_info_<name>.txt) for any other scripts that need it
+        info_file = station_file("participant_info", self.name)
+        with open(info_file, "w") as f:
+            f.write(f"{self.participant_name},{self.condition},{self.attempts},{self.ID},{self.delaytime}")
+
+        config_data = {
+            "participant_name": self.participant_name,
+            "participant_folder": self.results_folder,
+            "conditions": self.condition,
+            "attempts": self.attempts,
+            "ID": self.ID,
+            "delaytime": self.delaytime,
+            "W_VALUES": self.W_VALUES,
+            "D_VALUES": self.D_VALUES,
+            "TOTAL_TRIALS": TOTAL_TRIALS,
+            "block": number,
+            "calibration": self.screen_calibration.to_dict(),
+        }
+        # Lifecycle steps run off the event loop so QTM packets keep being consumed meanwhile
+        if await asyncio.to_thread(lifecycle.request, "config", config_data, "config_ack", HANDSHAKE_TIMEOUT_S):
+            self.log(f"📤 Config acknowledged by subscriber")
+        else:
+            self.log(f"⚠️ Subscriber did not acknowledge the config")
+
+        output_file = self.log_dir / f"{self.block_prefix()}_touch_log.csv"
+        clicked_file = self.log_dir / f"{self.block_prefix()}_clicked_log.csv"
+
+        # Frames are written in chunks during the session, not dumped at the end
+        self.touch_log = TouchLogWriter(output_file, clicked_file, LOG_COLUMNS)
+        self.touch_log.start()
+        self.metrics_reporter.set_snapshot_path(self.log_dir / f"{self.block_prefix()}_metrics_{self.process_name}.jsonl")
+
+        self.log(f"Vibration mode: {self.vibration_mode}")
+        if self.vibration_mode == "motion-coupled":
+            self.log(f"Output: {FREQUENCY}Hz, ±{AMPLITUDE}V sine wave (burst per bin change)")
+        elif self.vibration_mode == "continuous":
+            self.log(f"Output: {FREQUENCY}Hz, ±{AMPLITUDE}V sine wave (continuous while touching)")
+        else:
+            self.log(f"Output: NONE (no-vibration mode)")
+        self.log(f"Stops after: {TOTAL_TRIALS} triggers")
+        self.log(f"Bins: {self.bin_tracker.num_bins}, Range: {self.bin_tracker.edges[0]:g}-{self.bin_tracker.edges[-1]:g}mm")
+        self.log(f"Reference line: Left edge (bottom left to bottom right)")
+        self.log("-" * 40)
+
+        self.block_active = True
+        lifecycle.send("run_start")
+        self.log("🟢 Logging started...")
+
+        # Wait for TOTAL_TRIALS triggers
+        while self.trigger_count < TOTAL_TRIALS:
+            await asyncio.sleep(0.05)
+            error = self.output_error()
+            if error is not None:
+                # A driver error ended the feeder; without a restart the block would continue silently
+                self.metric_output_restarts.inc()
+                self.log(f"⚠️ Haptic output stopped ({error}); restarting it")
+                if not await asyncio.to_thread(self.restart_output):
+                    raise RuntimeError("Failed to restart the DAQ output")
+        self.block_active = False
+        self.log(f"🛑 {TOTAL_TRIALS} triggers detected. Stopping...")
+
+        self.log("Saving data...")
+        self.touch_log.close()
+        self.log(f"   {self.touch_log.rows_written} frames, {self.touch_log.clicked_written} clicked")
+
+        self.log(f"✅ Data saved to: {output_file}")
+        self.log(f"✅ Clicked data saved to: {clicked_file}")
+        log_paths = {"touch_log": str(output_file), "clicked_log": str(clicked_file)}
+        if not await asyncio.to_thread(lifecycle.request, "log_complete", log_paths, "log_complete_ack", HANDSHAKE_TIMEOUT_S):
+            self.log(f"⚠️ Subscriber did not acknowledge log_complete")
+        # SQLite may wait up to its busy timeout on the subscriber's write; keep other stations running
+        await asyncio.to_thread(self.record_catalog, output_file, clicked_file)
+
+        # Stopping the outputs waits for the buffer to drain to 0 V; off the loop, other stations keep running
+        await asyncio.to_thread(self.cleanup_daq)
+        self.latency_tracer.print_summary()
+        self.latency_tracer.dump(self.log_dir / f"{self.block_prefix()}_latency_{self.process_name}.json")
+
+        # The subscriber shows the end screen, saves its block file and returns to its start screen
+        if await asyncio.to_thread(lifecycle.wait_for, "block_done", BLOCK_DONE_TIMEOUT_S) is None:
+            self.log(f"⚠️ Subscriber did not finish the block within {BLOCK_DONE_TIMEOUT_S}s")
+
+    async def run_session(self):
+        """Calibrate the screen, then run this station's blocks on the shared QTM stream"""
+        blocks = self.session_blocks()
+        await self.calibrate_screen()
+
+        self.log(f"🗂️ {len(blocks)} block(s), order {self.settings['block_order']}: " +
+                 ", ".join(f"{b['condition']}/ID{b['ID']}/{b['attempts']}" for b in blocks))
+        for number, block in enumerate(blocks, start=1):
+            await self.run_block(block, number)
+
+        self.lifecycle.send("session_end")
+        self.log(f"🏁 Session complete: {len(blocks)} block(s)")
+
+    def close(self):
+        if self.metrics_reporter is not None:
+            self.metrics_reporter.stop()
+        if self.lifecycle is not None:
+            self.lifecycle.close()
+        self.zmq_socket.close()
+
+    def abort(self):
+        """Release the DAQ and flush the open log after an interrupted session"""
+        self.cleanup_daq()
+        if self.touch_log is not None:
+            self.touch_log.close()
+
+
+async def stream_labels(connection):
+    """3D labels and 6D body names of the QTM stream; labels from LABEL_LIST_FILE if QTM reports none"""
+    labels, bodies = [], []
+    try:
+        parameters = await connection.get_parameters(parameters=['3d', '6d'])
+        labels, bodies = label_names(parameters), body_names(parameters)
     except Exception as e:
-        print(f"❌ QTM error: {e}")
+        print(f"⚠️ QTM 3D/6D parameters not available: {e}")
+    if not labels and LABEL_LIST_FILE and Path(LABEL_LIST_FILE).exists():
+        labels = label_names(Path(LABEL_LIST_FILE).read_bytes())
+        print(f"🏷️ Labels from {Path(LABEL_LIST_FILE).name}: {', '.join(labels)}")
+    return labels, bodies
 
 
-async def main():
-    global log_rows, clicked_frames, start_time, log_dir
-
-    # Initialize DAQ
-    if not initialize_daq():
-        print("\nFailed to initialize DAQ. Exiting.")
-        sys.exit(1)
-
-    # Create results folder and session file
-    import os
-    base_dir = str(Path(__file__).parent / "Results")
-    results_folder = os.path.join(base_dir, participant_name)
-    os.makedirs(results_folder, exist_ok=True)
-    session_file.write_text(results_folder)
-    log_dir = Path(results_folder)
-
-    # Write participant_info.txt for any other scripts that need it
-    info_file = Path(__file__).parent / "participant_info.txt"
-    with open(info_file, "w") as f:
-        f.write(f"{participant_name},{CONDITION},{attempts},{ID},{delaytime}")
-
-    # Launch subscriber automatically
-    subscriber_path = Path(__file__).parent / "qtm_zmq_subscriber.py"
-    print(f"🚀 Launching subscriber: {subscriber_path.name}")
-    subprocess.Popen([sys.executable, str(subscriber_path)], cwd=str(Path(__file__).parent))
-
-    # Send config to subscriber via ZMQ config socket
-    zmq_config_socket = zmq_context.socket(zmq.PUB)
-    zmq_config_socket.bind(f"tcp://*:{ZMQ_CONFIG_PORT}")
-    time.sleep(2)  # Wait for subscriber to connect
-
-    config_data = {
-        "participant_name": participant_name,
-        "participant_folder": results_folder,
-        "conditions": CONDITION,
-        "attempts": attempts,
-        "ID": ID,
-        "delaytime": delaytime,
-        "W_VALUES": W_VALUES,
-        "D_VALUES": D_VALUES,
-        "TOTAL_TRIALS": TOTAL_TRIALS,
+STATION_PORTS = ("zmq_port", "config_port", "metrics_port", "subscriber_metrics_port")
+
+
+def create_stations(zmq_context):
+    """Stations from STATIONS (or the single default one).
+
+    Names, ports (across all of a station's ports, publisher and subscriber), DAQ
+    devices and output folders must not collide; a shared folder would mix the
+    stations' logs and .part files.
+    """
+    station_settings = [dict(station_defaults(), **overrides) for overrides in (STATIONS or [{}])]
+    for settings in station_settings:
+        if settings["subscriber_metrics_port"] is None:
+            settings["subscriber_metrics_port"] = settings["metrics_port"] + 1
+    checks = {
+        "name": lambda settings: [settings["name"]],
+        "port": lambda settings: [settings[key] for key in STATION_PORTS],
+        "DAQ device": lambda settings: [settings["device_ao"].split("/")[0]],
+        "results folder": lambda settings: [str(station_results_dir(settings).resolve())],
     }
-    # Send config multiple times to ensure delivery (PUB/SUB can miss first messages)
-    for _ in range(5):
-        zmq_config_socket.send_string(f"config {json.dumps(config_data)}")
-        time.sleep(0.1)
-    print(f"📤 Config sent to subscriber")
-
-    output_file = log_dir / f"{participant_name}_{CONDITION}_ID{ID}_{attempts}_{delaytime}_touch_log.csv"
-    clicked_file = log_dir / f"{participant_name}_{CONDITION}_ID{ID}_{attempts}_{delaytime}_clicked_log.csv"
-
-    log_rows.clear()
-    clicked_frames.clear()
-
-    print(f"Vibration mode: {vibration_mode}")
-    if vibration_mode == "motion-coupled":
-        print(f"Output: {FREQUENCY}Hz, ±{AMPLITUDE}V sine wave (burst per bin change)")
-    elif vibration_mode == "continuous":
-        print(f"Output: {FREQUENCY}Hz, ±{AMPLITUDE}V sine wave (continuous while touching)")
-    else:
-        print(f"Output: NONE (no-vibration mode)")
-    print(f"Stops after: {TOTAL_TRIALS} triggers")
-    print(f"Bins: {NUM_BINS}, Range: {FSR_MIN}-{FSR_MAX}mm")
-    print(f"Reference line: Left edge (bottom left to bottom right)")
-    print("-" * 40)
+    for what, values_of in checks.items():
+        values = [value for settings in station_settings for value in values_of(settings)]
+        duplicates = sorted({str(value) for value in values if values.count(value) > 1})
+        if duplicates:
+            raise ValueError(f"Stations need distinct {what}s, {', '.join(duplicates)} used more than once")
+    return [Station(zmq_context, settings) for settings in station_settings]
+
 
+async def main():
+    zmq_context = zmq.Context()
+    stations.extend(create_stations(zmq_context))
+    await asyncio.gather(*(station.start() for station in stations))
+
+    def on_packet(packet):
+        # One timestamp per packet, so every station measures its latencies from the same arrival
+        t_packet_in = now_ns()
+        for station in stations:
+            station.handle_qtm_data(packet, t_packet_in)
+
+    # One QTM connection and stream for all stations and blocks; each station ignores frames between its blocks
     connection = await qtm_rt.connect(QTM_HOST)
-    await connection.stream_frames(components=['3d', '6d'], on_packet=handle_qtm_data)
-
-    print("🟢 Logging started...")
-
-    # Wait for TOTAL_TRIALS triggers
-    while trigger_count < TOTAL_TRIALS:
-        await asyncio.sleep(0.05)
-    
-    streaming_enabled = False
-    print(f"🛑 {TOTAL_TRIALS} triggers detected. Stopping...")
-
-    print("Saving data...")
-
-    # Save CSV
-    headers = ['Frame', 'Pen X', 'Pen Y', 'Pen Z', 'Distance to Plane (mm)', 
-               'Local X', 'Clicked']
-
-    with open(output_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        for row in log_rows:
-            frame = row[0]
-            clicked = 1 if frame in clicked_frames else 0
-            writer.writerow(row + [clicked])
-
-    with open(clicked_file, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        for row in log_rows:
-            frame = row[0]
-            if frame in clicked_frames:
-                writer.writerow(row + [1])
-
-    print(f"✅ Data saved to: {output_file}")
-    print(f"✅ Clicked data saved to: {clicked_file}")
-    
+    labels, bodies = [], []
+    if any(station.settings["tracking"] == "labels" for station in stations):
+        labels, bodies = await stream_labels(connection)
+    # 6D is only requested when a station's tracker reads the pen body
+    needs_6d = [station.configure_tracking(labels, bodies) for station in stations]
+    components = ['3d', '6d'] if any(needs_6d) else ['3d']
+    print(f"📡 Streaming {', '.join(components)} from QTM")
+    await connection.stream_frames(components=components, on_packet=on_packet)
+
+    await asyncio.gather(*(station.run_session() for station in stations))
+
     # Cleanup
-    cleanup_daq()
-    zmq_config_socket.close()
-    zmq_socket.close()
+    for station in stations:
+        station.close()
     zmq_context.term()
-    time.sleep(2)
     sys.exit(0)
 
 
@@ -616,7 +994,9 @@ if __name__ == "__main__":
         asyncio.run(main())
     except KeyboardInterrupt:
         print("\nShutting down...")
-        cleanup_daq()
+        for station in stations:
+            station.abort()
     except Exception as e:
         print(f"Error: {e}")
-        cleanup_daq()
\ No newline at end of file
+        for station in stations:
+            station.abort()
@@ -1,21 +1,32 @@
 import os
 import time
+import argparse
 import csv
-import threading
+import queue
+import multiprocessing as mp
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 from screeninfo import get_monitors
 import ctypes
 from pathlib import Path
 import sys
-import zmq
-import json
+from qtm_latency import LatencyTracer, now_ns
+from qtm_ingest import run_ingest
+from qtm_calibration import ScreenCalibration
+from qtm_catalog import SessionCatalog, catalog_path, block_key
 
 # ZeroMQ Configuration
 ZMQ_HOST = "localhost"
 ZMQ_PORT = 5555
 ZMQ_CONFIG_PORT = 5556  # Port for receiving config from publisher
 ZMQ_TOPIC = "qtm_data"
+ZMQ_CONFLATE = False  # Keep only the newest message in the socket; needs ZMQ_SINGLE_FRAME = True in the publisher
+ZMQ_RCVHWM = 64       # Max queued messages (~0.2 s at 300 Hz) before ZMQ drops new ones
+ZMQ_MAX_DRAIN = 1000  # Upper bound on messages drained per wake-up
+METRICS_PORT = 5558  # Local status endpoint of the ingest process (query with: python qtm_metrics.py --port 5558)
+INGEST_POLL_MS = 5    # How often the GUI drains the ingest event queue
+LOG_COMPLETE_TIMEOUT_S = 10  # Max wait at teardown for the publisher's log_complete
+LOG_COMPLETE_POLL_MS = 50    # How often the GUI checks for it meanwhile, without blocking Tk
 
 # Default W/D values (will be overridden by publisher config)
 W_VALUES = [80]
@@ -39,16 +50,35 @@ previous_rects = []
 data = []
 target_sides = []
 current_rect = (0, 0, 0, 0)
+# Persistent canvas items, moved/recoloured on each trial instead of redrawn
+target_item = None  # The current target
+trail_items = {}    # Earlier target rect -> its lightgrey item (one per distinct position)
+# Screen size and mm-per-pixel mapping; the publisher's calibration arrives with each block config
+screen_calibration = ScreenCalibration(346.0, 194.57, 1920, 1080)
+clicked_frames = None  # qtm_TB.clicked_frames, imported once in start_experiment()
 start_time = 0
 CANVAS_WIDTH = 0
 CANVAS_HEIGHT = 0
 experiment_finished = False
 
-# ZMQ State Machine Variables
+# Trigger state as seen by the GUI (the state machine itself runs in the ingest process)
 latest_frame = None
-previous_inside = False
 trigger_detected = False
 
+# A block runs from the start button until its data is saved; a config arriving meanwhile waits here
+block_active = False
+deferred_config = None
+
+# Latency tracing: stamps of the frame that caused the pending trigger
+latency_tracer = LatencyTracer("subscriber")
+trigger_stamps = (0, 0)  # (t_packet_in, t_received)
+
+# ZMQ ingest and the trigger state machine run in a separate process (qtm_ingest.py)
+ingest_process = None
+ingest_events = None   # ingest -> GUI: config, triggers, throttled pen state
+ingest_control = None  # GUI -> ingest: target bounds, stop
+log_complete = None    # Set by the ingest process when the publisher reports its logs closed
+
 # Global variables for target bounds in mm
 rect_x_mm = None
 rect_x_end_mm = None
@@ -56,157 +86,115 @@ rect_x_end_mm = None
 script_dir = Path(__file__).parent
 session_file = script_dir / "current_session_path.txt"
 
-monitors = get_monitors()
-selected_monitor = monitors[1] if len(monitors) > 1 else monitors[0]
-root = tk.Tk()
-root.withdraw()
-experiment_window = tk.Toplevel()
-screen_x = selected_monitor.x
-screen_y = selected_monitor.y
-screen_width = selected_monitor.width
-screen_height = selected_monitor.height
-experiment_window.geometry(f"{screen_width}x{screen_height}+{screen_x}+{screen_y}")
-experiment_window.update_idletasks()
-hwnd = ctypes.windll.user32.GetForegroundWindow()
-ctypes.windll.user32.MoveWindow(hwnd, screen_x, screen_y, screen_width, screen_height, True)
-CANVAS_WIDTH = screen_width
-CANVAS_HEIGHT = screen_height
-canvas = tk.Canvas(experiment_window, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, bg="white")
-canvas.pack()
-canvas.pack_forget()
-
-def listen_zmq():
-    """ZMQ listener with state machine trigger detection."""
-    global latest_frame, previous_inside, trigger_detected, current_rect, rect_x_mm, rect_x_end_mm
-    
-    ctx = zmq.Context()
-    socket = ctx.socket(zmq.SUB)
-    
-    connect_addr = f"tcp://{ZMQ_HOST}:{ZMQ_PORT}"
-    socket.connect(connect_addr)
-    socket.setsockopt_string(zmq.SUBSCRIBE, ZMQ_TOPIC)
-    
-    print(f"\U0001F4E1 Connected to {connect_addr}")
-    print(f"\U0001F4E5 Subscribed to topic: '{ZMQ_TOPIC}'")
-    print("\U0001F7E2 Waiting for data...\n")
 
-    while not experiment_finished:
+def poll_ingest():
+    """Handle everything the ingest process queued since the last poll, then reschedule."""
+    global latest_frame, trigger_detected, trigger_stamps, deferred_config
+
+    while True:
         try:
-            message = socket.recv_string()
-            _, json_str = message.split(" ", 1)
-            data = json.loads(json_str)
-            
-            frame = data['frame']
-            x_local = data.get('x_local')
-            status = data.get('status', 'unknown')
+            event = ingest_events.get_nowait()
+        except queue.Empty:
+            break
+        kind = event[0]
+        if kind == "trigger":
+            _, frame, x_local, status, t_packet_in, t_received = event
             latest_frame = frame
-            
-            # Calculate inside_bounds based on x_local position and actual target bounds
-            # 1 = inside bounds, 0 = outside bounds
-            if x_local is not None and rect_x_mm is not None and rect_x_end_mm is not None:
-                # Convert x_local to absolute value for comparison
-                x_local_abs = abs(x_local)
-                inside_bounds = (rect_x_mm <= x_local_abs <= rect_x_end_mm)
-            else:
-                inside_bounds = False
-            
-            state_value = 1 if inside_bounds else 0
-
-            # Build rect_bounds_str using global variables
-            if rect_x_mm is not None and rect_x_end_mm is not None:
-                rect_bounds_str = f" | Target bounds (mm): {rect_x_mm:.2f} to {rect_x_end_mm:.2f}"
+            trigger_detected = True
+            trigger_stamps = (t_packet_in, t_received)
+            print(f"Frame {frame:6d} | X_local: {x_local} | Status: {status}{get_target_bounds_str()} | \U0001F518 TRIGGER DETECTED!")
+            handle_zmq_trigger()
+        elif kind == "frame":
+            latest_frame = event[1]
+        elif kind == "config":
+            if block_active:
+                # Resetting now would abort the running trial; apply it once the block is saved
+                print(f"⚠️ Config for block {event[1].get('block', '?')} arrived during a running block; "
+                      f"deferred until it ends")
+                deferred_config = event[1]
             else:
-                rect_bounds_str = ""
-
-            print(f"Frame {frame:6d} | State: {state_value} | X_local: {x_local} | Status: {status} | Prev: {1 if previous_inside else 0}{rect_bounds_str}", end="")
-            
-            # State Machine: Trigger only on transition from 0 → 1 (outside → inside)
-            if inside_bounds and not previous_inside:
-                # Transition detected: 0 → 1
-                trigger_detected = True
-                experiment_window.event_generate('<<ZMQTrigger>>', when='tail')
-                print(" | \U0001F518 TRIGGER DETECTED!")
-            else:
-                print()
-            
-            # Update state for next iteration
-            previous_inside = inside_bounds
-            
-        except Exception as e:
-            print(f"❌ ZMQ error: {e}")
-            time.sleep(0.1)
-
-
-    socket.close()
-    ctx.term()
-    print("🛑 ZMQ listener stopped.")
+                reset_block()
+                apply_config(event[1])
+        elif kind == "run_start":
+            print("🟢 Publisher is streaming")
+            btn_start.config(state=tk.NORMAL)
+        elif kind == "log_complete":
+            print(f"✅ Publisher logs complete: {event[1].get('clicked_log', '')}")
+        elif kind == "session_end":
+            finish_session()
+
+    experiment_window.after(INGEST_POLL_MS, poll_ingest)
+
+def stop_ingest():
+    if ingest_process is not None and ingest_process.is_alive():
+        ingest_control.put(("stop",))
+        ingest_process.join(2.0)
+
+def get_target_bounds_str():
+    if rect_x_mm is None or rect_x_end_mm is None:
+        return ""
+    return f" | Target bounds (mm): {rect_x_mm:.2f} to {rect_x_end_mm:.2f}"
 
 def get_rect_bounds_str():
-    global current_rect, screen_width_mm
-
     rect_x, _, rect_w, _ = current_rect
 
     if rect_w == 0:
         return ""
 
-    mm_per_px_x = screen_width_mm / CANVAS_WIDTH
-    left_mm = rect_x * mm_per_px_x
-    right_mm = (rect_x + rect_w) * mm_per_px_x
+    left_mm, right_mm = screen_calibration.span_mm(rect_x, rect_w)
 
     return f" | Target(mm): {left_mm:.2f}->{right_mm:.2f}"
 
 
-def draw_rectangle():
-    global current_rect, start_time, rect_x_mm, rect_x_end_mm
+def reset_canvas():
+    """Remove the previous block's items; the next draw_rectangle() creates them once"""
+    global target_item
     canvas.delete("all")
-    for rect in previous_rects:
-        canvas.create_rectangle(rect[0], rect[1], rect[0]+rect[2], rect[1]+rect[3], fill="lightgrey")
+    target_item = None
+    trail_items.clear()
+
+def draw_rectangle():
+    """Show the next target. Cost does not grow with the trial count: the target is one
+    persistent item moved with coords(), and an earlier position gets its lightgrey
+    item only the first time it is vacated. No file I/O happens here."""
+    global current_rect, start_time, rect_x_mm, rect_x_end_mm, target_item
+    if previous_rects and previous_rects[-1] not in trail_items:
+        rect = previous_rects[-1]
+        item = canvas.create_rectangle(rect[0], rect[1], rect[0]+rect[2], rect[1]+rect[3], fill="lightgrey")
+        canvas.tag_lower(item)
+        trail_items[rect] = item
     rect_width = W_VALUES[difficulty - 1]
     distance = D_VALUES[difficulty - 1]
     rect_height = CANVAS_HEIGHT
     center_x = CANVAS_WIDTH / 2
     rect_x = center_x + (target_side * (distance / 2)) - (rect_width / 2)
     rect_y = 0
-    canvas.create_rectangle(rect_x, rect_y, rect_x + rect_width, rect_y + rect_height, fill="blue")
+    if target_item is None:
+        target_item = canvas.create_rectangle(rect_x, rect_y, rect_x + rect_width, rect_y + rect_height, fill="blue")
+    else:
+        canvas.coords(target_item, rect_x, rect_y, rect_x + rect_width, rect_y + rect_height)
     current_rect = (rect_x, rect_y, rect_width, rect_height)
     start_time = time.time()
     
-    # Calculate and store target bounds in mm as global variables
-    screen_width_mm, _ = get_screen_dimensions_mm()
-    px_to_mm = screen_width_mm / CANVAS_WIDTH if CANVAS_WIDTH else 1
-    rect_x_mm = rect_x * px_to_mm
-    rect_x_end_mm = (rect_x + rect_width) * px_to_mm
+    # Calculate and store target bounds in mm as global variables (same mapping as the publisher)
+    rect_x_mm, rect_x_end_mm = screen_calibration.span_mm(rect_x, rect_width)
+    ingest_control.put(("target", rect_x_mm, rect_x_end_mm))
     
     print(f"\nTarget bounds (mm): {rect_x_mm:.2f} to {rect_x_end_mm:.2f}\n")
 
-def get_screen_dimensions_mm():
-    try:
-        files = sorted(Path(participant_folder).glob("clicked_log_*.csv"), reverse=True)
-        if not files:
-            return 346.00, 194.57
-        with open(files[0], 'r', newline='') as f:
-            reader = csv.reader(f)
-            next(reader)  # skip header
-            x_vals = []
-            y_vals = []
-            for r in reader:
-                if len(r) > 6 and r[5] != 'NaN' and r[6] != 'NaN':
-                    x_vals.append(abs(float(r[5])))
-                    y_vals.append(abs(float(r[6])))
-        return max(x_vals)*2 if x_vals else 346.0, max(y_vals)*2 if y_vals else 194.57
-    except:
-        return 346.0, 194.57
-
-def handle_zmq_trigger(event=None):
-    """Handle trigger from ZMQ instead of serial."""
+def handle_zmq_trigger():
+    """Handle a trigger event from the ingest process."""
     global clicks, target_side, current_rect, experiment_finished, trigger_detected
     
     if experiment_finished:
         return
     
+    t_handled = now_ns()
+    t_packet_in, t_received = trigger_stamps
+    latency_tracer.record("received->trigger_handled", t_received, t_handled)
+
     # Mark frame as clicked in qtm_TB.py's clicked_frames
-    from qtm_TB import clicked_frames
-    if latest_frame is not None:
+    if clicked_frames is not None and latest_frame is not None:
         clicked_frames.add(latest_frame)
     
     click_time = time.time()
@@ -223,12 +211,17 @@ def handle_zmq_trigger(event=None):
     
     if clicks >= TOTAL_TRIALS:
         experiment_finished = True
-        experiment_window.unbind('<<ZMQTrigger>>')
         end_trial()
     else:
         draw_rectangle()
-
-def save_data_and_finish():
+        # Flush the redraw so the stamp marks when the new target is on the canvas
+        experiment_window.update_idletasks()
+        t_canvas = now_ns()
+        latency_tracer.record("trigger_handled->canvas_updated", t_handled, t_canvas)
+        latency_tracer.record("packet_in->canvas_updated", t_packet_in, t_canvas)
+
+def save_data_and_finish(on_finished):
+    """Save the block's data, then call on_finished() once the publisher has closed its logs"""
     global experiment_finished, participant_folder  
     print(f"� {TOTAL_TRIALS} triggers done. Saving subscriber data...")
     # Exclude first 3 trials from averages (first trials are positioning, not real Fitts' movements)
@@ -265,15 +258,33 @@ def save_data_and_finish():
         ])
     print(f"✅ Data saved to: {filepath}")
 
-    # Wait for publisher's clicked_log (with timeout)
-    clicked_log = os.path.join(participant_folder, f"{participant_name}_{conditions}_ID{ID}_{attempts}_{delaytime}_clicked_log.csv")
-    for _ in range(20):  # Wait up to 10 seconds
-        if os.path.exists(clicked_log):
-            break
-        time.sleep(0.5)
+    try:
+        catalog = SessionCatalog(catalog_path(participant_folder))
+        catalog.record_block(block_key(participant_folder, participant_name, conditions, ID, attempts, delaytime),
+                             block_csv=str(Path(filepath).resolve()), MT_ms=avg_mt, speed=avg_speed, throughput=avg_tp)
+        catalog.close()
+    except Exception as e:
+        print(f"⚠️ Session catalog not updated: {e}")
 
-    summary = f"Avg MT: {avg_mt:.2f} ms\nAvg Speed: {avg_speed:.2f} px/ms\nAvg Throughput: {avg_tp:.2f} bit/s"
-    print(summary)
+    # The publisher reports log_complete once its clicked_log is closed; normally already set.
+    # Poll for it from the Tk loop, so the window keeps redrawing while it is late
+    deadline = time.monotonic() + LOG_COMPLETE_TIMEOUT_S
+
+    def wait_for_log_complete():
+        if not log_complete.is_set():
+            if time.monotonic() < deadline:
+                experiment_window.after(LOG_COMPLETE_POLL_MS, wait_for_log_complete)
+                return
+            print("⚠️ Publisher did not report log_complete")
+
+        summary = f"Avg MT: {avg_mt:.2f} ms\nAvg Speed: {avg_speed:.2f} px/ms\nAvg Throughput: {avg_tp:.2f} bit/s"
+        print(summary)
+
+        latency_tracer.print_summary()
+        latency_tracer.dump(os.path.join(participant_folder, f"{participant_name}_{conditions}_ID{ID}_{attempts}_{delaytime}_latency_subscriber.json"))
+        on_finished()
+
+    wait_for_log_complete()
 
 STAY_RED_MS = 3_000
 
@@ -282,21 +293,33 @@ def end_trial():
     rect_x, rect_y, rect_width, rect_height = current_rect
 
     def show_red():
-        canvas.delete("all")
-        canvas.create_rectangle(rect_x, rect_y, rect_x + rect_width, rect_y + rect_height, fill="red")
+        for item in trail_items.values():
+            canvas.itemconfigure(item, state=tk.HIDDEN)
+        canvas.coords(target_item, rect_x, rect_y, rect_x + rect_width, rect_y + rect_height)
+        canvas.itemconfigure(target_item, fill="red")
         experiment_window.update()
 
-        def quit_after_red():
-            save_data_and_finish()
-            print("👋 Subscriber exiting...")
-            os._exit(0)
-
-        experiment_window.after(STAY_RED_MS, quit_after_red)
+        def back_to_start():
+            global block_active, deferred_config
+            # Back to the start screen; the publisher sends the next block's config or session_end
+            reset_canvas()
+            canvas.pack_forget()
+            btn_start.config(state=tk.DISABLED)
+            btn_start.pack(pady=10)
+            block_active = False
+            if deferred_config is not None:
+                reset_block()
+                apply_config(deferred_config)
+                deferred_config = None
+            ingest_control.put(("block_done",))
+
+        experiment_window.after(STAY_RED_MS, save_data_and_finish, back_to_start)
 
     experiment_window.after(delaytime, show_red)
 
 def begin_trial():
-    global difficulty, clicks, data, previous_rects, target_sides
+    global difficulty, clicks, data, previous_rects, target_sides, block_active
+    block_active = True
     difficulty = 1
     clicks = 0
     data.clear()
@@ -304,23 +327,31 @@ def begin_trial():
     previous_rects.clear()
     trial_count.setdefault(participant_id, {}).setdefault(difficulty, 0)
     trial_count[participant_id][difficulty] += 1
+    reset_canvas()
     canvas.pack()
     draw_rectangle()
 
-def wait_for_config():
-    """Wait for config from publisher via ZMQ config channel."""
+def reset_block():
+    """Clear the previous block's state before the next block's config is applied"""
+    global experiment_finished, trigger_detected, latency_tracer, trigger_stamps, rect_x_mm, rect_x_end_mm
+    global target_side
+    experiment_finished = False
+    target_side = 1  # The publisher also starts every block on the right
+    trigger_detected = False
+    trigger_stamps = (0, 0)
+    rect_x_mm = rect_x_end_mm = None
+    latency_tracer = LatencyTracer("subscriber")
+    log_complete.clear()
+
+def finish_session():
+    stop_ingest()
+    print("👋 Subscriber exiting...")
+    os._exit(0)
+
+def apply_config(config):
+    """Apply the session config the publisher sent (forwarded by the ingest process)."""
     global participant_name, participant_folder, conditions, attempts, ID, delaytime
-    global W_VALUES, D_VALUES, TOTAL_TRIALS
-
-    ctx = zmq.Context()
-    socket = ctx.socket(zmq.SUB)
-    socket.connect(f"tcp://{ZMQ_HOST}:{ZMQ_CONFIG_PORT}")
-    socket.setsockopt_string(zmq.SUBSCRIBE, "config")
-    print("⏳ Waiting for config from publisher...")
-
-    message = socket.recv_string()
-    _, json_str = message.split(" ", 1)
-    config = json.loads(json_str)
+    global W_VALUES, D_VALUES, TOTAL_TRIALS, screen_calibration
 
     participant_name = config["participant_name"]
     participant_folder = config["participant_folder"]
@@ -331,36 +362,85 @@ def wait_for_config():
     W_VALUES = config.get("W_VALUES", W_VALUES)
     D_VALUES = config.get("D_VALUES", D_VALUES)
     TOTAL_TRIALS = config.get("TOTAL_TRIALS", TOTAL_TRIALS)
+    if "calibration" in config:
+        screen_calibration = ScreenCalibration.from_dict(config["calibration"])
+        if screen_calibration.width_px != CANVAS_WIDTH:
+            print(f"⚠️ Calibration is for a {screen_calibration.width_px} px wide canvas, this one is {CANVAS_WIDTH} px")
+        print(f"📐 Screen: {screen_calibration}")
 
-    socket.close()
-    ctx.term()
+    btn_start.config(text=f"Start Block {config.get('block', 1)}")
     print(f"✅ Config received: {participant_name}, {conditions}, ID{ID}, attempt {attempts}, delay {delaytime}")
 
 
 def start_experiment():
-    global participant_name, participant_folder
+    global participant_name, participant_folder, clicked_frames
 
     os.makedirs(participant_folder, exist_ok=True)
     session_file.write_text(participant_folder)
+    # Everything that touches the disk happens here, not on the trigger -> redraw path
+    if clicked_frames is None:
+        from qtm_TB import clicked_frames
     begin_trial()
 
-# Start button (shown after config is received)
-btn_start = tk.Button(experiment_window, text="Start Experiment", font=("Arial", 20),
-                      command=lambda: [btn_start.pack_forget(), start_experiment()])
-btn_start.pack(pady=10)
-btn_start.config(state=tk.DISABLED)  # Disabled until config arrives
-
-# Wait for config from publisher, then enable Start button
-def on_config_received():
-    wait_for_config()
-    experiment_window.after(0, lambda: btn_start.config(state=tk.NORMAL))
-
-# Start config listener in background thread
-threading.Thread(target=on_config_received, daemon=True).start()
-
-# Start ZMQ data listener thread
-threading.Thread(target=listen_zmq, daemon=True).start()
-
-# Bind ZMQ trigger instead of serial
-experiment_window.bind('<<ZMQTrigger>>', handle_zmq_trigger)
-experiment_window.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    # The GUI only exists in the main process; the ingest process imports this module's
+    # dependencies, not its window (multiprocessing re-imports the main script on Windows)
+    # The publisher passes each station's ports (and window) when it runs several stations
+    parser = argparse.ArgumentParser(description="Fitts' task window fed by qtm_zmq_publisher.py")
+    parser.add_argument("--port", type=int, default=ZMQ_PORT)
+    parser.add_argument("--config-port", type=int, default=ZMQ_CONFIG_PORT)
+    parser.add_argument("--metrics-port", type=int, default=METRICS_PORT)
+    parser.add_argument("--monitor", type=int, default=None, help="Monitor index (default: second monitor if present)")
+    parser.add_argument("--station", default="", help="Station name; keys the session file like the publisher does")
+    args = parser.parse_args()
+    if args.station:
+        session_file = script_dir / f"current_session_path_{args.station}.txt"
+
+    monitors = get_monitors()
+    if args.monitor is not None:
+        selected_monitor = monitors[min(args.monitor, len(monitors) - 1)]
+    else:
+        selected_monitor = monitors[1] if len(monitors) > 1 else monitors[0]
+    root = tk.Tk()
+    root.withdraw()
+    experiment_window = tk.Toplevel()
+    screen_x = selected_monitor.x
+    screen_y = selected_monitor.y
+    screen_width = selected_monitor.width
+    screen_height = selected_monitor.height
+    experiment_window.geometry(f"{screen_width}x{screen_height}+{screen_x}+{screen_y}")
+    experiment_window.update_idletasks()
+    hwnd = ctypes.windll.user32.GetForegroundWindow()
+    ctypes.windll.user32.MoveWindow(hwnd, screen_x, screen_y, screen_width, screen_height, True)
+    CANVAS_WIDTH = screen_width
+    CANVAS_HEIGHT = screen_height
+    canvas = tk.Canvas(experiment_window, width=CANVAS_WIDTH, height=CANVAS_HEIGHT, bg="white")
+    canvas.pack()
+    canvas.pack_forget()
+
+    # Start button (shown after config is received)
+    btn_start = tk.Button(experiment_window, text="Start Experiment", font=("Arial", 20),
+                          command=lambda: [btn_start.pack_forget(), start_experiment()])
+    btn_start.pack(pady=10)
+    btn_start.config(state=tk.DISABLED)  # Disabled until the publisher reports run_start
+
+    # Ingest process: lifecycle handshake, ZMQ feed and trigger state machine
+    ingest_events = mp.Queue()
+    ingest_control = mp.Queue()
+    log_complete = mp.Event()
+    ingest_process = mp.Process(target=run_ingest, name="subscriber-ingest", daemon=True, args=(
+        ingest_events, ingest_control, log_complete, {
+            "host": ZMQ_HOST,
+            "port": args.port,
+            "config_port": args.config_port,
+            "topic": ZMQ_TOPIC,
+            "conflate": ZMQ_CONFLATE,
+            "rcvhwm": ZMQ_RCVHWM,
+            "max_drain": ZMQ_MAX_DRAIN,
+            "metrics_port": args.metrics_port,
+            "canvas_size": (CANVAS_WIDTH, CANVAS_HEIGHT),
+        }))
+    ingest_process.start()
+
+    experiment_window.after(INGEST_POLL_MS, poll_ingest)
+    experiment_window.mainloop()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The qtm_* modules are plain scripts next to each other, not an installed package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,30 @@
+import struct
+
+import numpy as np
+from qtm_rt.packet import QRTComponentType, QRTPacket
+
+COMPONENT_HEADER = struct.Struct("<II")
+CORNERS = np.array([[444.0, 294.0, 1000.0], [444.0, 100.0, 1000.0], [100.0, 100.0, 1000.0], [100.0, 294.0, 1000.0]])
+PEN = np.array([[0.0, 0.0, 120.0], [15.0, 0.0, 130.0], [0.0, 15.0, 140.0], [-15.0, 0.0, 150.0]])
+
+
+def make_packet(markers, bodies=None, frame=0, timestamp_us=0):
+    """qtm_rt packet with a 3D component and, if `bodies` is given, a 6D one of (position, rotation) pairs"""
+    markers = np.asarray(markers, dtype="<f4")
+    payload = struct.pack("<Ihh", len(markers), 0, 0) + markers.tobytes()
+    components = COMPONENT_HEADER.pack(COMPONENT_HEADER.size + len(payload), QRTComponentType.Component3d.value) + payload
+    count = 1
+    if bodies is not None:
+        payload = struct.pack("<ihh", len(bodies), 0, 0)
+        for position, rotation in bodies:
+            # QTM sends the rotation matrix column-major
+            payload += np.asarray(position, "<f4").tobytes() + np.asarray(rotation, "<f4").tobytes(order="F")
+        components += COMPONENT_HEADER.pack(COMPONENT_HEADER.size + len(payload),
+                                            QRTComponentType.Component6d.value) + payload
+        count += 1
+    return QRTPacket(struct.pack("<qII", timestamp_us, frame, count) + components)
+
+
+def pen_markers(tip, rotation=np.eye(3)):
+    """Corners, pen body markers and tip in the publisher's MARKER_* order"""
+    return np.vstack([CORNERS, tip + PEN @ rotation.T, [tip]])
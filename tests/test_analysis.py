@@ -0,0 +1,77 @@
+import csv
+
+import numpy as np
+import pytest
+
+from qtm_analysis import analyse_block, analyse_results, estimate_frame_rate
+
+FRAME_RATE = 100.0
+TRIAL_FRAMES = 80  # 800 ms per movement
+TRIALS = 10
+LEFT, RIGHT = 60.0, 260.0
+
+
+def write_block(folder, name="p01_continuous_ID3_1_650", with_block_csv=True):
+    """Reciprocal tapping between LEFT and RIGHT, clicking on arrival and overshooting by 2 mm"""
+    rows = []
+    frame = 0
+    for trial in range(TRIALS + 1):
+        start, end = (LEFT, RIGHT) if trial % 2 == 0 else (RIGHT, LEFT)
+        overshoot = 2.0 if end == RIGHT else -2.0
+        for i in range(TRIAL_FRAMES):
+            x = start + (end - start) * i / (TRIAL_FRAMES - 1)
+            rows.append((frame, x, 0))
+            frame += 1
+        rows[-1] = (rows[-1][0], end, 1)
+        rows.append((frame, end + overshoot, 0))
+        frame += 1
+    touch_log = folder / f"{name}_touch_log.csv"
+    with open(touch_log, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Frame", "Local X", "Clicked"])
+        writer.writerows(rows)
+    if with_block_csv:
+        with open(folder / f"{name}.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["MT", "speed", "throughput", "LocalX", "participant_name"])
+            for _ in range(TRIALS + 1):
+                writer.writerow([(TRIAL_FRAMES + 1) / FRAME_RATE * 1000.0, 0, 0, "", "p01"])
+            writer.writerow(["810.0", "0", "0"])
+    return touch_log
+
+
+def test_block_measures(tmp_path):
+    block, trials = analyse_block(write_block(tmp_path))
+    assert block["frame_rate_hz"] == pytest.approx(FRAME_RATE)
+    assert block["trials"] == len(trials) == TRIALS + 1 - 3
+    assert block["MT_ms"] == pytest.approx((TRIAL_FRAMES + 1) / FRAME_RATE * 1000.0)
+    assert block["Ae_mm"] == pytest.approx(RIGHT - LEFT + 4.0)
+    assert {t["endpoint_mm"] for t in trials} == {LEFT - 2.0, RIGHT + 2.0}
+    assert block["participant"] == "p01" and block["ID"] == "3"
+
+
+def test_frame_rate_argument_replaces_the_estimate(tmp_path):
+    block, _ = analyse_block(write_block(tmp_path, with_block_csv=False), frame_rate=50.0)
+    assert block["frame_rate_hz"] == 50.0
+    assert block["MT_ms"] == pytest.approx((TRIAL_FRAMES + 1) / 50.0 * 1000.0)
+    assert block["block_csv"] == ""
+
+
+def test_missing_frame_rate_is_an_error_not_nan(tmp_path):
+    with pytest.raises(ValueError, match="frame rate"):
+        analyse_block(write_block(tmp_path, with_block_csv=False))
+
+
+def test_estimate_frame_rate():
+    assert estimate_frame_rate(np.array([100.0, 200.0]), np.array([0.0, 1000.0, 2000.0])) == 100.0
+    assert np.isnan(estimate_frame_rate(np.array([100.0]), np.array([1000.0])))
+
+
+def test_results_skip_blocks_that_fail(tmp_path):
+    (tmp_path / "p01").mkdir()
+    (tmp_path / "p02").mkdir()
+    write_block(tmp_path / "p01")
+    write_block(tmp_path / "p02", name="p02_continuous_ID3_1_650", with_block_csv=False)
+    blocks, trials = analyse_results(tmp_path, workers=1)
+    assert [b["participant"] for b in blocks] == ["p01"]
+    assert len(trials) == TRIALS + 1 - 3
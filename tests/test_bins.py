@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from qtm_bins import BinTracker
+
+
+def test_first_sample_only_arms():
+    tracker = BinTracker.uniform(0.0, 100.0, 10)
+    assert tracker.update(35.0, 0.0) == ()
+    assert tracker.current_bin == 3
+
+
+def test_each_boundary_is_reported_with_an_interpolated_time():
+    tracker = BinTracker.uniform(0.0, 100.0, 10)
+    tracker.update(5.0, 0.0)
+    events = tracker.update(35.0, 3.0)
+    assert [(boundary, direction) for boundary, direction, _ in events] == [(1, 1), (2, 1), (3, 1)]
+    assert [t for _, _, t in events] == pytest.approx([0.5, 1.5, 2.5])
+    assert tracker.current_bin == 3
+
+    events = tracker.update(15.0, 5.0)
+    assert [(boundary, direction) for boundary, direction, _ in events] == [(3, -1), (2, -1)]
+    assert [t for _, _, t in events] == pytest.approx([3.5, 4.5])
+
+
+def test_hysteresis_ignores_jitter_on_a_boundary():
+    tracker = BinTracker.uniform(0.0, 100.0, 10, hysteresis_fraction=0.2)
+    tracker.update(9.0, 0.0)
+    for i, x in enumerate([10.5, 9.5, 11.0, 9.0], start=1):
+        assert tracker.update(x, i) == ()
+    assert tracker.update(12.5, 5.0)[0][:2] == (1, 1)
+    assert tracker.update(9.0, 6.0) == ()  # Not past 10 - 2
+    assert tracker.update(7.5, 7.0)[0][:2] == (1, -1)
+
+
+def test_positions_outside_the_table_are_clamped():
+    tracker = BinTracker([0.0, 10.0, 30.0, 60.0])
+    tracker.update(-50.0, 0.0)
+    assert tracker.current_bin == 0
+    assert [boundary for boundary, _, _ in tracker.update(500.0, 1.0)] == [1, 2]
+    assert tracker.current_bin == tracker.num_bins - 1
+
+
+def test_reset_forgets_the_position():
+    tracker = BinTracker.uniform(0.0, 100.0, 10)
+    tracker.update(5.0, 0.0)
+    tracker.reset()
+    assert tracker.current_bin == -1
+    assert tracker.update(95.0, 1.0) == ()
+
+
+def test_edges_from_file(tmp_path):
+    path = tmp_path / "edges.csv"
+    path.write_text("0\n12.5\n40\n")
+    tracker = BinTracker.from_file(path)
+    np.testing.assert_array_equal(tracker.edges, [0.0, 12.5, 40.0])
+    assert tracker.locate(20.0) == 1
+
+
+@pytest.mark.parametrize("edges", [[1.0], [0.0, 10.0, 10.0], [[0.0, 1.0]]])
+def test_invalid_edges(edges):
+    with pytest.raises(ValueError):
+        BinTracker(edges)
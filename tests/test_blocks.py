@@ -0,0 +1,33 @@
+from itertools import pairwise
+
+import pytest
+
+from qtm_blocks import balanced_latin_square_row, make_block, order_blocks
+
+
+@pytest.mark.parametrize("n", [2, 4, 6])
+def test_even_square_is_balanced(n):
+    rows = [balanced_latin_square_row(n, i) for i in range(n)]
+    for position in range(n):
+        assert sorted(row[position] for row in rows) == list(range(n))
+    successions = [pair for row in rows for pair in pairwise(row)]
+    assert len(set(successions)) == len(successions) == n * (n - 1)
+
+
+@pytest.mark.parametrize("n", [3, 5])
+def test_odd_square_is_balanced_over_two_n_rows(n):
+    rows = [balanced_latin_square_row(n, i) for i in range(2 * n)]
+    for row in rows:
+        assert sorted(row) == list(range(n))
+    successions = [pair for row in rows for pair in pairwise(row)]
+    assert all(successions.count((a, b)) == 2 for a in range(n) for b in range(n) if a != b)
+    assert rows[n:] == [row[::-1] for row in rows[:n]]
+
+
+def test_order_blocks():
+    blocks = [make_block(condition, 2, 1, 0) for condition in ("continuous", "motion-coupled", "no-vibration")]
+    assert order_blocks(blocks) == blocks
+    assert order_blocks(blocks, "latin", 1) == [blocks[i] for i in balanced_latin_square_row(3, 1)]
+    assert order_blocks(blocks, "shuffle", seed="p01") == order_blocks(blocks, "shuffle", seed="p01")
+    with pytest.raises(ValueError):
+        order_blocks(blocks, "random")
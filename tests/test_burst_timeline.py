@@ -0,0 +1,78 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from qtm_haptics import BurstTimeline, SimulatedDAQBackend
+
+FS = 5000
+BURST = np.append(np.sin(np.linspace(0, 2 * np.pi, 20, endpoint=False)), 0.0)  # One 250 Hz cycle
+
+
+def simulated_backend():
+    return SimulatedDAQBackend(FS, start_latency_ms=0.0, stop_latency_ms=0.0)
+
+
+def spin(until):
+    while not until.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_bursts_play_without_underflow_next_to_a_busy_thread():
+    backend = simulated_backend()
+    timeline = BurstTimeline(backend, BURST)
+    done = threading.Event()
+    busy = threading.Thread(target=spin, args=(done,), daemon=True)
+    timeline.start()
+    busy.start()
+    try:
+        for _ in range(20):
+            timeline.burst()
+            time.sleep(0.025)
+    finally:
+        done.set()
+        timeline.stop()
+        busy.join()
+    assert timeline.error is None
+    assert backend.report()["underflows"] == 0
+    assert timeline.counts["played"] == 20
+    stats = timeline.summary()
+    # Behind at least the lead, at most twice the lead plus scheduling slack
+    assert 20.0 <= stats["latency_mean_ms"] < 60.0
+
+
+def test_stop_plays_out_accepted_bursts_and_rests_at_zero():
+    backend = simulated_backend()
+    timeline = BurstTimeline(backend, BURST, max_pending=4)
+    timeline.start()
+    for _ in range(3):
+        timeline.burst()
+    timeline.stop()
+    stopped_at = time.perf_counter()
+    assert timeline.counts["played"] == 3
+    last_burst = [e for e in backend.emitted if not e["silent"]][-1]
+    assert last_burst["last_sample_at"] <= stopped_at
+    timeline.burst()
+    assert timeline.counts["dropped"] == 1
+
+
+@pytest.mark.parametrize("policy, played", [("queue", 3), ("merge", 2), ("drop", 1)])
+def test_policy_for_bursts_requested_while_one_plays(policy, played):
+    backend = simulated_backend()
+    timeline = BurstTimeline(backend, BURST, policy=policy, max_pending=2)
+    timeline.start()
+    timeline.burst()
+    while timeline.counts["played"] == 0:
+        time.sleep(0.001)
+    # The first burst sits behind the lead for another 20 ms or more
+    for _ in range(4):
+        timeline.burst()
+    timeline.stop()
+    assert timeline.counts["played"] == played
+    assert timeline.counts["played"] + timeline.counts["merged"] + timeline.counts["dropped"] == 5
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        BurstTimeline(simulated_backend(), BURST, policy="skip")
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from qtm_calibration import CornerSampler, ScreenCalibration
+
+WIDTH_MM, HEIGHT_MM = 344.0, 194.0
+# Top right, bottom right, bottom left, top left
+CORNERS = np.array([[WIDTH_MM, HEIGHT_MM, 0.0], [WIDTH_MM, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, HEIGHT_MM, 0.0]])
+
+
+def test_from_corners_measures_size_and_jitter():
+    rng = np.random.default_rng(0)
+    frames = CORNERS + rng.normal(0.0, 0.05, (200, 4, 3))
+    frames[7] += 50.0  # One bad frame does not move the median
+    calibration = ScreenCalibration.from_corners(frames, 1920, 1080)
+    assert calibration.width_mm == pytest.approx(WIDTH_MM, abs=0.05)
+    assert calibration.height_mm == pytest.approx(HEIGHT_MM, abs=0.05)
+    assert calibration.frames == 200
+    assert calibration.jitter_mm > 0.0
+    assert calibration.mm_per_px == pytest.approx(WIDTH_MM / 1920, rel=1e-3)
+
+
+def test_span_mm():
+    calibration = ScreenCalibration(WIDTH_MM, HEIGHT_MM, 1920, 1080)
+    left, right = calibration.span_mm(960, 192)
+    assert left == pytest.approx(WIDTH_MM / 2)
+    assert right - left == pytest.approx(WIDTH_MM / 10)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    calibration = ScreenCalibration.from_corners(np.repeat(CORNERS[None], 40, axis=0), 1920, 1080)
+    path = tmp_path / "screen_calibration.json"
+    calibration.save(path)
+    assert not (tmp_path / "screen_calibration.json.part").exists()
+    loaded = ScreenCalibration.load(path)
+    assert loaded.to_dict() == calibration.to_dict()
+    np.testing.assert_allclose(loaded.corners, CORNERS)
+    # The subscriber gets the same dict through the lifecycle config
+    assert ScreenCalibration.from_dict(calibration.to_dict()).width_mm == calibration.width_mm
+
+
+def test_sampler_skips_invalid_frames_and_completes():
+    sampler = CornerSampler(window_s=0.0, min_frames=3, max_frames=5)
+    sampler.add(CORNERS, valid=False)
+    assert sampler.count == 0
+    for _ in range(2):
+        sampler.add(CORNERS)
+    assert not sampler.done
+    sampler.add(CORNERS + 1.0)
+    assert sampler.done
+    assert sampler.result(1920, 1080).frames == 3
+
+
+def test_sampler_stops_at_capacity():
+    sampler = CornerSampler(window_s=60.0, min_frames=3, max_frames=4)
+    for _ in range(6):
+        sampler.add(CORNERS)
+    assert sampler.count == 4
+    assert sampler.done
@@ -0,0 +1,79 @@
+import csv
+import json
+
+import pytest
+
+from qtm_catalog import SessionCatalog, block_key, catalog_path
+
+NAME = "p01_continuous_ID3_1_650"
+
+
+def write_block_files(folder, rows=5, clicked=(2, 4), averages=("810.5", "0.31", "3.9")):
+    folder.mkdir(parents=True, exist_ok=True)
+    touch_log = folder / f"{NAME}_touch_log.csv"
+    with open(touch_log, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Frame", "Local X", "Clicked"])
+        writer.writerows([frame, 10.0 * frame, int(frame in clicked)] for frame in range(rows))
+    with open(folder / f"{NAME}_clicked_log.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Frame", "Local X", "Clicked"])
+        writer.writerows([frame, 10.0 * frame, 1] for frame in clicked)
+    with open(folder / f"{NAME}.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["MT", "speed", "throughput"])
+        writer.writerow(["800", "0.3", "4.0"])
+        writer.writerow(averages)
+    return touch_log
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = SessionCatalog(catalog_path(tmp_path / "p01"))
+    yield catalog
+    catalog.close()
+
+
+def test_publisher_and_subscriber_fields_merge_into_one_row(tmp_path, catalog):
+    key = block_key(tmp_path / "p01", "p01", "continuous", "3", 1, 650)
+    catalog.record_block(key, touch_log="a_touch_log.csv", rows=100, triggers=2, trigger_frames=[10, 90])
+    catalog.record_block(key, block_csv="a.csv", MT_ms=812.5)
+    (row,) = catalog.query(participant="p01", ID=3)
+    assert (row["rows"], row["MT_ms"], row["block_csv"]) == (100, 812.5, "a.csv")
+    assert json.loads(row["trigger_frames"]) == [10, 90]
+    assert catalog.query(condition="motion-coupled") == []
+
+
+def test_unknown_fields_and_filters_are_rejected(tmp_path, catalog):
+    key = block_key(tmp_path / "p01", "p01", "continuous", 3, 1, 650)
+    with pytest.raises(ValueError):
+        catalog.record_block(key, colour="red")
+    with pytest.raises(ValueError):
+        catalog.query(touch_log="x")
+
+
+def test_reindex_scans_new_and_changed_blocks_only(tmp_path, catalog):
+    touch_log = write_block_files(tmp_path / "p01")
+    assert catalog.reindex(tmp_path) == (1, 0, 0)
+    (row,) = catalog.query()
+    assert (row["rows"], row["triggers"], row["MT_ms"]) == (5, 2, 810.5)
+    assert json.loads(row["trigger_frames"]) == [2, 4]
+    assert catalog.reindex(tmp_path) == (0, 1, 0)
+
+    write_block_files(tmp_path / "p01", rows=8)
+    assert catalog.reindex(tmp_path) == (1, 0, 0)
+    assert catalog.query()[0]["rows"] == 8
+
+    touch_log.unlink()
+    assert catalog.reindex(tmp_path) == (0, 0, 1)
+    assert catalog.query() == []
+
+
+def test_second_connection_sees_the_writes(tmp_path, catalog):
+    key = block_key(tmp_path / "p01", "p01", "continuous", 3, 1, 650)
+    other = SessionCatalog(catalog.path)
+    try:
+        other.record_block(key, rows=42)
+        assert catalog.query()[0]["rows"] == 42
+    finally:
+        other.close()
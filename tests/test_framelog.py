@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+
+import qtm_framelog
+from qtm_framelog import FrameStore
+
+SCHEMA = [("Frame", "int"), ("X", "nan_float"), ("Status", ("not_touching", "touching"))]
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(qtm_framelog, "CHUNK_ROWS", 8)
+
+
+def drain_rows(store, cutoff=None):
+    """(frame, clicked) of every drained row, in order"""
+    rows = []
+    for chunk, start, end in store.drain(cutoff):
+        rows += zip(chunk.columns[0][start:end].tolist(), chunk.clicked[start:end].tolist())
+    return rows
+
+
+def fill(store, frames):
+    return [store.append(frame, float(frame), "touching") for frame in frames]
+
+
+def test_drain_yields_every_row_once_and_releases_chunks():
+    store = FrameStore(SCHEMA)
+    fill(store, range(20))
+    assert [frame for frame, _ in drain_rows(store)] == list(range(20))
+    assert drain_rows(store) == []
+    assert len(store._chunks) == 1  # Only the partly filled chunk is kept
+    fill(store, range(20, 30))
+    assert [frame for frame, _ in drain_rows(store)] == list(range(20, 30))
+
+
+def test_drain_stops_at_the_cutoff():
+    store = FrameStore(SCHEMA)
+    fill(store, range(5))
+    cutoff = store._current.arrival[4]
+    fill(store, range(5, 7))
+    store._current.arrival[5:7] = cutoff + 1.0
+    assert [frame for frame, _ in drain_rows(store, cutoff)] == list(range(5))
+    assert [frame for frame, _ in drain_rows(store)] == [5, 6]
+
+
+def test_clicks_are_attributed_by_row_and_by_frame():
+    store = FrameStore(SCHEMA)
+    rows = fill(store, range(100, 120))
+    assert store.mark_clicked_row(rows[3])
+    assert store.mark_clicked_row(rows[17])
+    store.mark_clicked(110)
+    store.mark_clicked(999)  # Never logged
+    clicked = [frame for frame, is_clicked in drain_rows(store) if is_clicked]
+    assert clicked == [103, 110, 117]
+
+
+def test_marks_after_the_row_was_drained_are_refused():
+    store = FrameStore(SCHEMA)
+    rows = fill(store, range(20))
+    drain_rows(store)
+    assert not store.mark_clicked_row(rows[2])   # Chunk released
+    assert not store.mark_clicked_row(rows[17])  # Claimed in the current chunk
+    assert not store.mark_clicked_row(rows[19] + 1)  # Not logged yet
+
+
+def test_format_rows():
+    store = FrameStore(SCHEMA)
+    store.append(1, float("nan"), "not_touching")
+    store.append(2, 1.5, "touching")
+    store.mark_clicked_row(1)
+    (chunk, start, end), = store.drain()
+    text, clicked_text = store.format_rows(chunk, start, end, "\n")
+    assert text == "1,NaN,not_touching,0\n2,1.5,touching,1\n"
+    assert clicked_text == "2,1.5,touching,1\n"
+
+
+def test_click_marks_race_the_writer_without_losing_or_corrupting_rows():
+    """The frame path appends and marks rows while the writer drains and a serial thread marks frames"""
+    store = FrameStore(SCHEMA)
+    stop = threading.Event()
+    written, errors = [], []
+
+    def writer():
+        while True:
+            done = stop.is_set()
+            try:
+                written.extend(drain_rows(store))
+            except Exception as e:
+                errors.append(e)
+            if done:
+                return
+
+    def serial():
+        while not stop.is_set():
+            store.mark_clicked(store.row_count)
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=serial)]
+    for thread in threads:
+        thread.start()
+    accepted = set()
+    try:
+        for frame in range(50_000):
+            row = store.append(frame, 0.0, "touching")
+            if frame % 7 == 0 and store.mark_clicked_row(row):
+                accepted.add(frame)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    assert [frame for frame, _ in written] == list(range(50_000))
+    # A mark that was accepted is never lost to a concurrent drain
+    assert accepted <= {frame for frame, is_clicked in written if is_clicked}
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from qtm_geometry import ScreenFrame
+
+WIDTH, HEIGHT = 344.0, 194.0
+# Top right, bottom right, bottom left, top left; the bottom edge runs along x
+CORNERS = np.array([[WIDTH, HEIGHT, 0.0], [WIDTH, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, HEIGHT, 0.0]])
+
+
+def test_project_inside():
+    frame = ScreenFrame()
+    frame.update(CORNERS)
+    dist, x_local, distance_from_reference, is_valid = frame.project(np.array([100.0, 50.0, -3.0]))
+    assert dist == pytest.approx(3.0)
+    assert x_local == pytest.approx(100.0)
+    assert distance_from_reference == pytest.approx(100.0)
+    assert is_valid
+
+
+@pytest.mark.parametrize("tip", [[-5.0, 50.0, 0.0], [WIDTH + 5, 50.0, 0.0], [100.0, HEIGHT + 5, 0.0]])
+def test_project_outside(tip):
+    frame = ScreenFrame()
+    frame.update(CORNERS)
+    assert not frame.project(np.array(tip))[3]
+
+
+def test_project_in_a_rotated_translated_frame():
+    angle = np.radians(30)
+    rotation = np.array([[np.cos(angle), -np.sin(angle), 0], [np.sin(angle), np.cos(angle), 0], [0, 0, 1]])
+    rotation = rotation @ np.array([[1, 0, 0], [0, 0, -1], [0, 1, 0]])  # Screen upright
+    offset = np.array([120.0, -40.0, 900.0])
+    frame = ScreenFrame()
+    frame.update(CORNERS @ rotation.T + offset)
+    dist, x_local, distance_from_reference, is_valid = frame.project(np.array([100.0, 50.0, 7.0]) @ rotation.T + offset)
+    assert (dist, x_local, distance_from_reference, is_valid) == (pytest.approx(7.0), pytest.approx(100.0),
+                                                                 pytest.approx(100.0), True)
+
+
+def test_basis_only_rebuilt_past_tolerance():
+    frame = ScreenFrame(tolerance_mm=0.5)
+    assert frame.update(CORNERS)
+    assert not frame.update(CORNERS + 0.4)
+    assert frame.update(CORNERS + [1.0, 0.0, 0.0])
+    assert frame.rebuild_count == 2
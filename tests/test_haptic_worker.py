@@ -0,0 +1,76 @@
+import threading
+import time
+
+from qtm_haptics import HapticWorker
+
+
+def run_batch(worker, commands, before_start=None):
+    """Queue `commands` before the worker starts so they are drained as one batch"""
+    for command in commands:
+        worker.submit(command)
+    if before_start is not None:
+        before_start()
+    worker.start()
+    deadline = time.monotonic() + 2.0
+    while worker.queue_depth() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    time.sleep(0.05)
+    worker.stop()
+
+
+def recording_handlers(calls):
+    return {command: (lambda command=command: calls.append(command)) for command in ("start", "stop", "burst")}
+
+
+def test_level_commands_coalesce_to_the_last_one():
+    calls = []
+    worker = HapticWorker(recording_handlers(calls))
+    run_batch(worker, ["start", "stop", "burst", "start"])
+    assert calls == ["burst", "start"]
+    assert worker.counts["coalesced"] == 2
+    assert worker.counts["executed"] == 2
+
+
+def test_stale_bursts_are_dropped():
+    calls = []
+    worker = HapticWorker(recording_handlers(calls), stale_ms=10.0)
+    run_batch(worker, ["burst"], before_start=lambda: time.sleep(0.05))
+    assert calls == []
+    assert worker.counts["stale"] == 1
+
+
+def test_full_queue_discards_the_oldest_command():
+    calls = []
+    worker = HapticWorker(recording_handlers(calls), max_queue=2)
+    run_batch(worker, ["burst", "burst", "stop"])
+    assert worker.counts["overflow"] == 1
+    assert calls == ["burst", "stop"]
+
+
+def test_handler_errors_are_counted_and_the_worker_keeps_running():
+    calls = []
+
+    def failing():
+        raise RuntimeError("driver error")
+
+    handlers = recording_handlers(calls)
+    handlers["burst"] = failing
+    worker = HapticWorker(handlers)
+    run_batch(worker, ["burst", "stop"])
+    assert worker.counts["errors"] == 1
+    assert calls == ["stop"]
+
+
+def test_submit_never_waits_for_a_slow_handler():
+    release = threading.Event()
+    worker = HapticWorker({"burst": lambda: release.wait(1.0)})
+    worker.start()
+    try:
+        started = time.perf_counter()
+        for _ in range(10):
+            worker.submit("burst")
+        assert time.perf_counter() - started < 0.01
+    finally:
+        release.set()
+        worker.stop()
+    assert worker.summary()["submitted"] == 10
@@ -0,0 +1,87 @@
+import queue
+
+import zmq
+
+from qtm_ingest import DEFAULT_SETTINGS, IngestWorker
+from qtm_latency import now_ns
+from qtm_wire import encode_frame
+
+CORNERS = [[444.0, 294.0, 1000.0], [444.0, 100.0, 1000.0], [100.0, 100.0, 1000.0], [100.0, 294.0, 1000.0]]
+
+
+class FakeSocket:
+    """Hands out queued [topic, payload] messages like a SUB socket read with NOBLOCK"""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+
+    def recv_multipart(self, flags=0):
+        if not self.messages:
+            raise zmq.Again()
+        return self.messages.pop(0)
+
+
+def message(frame, x_local, t_sent=0):
+    stamps = (t_sent, 0, 0, t_sent)
+    payload = encode_frame(frame, x_local, 0.0, 1.0, x_local, 0, "touching", True, [x_local, 0.0, 0.0], CORNERS,
+                           stamps)
+    return [b"qtm_data", payload]
+
+
+def make_worker(**settings):
+    return IngestWorker(queue.Queue(), queue.Queue(), None, dict(DEFAULT_SETTINGS, **settings))
+
+
+def drain(events):
+    out = []
+    while not events.empty():
+        out.append(events.get())
+    return out
+
+
+def test_backlog_is_drained_and_only_the_newest_frame_is_used():
+    worker = make_worker()
+    t_sent = now_ns()
+    worker._handle_data(FakeSocket([message(frame, 10.0 + frame, t_sent) for frame in range(1, 6)]))
+    assert worker.metric_zmq_received.value == 5
+    assert worker.metric_frames_skipped.value == 4
+    assert worker.metric_backlog_depth.read() == 5
+    assert worker.metric_backlog_age.count == 1
+    assert worker.metric_frame_gaps.value == 0
+    assert worker.last_frame == 5
+    (event,) = drain(worker.events)
+    assert event[:3] == ("frame", 5, 15.0)
+
+
+def test_drain_is_bounded_by_max_drain():
+    worker = make_worker(max_drain=3)
+    socket = FakeSocket([message(frame, 10.0) for frame in range(1, 6)])
+    worker._handle_data(socket)
+    assert worker.last_frame == 3
+    assert len(socket.messages) == 2
+
+
+def test_missing_frame_numbers_are_counted_as_gaps():
+    worker = make_worker()
+    worker._handle_data(FakeSocket([message(1, 10.0), message(2, 10.0), message(6, 10.0)]))
+    worker._handle_data(FakeSocket([message(10, 10.0)]))
+    assert worker.metric_frame_gaps.value == 3 + 3
+
+
+def test_trigger_on_entering_the_target_only():
+    worker = make_worker()
+    worker.rect_x_mm, worker.rect_x_end_mm = 100.0, 120.0
+    worker._handle_data(FakeSocket([message(1, 50.0)]))
+    # Several frames inside arrive together; the newest one triggers once
+    worker._handle_data(FakeSocket([message(2, 90.0), message(3, 105.0)]))
+    worker._handle_data(FakeSocket([message(4, 110.0)]))
+    triggers = [e for e in drain(worker.events) if e[0] == "trigger"]
+    assert [e[1] for e in triggers] == [3]
+    assert worker.metric_triggers.value == 1
+
+
+def test_undecodable_payload_is_counted():
+    worker = make_worker()
+    worker._handle_data(FakeSocket([[b"qtm_data", b"\x07garbage"]]))
+    assert worker.metric_decode_errors.value == 1
+    assert drain(worker.events) == []
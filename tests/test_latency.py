@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pytest
+
+from qtm_latency import LatencyHistogram, LatencyTracer
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(50) is None
+    assert histogram.summary() == {"count": 0}
+
+
+def test_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in range(1, 101):
+        histogram.record(value)
+    assert histogram.percentile(50) == 50
+    assert histogram.percentile(100) == 100
+    summary = histogram.summary()
+    assert (summary["count"], summary["min_us"], summary["max_us"]) == (100, 1, 100)
+    assert summary["mean_us"] == pytest.approx(50.5)
+
+
+def test_percentiles_within_bucket_resolution():
+    values = np.random.default_rng(0).lognormal(7.0, 1.5, 20_000).astype(np.int64)
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    for p in (50, 90, 99, 99.9):
+        exact = np.percentile(values, p, method="inverted_cdf")
+        assert histogram.percentile(p) == pytest.approx(exact, rel=0.016)
+    assert histogram.percentile(100) == values.max()
+
+
+def test_negative_values_clamp_to_zero_and_buckets_add_up():
+    histogram = LatencyHistogram()
+    for value in (-5, 0, 1_000, 1_000_000):
+        histogram.record(value)
+    assert histogram.min == 0
+    assert sum(count for _, count in histogram.buckets()) == 4
+
+
+def test_tracer_skips_missing_stamps_and_dumps(tmp_path):
+    tracer = LatencyTracer("test")
+    tracer.record("a->b", 1_000, 6_000)
+    tracer.record("a->b", 0, 9_000)  # Unstamped
+    tracer.record_us("a->c", 12)
+    path = tmp_path / "latency.json"
+    tracer.dump(path)
+    stages = json.loads(path.read_text())["stages"]
+    assert stages["a->b"]["summary"]["count"] == 1
+    assert stages["a->b"]["summary"]["max_us"] == 5
+    assert stages["a->c"]["buckets"] == [[12, 1]]
@@ -0,0 +1,70 @@
+import pytest
+import zmq
+
+from qtm_lifecycle import LifecycleClient, LifecycleServer
+
+PORT = 5597
+
+
+@pytest.fixture
+def pair():
+    ctx = zmq.Context()
+    server = LifecycleServer(ctx, PORT)
+    client = LifecycleClient(ctx, "127.0.0.1", PORT)
+    yield server, client
+    client.close()
+    server.close()
+    ctx.term()
+
+
+def recv(client, timeout_ms=2000):
+    assert client.socket.poll(timeout_ms), "nothing received"
+    return client.recv()
+
+
+def test_handshake(pair):
+    server, client = pair
+    assert not server.send("config", {"block": 1})  # No peer until the subscriber spoke
+    client.send("ready", {"canvas_width": 1920, "canvas_height": 1080})
+    assert server.wait_for("ready", 2.0) == {"canvas_width": 1920, "canvas_height": 1080}
+
+    assert server.send("config", {"block": 1})
+    assert recv(client) == ("config", {"block": 1})
+    client.send("config_ack")
+    assert server.wait_for("config_ack", 2.0) == {}
+
+
+def test_request_waits_for_the_ack(pair):
+    server, client = pair
+    client.send("ready")
+    server.wait_for("ready", 2.0)
+    client.send("log_complete_ack")  # Queued by the DEALER before the request even goes out
+    assert server.request("log_complete", {"clicked_log": "x.csv"}, "log_complete_ack", 2.0)
+    assert recv(client) == ("log_complete", {"clicked_log": "x.csv"})
+    assert not server.request("config", {}, "config_ack", 0.1)
+
+
+def test_early_message_is_kept_for_a_later_wait(pair):
+    server, client = pair
+    client.send("ready")
+    server.wait_for("ready", 2.0)
+    client.send("block_done")
+    client.send("config_ack")
+    assert server.wait_for("config_ack", 2.0) == {}
+    assert list(server.pending) == [("block_done", {})]
+    assert server.wait_for("block_done", 0.0) == {}
+    assert not server.pending
+
+
+def test_error_ends_the_wait_early(pair):
+    server, client = pair
+    client.send("ready")
+    server.wait_for("ready", 2.0)
+    client.send("error", {"message": "disk full"})
+    assert server.wait_for("config_ack", 10.0) is None
+    assert server.error == {"message": "disk full"}
+
+
+def test_wait_times_out(pair):
+    server, _ = pair
+    assert server.wait_for("ready", 0.05) is None
@@ -0,0 +1,47 @@
+import numpy as np
+
+from packets import make_packet, pen_markers
+from qtm_markers import MarkerReader, marker_view, valid_marker_mask
+
+
+def test_marker_view_reads_the_packet_buffer():
+    markers = pen_markers(np.array([200.0, 150.0, 1002.0]))
+    packet = make_packet(markers)
+    view = marker_view(packet)
+    assert view.dtype == np.dtype("<f4")
+    assert np.shares_memory(view, np.frombuffer(packet.data, np.uint8))
+    np.testing.assert_allclose(view, markers)
+
+
+def test_reader_is_zero_copy_by_default():
+    packet = make_packet(pen_markers(np.array([200.0, 150.0, 1002.0])))
+    reader = MarkerReader([0, 1, 2, 3, 8])
+    reader.read(packet)
+    assert np.shares_memory(reader.xyz, np.frombuffer(packet.data, np.uint8))
+
+
+def test_reader_copies_into_another_dtype():
+    markers = pen_markers(np.array([200.0, 150.0, 1002.0]))
+    packet = make_packet(markers)
+    reader = MarkerReader([0, 1, 2, 3, 8], dtype=np.float64)
+    tracked = reader.read(packet)
+    assert tracked.dtype == np.float64
+    assert not np.shares_memory(reader.xyz, np.frombuffer(packet.data, np.uint8))
+    np.testing.assert_allclose(tracked, markers[[0, 1, 2, 3, 8]])
+
+
+def test_reader_flags_occluded_markers():
+    markers = pen_markers(np.array([200.0, 150.0, 1002.0]))
+    markers[1] = np.nan
+    markers[3] = 0.0  # QTM's missing marker
+    reader = MarkerReader([0, 1, 2, 3, 8])
+    tracked = reader.read(make_packet(markers))
+    np.testing.assert_allclose(tracked[4], markers[8])
+    assert reader.valid.tolist() == [True, False, True, False, True]
+    assert not reader.all_valid
+    assert reader.read(make_packet(markers[:5])) is None
+
+
+def test_valid_marker_mask():
+    xyz = np.array([[1.0, 2.0, 3.0], [0.0, 0.0, 0.0], [np.nan, 1.0, 1.0], [0.0, 0.0, 1.0]])
+    assert valid_marker_mask(xyz).tolist() == [True, False, False, True]
@@ -0,0 +1,59 @@
+import json
+import time
+
+import pytest
+
+from qtm_metrics import MetricsRegistry, MetricsReporter, query
+
+
+def test_counters_gauges_and_distributions_in_the_snapshot():
+    registry = MetricsRegistry("test")
+    registry.counter("frames").inc()
+    registry.counter("frames").inc(4)
+    registry.gauge("queue_depth").set(3)
+    registry.gauge("backlog", lambda: 7)
+    registry.gauge("broken", lambda: 1 / 0)
+    for latency_us in (100, 200, 300):
+        registry.distribution("frame_latency").record(latency_us)
+    snapshot = registry.snapshot()
+    assert snapshot["process"] == "test"
+    assert snapshot["counters"]["frames"]["value"] == 5
+    assert snapshot["gauges"]["queue_depth"] == 3
+    assert snapshot["gauges"]["backlog"] == 7
+    assert snapshot["gauges"]["broken"].startswith("error:")
+    assert snapshot["distributions"]["frame_latency"]["count"] == 3
+    json.dumps(snapshot)
+
+
+def test_tick_rates_over_the_interval():
+    registry = MetricsRegistry("test")
+    frames = registry.counter("frames")
+    registry.tick()
+    frames.inc(50)
+    time.sleep(0.1)
+    registry.tick()
+    assert 200 < registry.rates["frames"] <= 500
+    registry.tick()
+    assert registry.rates["frames"] == 0.0
+
+
+def test_reporter_answers_queries_and_writes_snapshots(tmp_path):
+    registry = MetricsRegistry("test")
+    registry.counter("frames").inc(3)
+    reporter = MetricsReporter(registry, port=5599, interval_s=0.05, summary_every_s=60.0)
+    reporter.set_snapshot_path(tmp_path / "metrics.jsonl")
+    reporter.start()
+    try:
+        snapshot = query(5599, timeout_ms=2000)
+        time.sleep(0.15)
+    finally:
+        reporter.stop()
+    assert snapshot["counters"]["frames"]["value"] == 3
+    lines = (tmp_path / "metrics.jsonl").read_text().splitlines()
+    assert len(lines) >= 2
+    assert json.loads(lines[-1])["process"] == "test"
+
+
+def test_query_without_endpoint_times_out():
+    with pytest.raises(TimeoutError):
+        query(5598, timeout_ms=100)
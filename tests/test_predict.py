@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from qtm_predict import OneEuroPredictor
+
+FRAME_US = 3333  # 300 Hz
+
+
+def test_first_sample_passes_through():
+    predictor = OneEuroPredictor()
+    np.testing.assert_array_equal(predictor.update(np.array([1.0, 2.0, 3.0]), 0), [1.0, 2.0, 3.0])
+
+
+def test_steady_pen_stays_put():
+    predictor = OneEuroPredictor()
+    position = np.array([100.0, 50.0, 1000.0])
+    for i in range(300):
+        predicted = predictor.update(position, i * FRAME_US)
+    np.testing.assert_allclose(predicted, position)
+
+
+def test_constant_velocity_is_extrapolated_by_the_lead():
+    predictor = OneEuroPredictor(lead_ms=20.0, min_cutoff=1.0, beta=0.05)
+    velocity = np.array([300.0, 0.0, 0.0])  # mm/s
+    for i in range(600):
+        t = i * FRAME_US / 1e6
+        predicted = predictor.update(velocity * t, i * FRAME_US)
+    np.testing.assert_allclose(predictor.velocity, velocity, atol=0.5)
+    np.testing.assert_allclose(predicted, predictor.position + 0.020 * predictor.velocity)
+    # The position trails by about the low-pass lag v / (2 pi cutoff), cutoff = 1 + 0.05 * 300 Hz
+    lag = velocity[0] * t - predictor.position[0]
+    assert lag == pytest.approx(velocity[0] / (2 * np.pi * 16.0), rel=0.1)
+
+
+def test_noise_is_smoothed_at_rest():
+    rng = np.random.default_rng(0)
+    predictor = OneEuroPredictor(lead_ms=0.0)
+    raw = np.array([100.0, 50.0, 1000.0]) + rng.normal(0.0, 0.2, (900, 3))
+    filtered = np.array([predictor.update(xyz, i * FRAME_US).copy() for i, xyz in enumerate(raw)])
+    assert filtered[300:, 0].std() < raw[300:, 0].std() / 4
+
+
+def test_gap_restarts_the_filter():
+    predictor = OneEuroPredictor(max_gap_s=0.1)
+    for i in range(100):
+        predictor.update(np.array([i * 1.0, 0.0, 0.0]), i * FRAME_US)
+    jump = np.array([500.0, 0.0, 0.0])
+    np.testing.assert_array_equal(predictor.update(jump, 100 * FRAME_US + 200_000), jump)
+    np.testing.assert_array_equal(predictor.velocity, 0.0)
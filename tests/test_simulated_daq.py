@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+import pytest
+
+from qtm_haptics import HapticWorker, SimulatedDAQBackend, create_backend
+
+FS = 5000
+BURST = np.append(np.sin(np.linspace(0, 2 * np.pi, 50, endpoint=False)), 0.0)
+
+
+def test_burst_latency_is_the_modelled_start_latency():
+    backend = SimulatedDAQBackend(FS, start_latency_ms=2.0)
+    backend.configure_burst(BURST)
+    for _ in range(5):
+        backend.burst()
+    report = backend.report()
+    assert report["emitted"] == report["blocks"] == 5
+    assert 2.0 <= report["latency_mean_ms"] < 5.0
+    # Each burst plays its 51 samples (~10 ms) plus the start and stop costs
+    assert 0 < report["bursts_per_s"] < FS / len(BURST)
+    assert backend.emitted[-1]["samples"] == len(BURST)
+    assert backend.emitted[-1]["peak"] == pytest.approx(np.abs(BURST).max())
+
+
+def test_continuous_output_records_the_samples_clocked_out():
+    backend = SimulatedDAQBackend(FS)
+    backend.configure_continuous(BURST[:-1])
+    backend.start()
+    time.sleep(0.05)
+    backend.stop()
+    (entry,) = backend.emitted
+    assert entry["kind"] == "continuous"
+    assert 0.04 * FS <= entry["samples"] <= 0.2 * FS
+
+
+def test_prefilled_stream_blocks_are_timed_when_the_clock_starts():
+    backend = SimulatedDAQBackend(FS)
+    backend.configure_stream(100)
+    backend.write(np.zeros(50))
+    backend.write(np.ones(50))
+    assert backend.report() == {"emitted": 0, "blocks": 2}
+    backend.start()
+    first, second = backend.emitted
+    assert first["silent"] and not second["silent"]
+    assert second["first_sample_at"] - first["first_sample_at"] == pytest.approx(50 / FS)
+    assert backend.report()["emitted"] == 1
+    backend.stop()
+
+
+def test_stream_records_stay_bounded():
+    backend = SimulatedDAQBackend(FS, max_records=100)
+    backend.configure_stream(10_000_000)
+    backend.start()
+    block = np.ones(25)
+    for _ in range(5000):
+        backend.write(block)
+    backend.stop()
+    assert len(backend.emitted) == 100
+    assert "waveform" not in backend.emitted[-1]
+    report = backend.report()
+    assert report["blocks"] == report["emitted"] == 5000
+    assert report["underflows"] == 0
+
+
+def test_worker_to_simulated_daq_latency_without_hardware():
+    backend = SimulatedDAQBackend(FS, start_latency_ms=1.0, stop_latency_ms=0.0)
+    backend.configure_burst(BURST)
+    worker = HapticWorker({"burst": backend.burst}, stale_ms=1000.0)
+    worker.start()
+    for _ in range(5):
+        worker.submit("burst")
+        time.sleep(0.02)
+    worker.stop()
+    assert worker.counts["executed"] == backend.report()["emitted"] == 5
+    assert backend.report()["latency_max_ms"] < 10.0
+
+
+def test_unknown_backend():
+    assert create_backend("simulated", "Dev1/ao0", FS).name == "simulated"
+    with pytest.raises(ValueError):
+        create_backend("serial", "COM1", FS)
@@ -0,0 +1,47 @@
+import pytest
+
+import qtm_zmq_publisher as publisher
+
+STATION_B = {"name": "B", "zmq_port": 5565, "config_port": 5566, "metrics_port": 5567, "device_ao": "Dev2/ao0",
+             "participant_name": "p02"}
+
+
+@pytest.fixture
+def stations(monkeypatch):
+    """create_stations() with the given STATIONS, returning each station's settings"""
+    monkeypatch.setattr(publisher, "Station", lambda zmq_context, settings: settings)
+
+    def create(entries):
+        monkeypatch.setattr(publisher, "STATIONS", entries)
+        return publisher.create_stations(None)
+    return create
+
+
+def test_single_default_station(stations):
+    (settings,) = stations(None)
+    assert settings["name"] == ""
+    assert settings["subscriber_metrics_port"] == publisher.METRICS_PORT + 1
+
+
+def test_subscriber_metrics_port_follows_the_station(stations):
+    a, b = stations([{"name": "A", "participant_name": "p01"}, STATION_B])
+    assert (a["subscriber_metrics_port"], b["subscriber_metrics_port"]) == (5558, 5568)
+
+
+@pytest.mark.parametrize("override, message", [
+    ({"name": "A"}, "names"),
+    ({"config_port": publisher.ZMQ_PORT}, "ports"),
+    ({"subscriber_metrics_port": 5558}, "ports"),
+    ({"metrics_port": 5557, "subscriber_metrics_port": 5569}, "ports"),
+    ({"device_ao": "Dev1/ao1"}, "DAQ devices"),
+    ({"participant_name": "p01"}, "results folders"),
+])
+def test_collisions_are_rejected(stations, override, message):
+    with pytest.raises(ValueError, match=message):
+        stations([{"name": "A", "participant_name": "p01"}, dict(STATION_B, **override)])
+
+
+def test_explicit_results_dirs_may_share_a_participant(stations, tmp_path):
+    a, b = stations([{"name": "A", "participant_name": "p01", "results_dir": str(tmp_path / "A")},
+                     dict(STATION_B, participant_name="p01", results_dir=str(tmp_path / "B"))])
+    assert publisher.station_results_dir(a) != publisher.station_results_dir(b)
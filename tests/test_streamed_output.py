@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+
+from qtm_haptics import SimulatedDAQBackend, StreamedOutput
+
+FS = 5000
+CYCLE = np.sin(np.linspace(0, 2 * np.pi, 20, endpoint=False))  # 250 Hz
+BLOCKS = 10  # 20 ms of half-periods, so scheduling jitter cannot drain the buffer
+
+
+class FailingBackend(SimulatedDAQBackend):
+    """Raises on the first write after `fail_after` writes, like an underflow on the card"""
+
+    def __init__(self, fs, fail_after):
+        super().__init__(fs)
+        self.fail_after = fail_after
+
+    def write(self, samples):
+        if self.blocks >= self.fail_after:
+            raise RuntimeError("output buffer underflow")
+        super().write(samples)
+
+
+def test_gate_switches_the_streamed_output():
+    backend = SimulatedDAQBackend(FS, start_latency_ms=0.0, stop_latency_ms=0.0)
+    output = StreamedOutput(backend, CYCLE, BLOCKS)
+    output.start()
+    time.sleep(0.02)
+    output.set_gate(True)
+    time.sleep(0.05)
+    output.set_gate(False)
+    time.sleep(0.02)
+    output.stop()
+    assert output.error is None
+    assert [e["open"] for e in output.gate_events] == [True, False]
+    assert any(not e["silent"] for e in backend.emitted)
+    stats = output.summary()
+    assert stats["gate_changes"] == 2
+    # A change reaches the output within the buffered half-periods
+    assert stats["onset_max_ms"] < stats["buffer_ms"] + 20.0
+    assert backend.report()["underflows"] == 0
+
+
+def test_stop_leaves_the_output_at_rest():
+    backend = SimulatedDAQBackend(FS, start_latency_ms=0.0, stop_latency_ms=0.0)
+    output = StreamedOutput(backend, CYCLE, BLOCKS)
+    output.start()
+    output.set_gate(True)
+    time.sleep(0.05)
+    output.stop()
+    # The whole buffer ahead of the stop is zeros
+    tail, queued = [], 0
+    for entry in reversed(backend.emitted):
+        if queued >= output.buffer_samples:
+            break
+        tail.append(entry)
+        queued += entry["samples"]
+    assert queued >= output.buffer_samples
+    assert all(e["silent"] for e in tail)
+
+
+def test_feeder_error_is_kept_for_the_owner():
+    backend = FailingBackend(FS, fail_after=5)
+    output = StreamedOutput(backend, CYCLE, BLOCKS)
+    output.start()
+    output.set_gate(True)
+    deadline = time.perf_counter() + 2.0
+    while output.error is None and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    output.stop(timeout=0.5)
+    assert isinstance(output.error, RuntimeError)
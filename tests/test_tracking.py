@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from packets import CORNERS, make_packet, pen_markers
+from qtm_markers import PenScreenTracker, TIP_OFFSET_SAMPLES, label_names, resolve_tracker, rigid_transform
+
+
+def random_rotation(rng):
+    q, _ = np.linalg.qr(rng.normal(size=(3, 3)))
+    return q * np.sign(np.linalg.det(q))
+
+
+def test_rigid_transform_recovers_rotation_and_translation():
+    rng = np.random.default_rng(0)
+    rotation = random_rotation(rng)
+    translation = np.array([10.0, -20.0, 30.0])
+    reference = rng.normal(0.0, 50.0, (5, 3))
+    fitted_rotation, fitted_translation = rigid_transform(reference, reference @ rotation.T + translation)
+    np.testing.assert_allclose(fitted_rotation, rotation, atol=1e-9)
+    np.testing.assert_allclose(fitted_translation, translation, atol=1e-9)
+
+
+def test_rigid_transform_never_returns_a_reflection():
+    rng = np.random.default_rng(1)
+    reference = rng.normal(0.0, 50.0, (4, 3))
+    mirrored = reference * [1.0, 1.0, -1.0]
+    rotation, _ = rigid_transform(reference, mirrored)
+    assert np.linalg.det(rotation) == pytest.approx(1.0)
+
+
+def test_label_names():
+    xml = ("<QTM_Parameters_Ver_1.22><The_3D><Label><Name>Screen - 1</Name></Label>"
+           "<Label><Name>Pen - tip</Name></Label></The_3D></QTM_Parameters_Ver_1.22>")
+    assert label_names(xml) == ["Screen - 1", "Pen - tip"]
+
+
+def test_tracker_rebuilds_one_occluded_corner():
+    markers = pen_markers(np.array([200.0, 150.0, 1002.0]))
+    markers[2] = 0.0  # QTM's missing marker
+    tracker = PenScreenTracker([0, 1, 2, 3], 8)
+    tracked = tracker.read(make_packet(markers))
+    assert tracker.all_valid and tracker.recovered
+    np.testing.assert_allclose(tracked[2], CORNERS[2])
+
+
+def test_tracker_refits_the_pen_body_for_an_occluded_tip():
+    rng = np.random.default_rng(2)
+    tracker = PenScreenTracker([0, 1, 2, 3], 8, [4, 5, 6, 7])
+    tracker.read(make_packet(pen_markers(np.array([200.0, 150.0, 1002.0]))))
+    assert not tracker.recovered
+
+    tip, rotation = np.array([260.0, 180.0, 1010.0]), random_rotation(rng)
+    markers = pen_markers(tip, rotation)
+    markers[8] = np.nan
+    markers[5] = np.nan  # Three body markers are enough
+    tracked = tracker.read(make_packet(markers))
+    assert tracker.all_valid and tracker.recovered
+    np.testing.assert_allclose(tracked[4], tip, atol=1e-3)
+
+
+def test_tracker_calibrates_the_tip_offset_from_the_tip_marker():
+    rng = np.random.default_rng(3)
+    offset = np.array([3.0, -2.0, -140.0])
+    tracker = PenScreenTracker([0, 1, 2, 3], 8, body_index=0)
+
+    def frame(tip_visible):
+        rotation, position = random_rotation(rng), rng.normal(300.0, 50.0, 3)
+        tip = position + offset @ rotation.T
+        markers = pen_markers(tip)
+        if not tip_visible:
+            markers[8] = np.nan
+        return tip, tracker.read(make_packet(markers, [(position, rotation)]))
+
+    # Until calibrated, the body does not stand in for the tip
+    frame(True)
+    frame(False)
+    assert not tracker.valid[4]
+    for _ in range(TIP_OFFSET_SAMPLES):
+        frame(True)
+    np.testing.assert_allclose(tracker.tip_offset, offset, atol=1e-3)
+    tip, tracked = frame(False)
+    assert tracker.valid[4] and tracker.recovered
+    np.testing.assert_allclose(tracked[4], tip, atol=1e-2)
+
+
+@pytest.mark.parametrize("tip_offset", [None, (0.0, 0.0, 0.0)])
+def test_body_only_tracking_needs_a_tip_offset(tip_offset):
+    with pytest.raises(ValueError):
+        PenScreenTracker([0, 1, 2, 3], body_index=0, tip_offset=tip_offset)
+
+
+def test_resolve_tracker_by_label():
+    labels = ["Pen - tip", "Screen - 4", "Screen - 3", "Screen - 2", "Screen - 1"]
+    tracker = resolve_tracker(labels, [], ["Screen - 1", "Screen - 2", "Screen - 3", "Screen - 4"],
+                              tip_label="Pen - tip")
+    assert tracker.corner_indices.tolist() == [4, 3, 2, 1]
+    assert tracker.tip_index == 0
+    with pytest.raises(ValueError):
+        resolve_tracker(labels, [], ["Screen - 1", "Screen - 5"], tip_label="Pen - tip")
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+
+from qtm_wire import FRAME_SIZE, FRAME_SIZE_V1, decode_frame, encode_frame, encode_frame_json, peek_frame
+
+PEN_TIP = [200.5, 150.25, 1002.0]
+CORNERS = [[444.0, 294.0, 1000.0], [444.0, 100.0, 1000.0], [100.0, 100.0, 1000.0], [100.0, 294.0, 1000.0]]
+STAMPS = (1_000, 2_000, 3_000, 4_000)
+
+
+def test_v2_round_trip():
+    payload = encode_frame(1234, 100.5, "NaN", 2.25, None, 3, "touching", True, PEN_TIP, CORNERS, STAMPS)
+    assert len(payload) == FRAME_SIZE == 104
+    data = decode_frame(payload)
+    assert data["frame"] == 1234
+    assert data["x_local"] == 100.5
+    assert data["y_local"] is None
+    assert data["distance"] == 2.25
+    assert data["distance_from_reference"] is None
+    assert data["current_bin"] == 3
+    assert data["status"] == "touching"
+    assert data["inside_bounds"] == 1
+    assert data["is_valid_position"] == 1
+    assert data["pen_tip"] == PEN_TIP
+    assert data["screen_corners"] == CORNERS
+    assert (data["t_packet_in"], data["t_sent"]) == (1_000, 4_000)
+    assert peek_frame(payload) == (1234, 4_000)
+
+
+def test_numpy_scalars_are_encoded_as_numbers():
+    x_local, y_local = np.float32(100.5), np.float64(0.0)
+    payload = encode_frame(1, x_local, y_local, np.float32(2.5), np.float32(10.0), None, "touching", True,
+                           np.float32(PEN_TIP), np.float32(CORNERS))
+    data = decode_frame(payload)
+    assert (data["x_local"], data["y_local"], data["distance_from_reference"]) == (100.5, 0.0, 10.0)
+    data = json.loads(encode_frame_json(1, x_local, y_local, np.float32(2.5), np.float32(10.0), None,
+                                        "touching", True, np.float32(PEN_TIP), np.float32(CORNERS)))
+    assert (data["x_local"], data["y_local"], data["distance_from_reference"]) == (100.5, 0.0, 10.0)
+
+
+def test_v1_frames_still_decode():
+    payload = encode_frame(7, 1.0, 2.0, 3.0, 4.0, None, "outside", False, PEN_TIP, CORNERS, STAMPS)
+    v1 = bytes([1]) + payload[1:FRAME_SIZE_V1]
+    data = decode_frame(v1)
+    assert data["frame"] == 7
+    assert data["current_bin"] is None
+    assert data["status"] == "outside"
+    assert data["is_valid_position"] == 0
+    assert data["pen_tip"] == PEN_TIP
+    assert "t_sent" not in data
+    assert peek_frame(v1) == (7, 0)
+
+
+def test_json_frames_decode_with_every_stamp():
+    payload = encode_frame_json(9, 1.234, None, 3.0, None, 0, "not_touching", True, PEN_TIP, CORNERS, STAMPS)
+    data = decode_frame(payload)
+    assert data == json.loads(payload)
+    assert data["x_local"] == 1.23
+    assert (data["t_packet_in"], data["t_geometry"], data["t_haptic"], data["t_sent"]) == STAMPS
+    assert peek_frame(payload) == (9, 4_000)
+
+
+def test_binary_frames_are_far_smaller_than_json():
+    args = (123456, 100.12, 0.0, 3.21, 55.5, 3, "touching", True, PEN_TIP, CORNERS,
+            (123456789012, 123456789112, 123456789212, 123456789312))
+    assert len(encode_frame_json(*args)) > 4 * len(encode_frame(*args))
+
+
+@pytest.mark.parametrize("payload", [b"", bytes([3]) + bytes(FRAME_SIZE - 1), bytes([2]) + bytes(FRAME_SIZE_V1 - 1)])
+def test_unsupported_frames_are_rejected(payload):
+    with pytest.raises(ValueError):
+        decode_frame(payload)